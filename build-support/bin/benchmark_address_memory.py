@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Measure the memory used by `Address`es in a synthetic large build graph.
+
+Every target in the synthetic repo depends on a number of other targets, and each dependency is
+constructed as a fresh `Address`, as happens when dependencies are parsed from BUILD files and
+inferred from imports. The retained size of the graph therefore reflects both the size of each
+`Address` and how well equal addresses are shared.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+from pants.build_graph.address import Address
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the memory used by Addresses.")
+    parser.add_argument("--directories", type=int, default=5000)
+    parser.add_argument("--files-per-directory", type=int, default=10)
+    parser.add_argument("--dependencies-per-target", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def synthetic_components(directories: int, files_per_directory: int) -> List[Tuple[str, str, str]]:
+    """Return (spec_path, relative_file_path, target_name) for every file target in the repo."""
+    components = []
+    for i in range(directories):
+        spec_path = f"src/python/project{i % 50}/package{i // 50}/module{i}"
+        for j in range(files_per_directory):
+            components.append((spec_path, f"file{j}.py", f"module{i}"))
+    return components
+
+
+def build_graph(
+    components: List[Tuple[str, str, str]], dependencies_per_target: int, seed: int
+) -> Dict[Address, List[Address]]:
+    rng = random.Random(seed)
+    graph = {}
+    for spec_path, relative_file_path, target_name in components:
+        address = Address(spec_path, relative_file_path=relative_file_path, target_name=target_name)
+        graph[address] = [
+            Address(dep[0], relative_file_path=dep[1], target_name=dep[2])
+            for dep in rng.sample(components, dependencies_per_target)
+        ]
+    return graph
+
+
+def main() -> None:
+    options = create_parser().parse_args()
+    components = synthetic_components(options.directories, options.files_per_directory)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph = build_graph(components, options.dependencies_per_target, options.seed)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    dependees: Dict[Address, List[Address]] = {}
+    for address, dependencies in graph.items():
+        for dependency in dependencies:
+            dependees.setdefault(dependency, []).append(address)
+    invert_elapsed = time.perf_counter() - start
+
+    edges = sum(len(deps) for deps in graph.values())
+    print(f"targets:                  {len(graph)}")
+    print(f"dependency edges:         {edges}")
+    print(f"construct graph:          {elapsed:.2f}s")
+    print(f"invert graph:             {invert_elapsed:.2f}s")
+    print(f"retained memory:          {retained / 2**20:.1f} MiB")
+    print(f"peak memory:              {peak / 2**20:.1f} MiB")
+    print(f"retained bytes per edge:  {retained / (len(graph) + edges):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Measure how long it takes to match `AddressGlobSpec`s against a synthetic large repo.
+
+The repo has one BUILD file per directory, and the specs mimic CI sharding, i.e. many `dir::`
+specs plus a few `dir^` specs. For comparison, the same specs are also matched with a linear scan
+over every directory, which is how specs were matched before `AddressFamiliesByDirectory`.
+"""
+
+import argparse
+import random
+import time
+from typing import List, Sequence
+
+from pants.base.specs import (
+    AddressFamiliesByDirectory,
+    AddressGlobSpec,
+    AscendantAddresses,
+    DescendantAddresses,
+)
+from pants.engine.internals.mapper import AddressFamily
+from pants.util.dirutil import fast_relpath_optional
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark matching address specs.")
+    parser.add_argument("--directories", type=int, default=15000)
+    parser.add_argument("--descendant-specs", type=int, default=500)
+    parser.add_argument("--ascendant-specs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def synthetic_directories(count: int) -> List[str]:
+    return [f"src/project{i % 20}/package{i % 400}/module{i}" for i in range(count)]
+
+
+def linear_scan(specs: Sequence[AddressGlobSpec], families: Sequence[AddressFamily]) -> int:
+    matched = 0
+    for spec in specs:
+        if isinstance(spec, DescendantAddresses):
+            matched += sum(
+                1
+                for af in families
+                if fast_relpath_optional(af.namespace, spec.directory) is not None
+            )
+        else:
+            matched += sum(
+                1
+                for af in families
+                if fast_relpath_optional(spec.directory, af.namespace) is not None
+            )
+    return matched
+
+
+def main() -> None:
+    options = create_parser().parse_args()
+    rng = random.Random(options.seed)
+    directories = synthetic_directories(options.directories)
+    families = [AddressFamily(namespace=d, name_to_target_adaptors={}) for d in directories]
+    specs: List[AddressGlobSpec] = [
+        *(
+            DescendantAddresses(rng.choice(directories).rsplit("/", 1)[0])
+            for _ in range(options.descendant_specs)
+        ),
+        *(AscendantAddresses(rng.choice(directories)) for _ in range(options.ascendant_specs)),
+    ]
+
+    start = time.perf_counter()
+    index = AddressFamiliesByDirectory(families)
+    index_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched = sum(len(spec.matching_address_families(index)) for spec in specs)
+    indexed_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linear_matched = linear_scan(specs, families)
+    linear_elapsed = time.perf_counter() - start
+    assert matched == linear_matched
+
+    print(f"directories:              {len(directories)}")
+    print(f"specs:                    {len(specs)}")
+    print(f"matched families:         {matched}")
+    print(f"build index:              {index_elapsed * 1000:.1f}ms")
+    print(f"match with index:         {indexed_elapsed * 1000:.1f}ms")
+    print(f"match with linear scan:   {linear_elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
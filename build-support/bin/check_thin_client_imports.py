@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Check that the thin client entrypoint, `pants.bin.thin_client`, stays cheap to import.
+
+The thin client is the default entrypoint of every `./pants` run, so anything that it imports is
+paid for by every no-op run against pantsd. This measures its import with `python -X importtime`,
+and fails if it imports any of the heavy parts of Pants, any 3rd-party code, or exceeds a time
+budget.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import sysconfig
+from typing import Dict, Set, Tuple
+
+from common import die, green
+
+MODULE = "pants.bin.thin_client"
+
+BANNED_PREFIXES = (
+    "pants.base.build_environment",
+    "pants.base.exception_sink",
+    "pants.bin.local_pants_runner",
+    "pants.bin.pants_exe",
+    "pants.bin.pants_runner",
+    "pants.bin.remote_pants_runner",
+    "pants.engine",
+    "pants.init",
+    "pants.option",
+    "pants.pantsd",
+    "pants.version",
+)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=f"Check the import time of `{MODULE}`.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150,
+        help="The maximum median cumulative import time, as reported by `-X importtime`.",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    return parser
+
+
+def run_python(statement: str) -> Tuple[Dict[str, int], Set[str]]:
+    """Runs the statement, and returns the cumulative import time in microseconds of each module
+    that it imported, and the files of all modules that were loaded, including by site."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"{statement}; import sys; "
+            "print('\\n'.join(getattr(m, '__file__', None) or '' for m in sys.modules.values()))",
+        ],
+        env={**os.environ, "PYTHONPATH": "src/python"},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.decode().splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        times[module.strip()] = int(cumulative)
+    return times, {f for f in result.stdout.decode().splitlines() if f}
+
+
+def main() -> None:
+    options = create_parser().parse_args()
+
+    _, startup_files = run_python("pass")
+    runs = [run_python(f"import {MODULE}") for _ in range(options.runs)]
+    times, files = runs[0]
+
+    banned = sorted(m for m in times if m.startswith(BANNED_PREFIXES))
+    if banned:
+        die(f"`{MODULE}` must not import heavy parts of Pants, but imported: {', '.join(banned)}")
+
+    # NB: Modules that are loaded by interpreter startup, e.g. by `.pth` files, are not our concern.
+    stdlib_dirs = (sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["platstdlib"])
+    sources_dir = os.path.abspath("src/python")
+    third_party = sorted(
+        f
+        for f in files - startup_files
+        if not os.path.abspath(f).startswith((sources_dir, *stdlib_dirs)) or "site-packages" in f
+    )
+    if third_party:
+        die(f"`{MODULE}` must only import from the standard library, but imported: {third_party}")
+
+    median_ms = statistics.median(t[MODULE] for t, _ in runs) / 1000
+    if median_ms > options.budget_ms:
+        die(
+            f"Importing `{MODULE}` took {median_ms:.1f}ms, which exceeds the budget of "
+            f"{options.budget_ms:.1f}ms. Run `python -X importtime -c 'import {MODULE}'` to see "
+            "which imports are responsible."
+        )
+    green(f"Importing `{MODULE}` took {median_ms:.1f}ms (budget: {options.budget_ms:.1f}ms).")
+
+
+if __name__ == "__main__":
+    main()
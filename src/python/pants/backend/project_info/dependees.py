@@ -2,10 +2,10 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 import json
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Iterable, Set, cast
+from typing import DefaultDict, Iterable, List, Set, Tuple, cast
 
 from pants.base.specs import AddressSpecs, DescendantAddresses
 from pants.engine.addresses import Address, Addresses
@@ -25,25 +25,65 @@ class AddressToDependees:
     mapping: FrozenDict[Address, FrozenOrderedSet[Address]]
 
 
+@dataclass(frozen=True)
+class DependeesShardRequest:
+    """A request for the reverse dependencies of the targets declared in a single directory."""
+
+    addresses: Addresses
+
+
+@dataclass(frozen=True)
+class DependeesShard:
+    """A map from each dependency of the targets in a single directory to its dependees there."""
+
+    mapping: FrozenDict[Address, Tuple[Address, ...]]
+
+
 @rule(level=LogLevel.DEBUG)
-async def map_addresses_to_dependees() -> AddressToDependees:
-    # Get every target in the project so that we can iterate over them to find their dependencies.
-    all_expanded_targets, all_explicit_targets = await MultiGet(
-        Get(Targets, AddressSpecs([DescendantAddresses("")])),
-        Get(UnexpandedTargets, AddressSpecs([DescendantAddresses("")])),
+async def map_addresses_to_dependees_in_shard(request: DependeesShardRequest) -> DependeesShard:
+    expanded_targets, explicit_targets = await MultiGet(
+        Get(Targets, Addresses, request.addresses),
+        Get(UnexpandedTargets, Addresses, request.addresses),
     )
-    all_targets = {*all_expanded_targets, *all_explicit_targets}
+    targets = {*expanded_targets, *explicit_targets}
     dependencies_per_target = await MultiGet(
-        Get(Addresses, DependenciesRequest(tgt.get(Dependencies))) for tgt in all_targets
+        Get(Addresses, DependenciesRequest(tgt.get(Dependencies))) for tgt in targets
     )
 
-    address_to_dependees = defaultdict(set)
-    for tgt, dependencies in zip(all_targets, dependencies_per_target):
+    address_to_dependees: DefaultDict[Address, Set[Address]] = defaultdict(set)
+    for tgt, dependencies in zip(targets, dependencies_per_target):
         for dependency in dependencies:
             address_to_dependees[dependency].add(tgt.address)
+    return DependeesShard(
+        FrozenDict(
+            (address, tuple(sorted(dependees)))
+            for address, dependees in sorted(address_to_dependees.items())
+        )
+    )
+
+
+@rule(level=LogLevel.DEBUG)
+async def map_addresses_to_dependees() -> AddressToDependees:
+    # NB: We compute the reverse dependencies of each directory separately and then merge the
+    # results. With pantsd, a change to one BUILD file or source file only recomputes the shard for
+    # its directory, and if the merged mapping is unchanged, everything downstream stays memoized.
+    all_addresses = await Get(Addresses, AddressSpecs([DescendantAddresses("")]))
+    addresses_by_directory: DefaultDict[str, List[Address]] = defaultdict(list)
+    for address in all_addresses:
+        addresses_by_directory[address.spec_path].append(address)
+    shards = await MultiGet(
+        Get(DependeesShard, DependeesShardRequest(Addresses(sorted(addresses))))
+        for _, addresses in sorted(addresses_by_directory.items())
+    )
+
+    address_to_dependees: DefaultDict[Address, Set[Address]] = defaultdict(set)
+    for shard in shards:
+        for address, dependees in shard.mapping.items():
+            address_to_dependees[address].update(dependees)
     return AddressToDependees(
         FrozenDict(
-            {addr: FrozenOrderedSet(dependees) for addr, dependees in address_to_dependees.items()}
+            (address, FrozenOrderedSet(sorted(dependees)))
+            for address, dependees in sorted(address_to_dependees.items())
         )
     )
 
@@ -71,22 +111,18 @@ class Dependees(DeduplicatedCollection[Address]):
 def find_dependees(
     request: DependeesRequest, address_to_dependees: AddressToDependees
 ) -> Dependees:
-    check = set(request.addresses)
-    known_dependents: Set[Address] = set()
-    while True:
-        dependents = set(known_dependents)
-        for target in check:
-            target_dependees = address_to_dependees.mapping.get(target, FrozenOrderedSet())
-            dependents.update(target_dependees)
-        check = dependents - known_dependents
-        if not check or not request.transitive:
-            result = (
-                dependents | set(request.addresses)
-                if request.include_roots
-                else dependents - set(request.addresses)
-            )
-            return Dependees(result)
-        known_dependents = dependents
+    roots = set(request.addresses)
+    dependees: Set[Address] = set()
+    queue = deque(roots)
+    while queue:
+        address = queue.popleft()
+        for dependee in address_to_dependees.mapping.get(address, ()):
+            if dependee in dependees:
+                continue
+            dependees.add(dependee)
+            if request.transitive:
+                queue.append(dependee)
+    return Dependees(dependees | roots if request.include_roots else dependees - roots)
 
 
 class DependeesOutputFormat(Enum):
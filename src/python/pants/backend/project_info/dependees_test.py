@@ -4,11 +4,16 @@
 from textwrap import dedent
 from typing import List
 
-from pants.backend.project_info.dependees import DependeesGoal
+from pants.backend.project_info.dependees import AddressToDependees, Dependees, DependeesGoal
 from pants.backend.project_info.dependees import DependeesOutputFormat as OutputFormat
+from pants.backend.project_info.dependees import DependeesRequest, find_dependees
 from pants.backend.project_info.dependees import rules as dependee_rules
+from pants.engine.addresses import Address
 from pants.engine.target import Dependencies, Target
+from pants.testutil.rule_runner import run_rule_with_mocks
 from pants.testutil.test_base import TestBase
+from pants.util.frozendict import FrozenDict
+from pants.util.ordered_set import FrozenOrderedSet
 
 
 class MockTarget(Target):
@@ -139,3 +144,31 @@ class DependeesTest(TestBase):
                 }"""
             ).splitlines(),
         )
+
+
+def test_find_dependees_with_cycle() -> None:
+    a, b, c, d = (Address(name) for name in "abcd")
+    # `d` depends on `c`, which is in a cycle with `b`, which depends on `a`.
+    address_to_dependees = AddressToDependees(
+        FrozenDict(
+            {
+                a: FrozenOrderedSet([b]),
+                b: FrozenOrderedSet([c]),
+                c: FrozenOrderedSet([b, d]),
+            }
+        )
+    )
+
+    def assert_dependees(
+        roots: List[Address], expected: List[Address], *, transitive: bool, include_roots: bool
+    ) -> None:
+        request = DependeesRequest(roots, transitive=transitive, include_roots=include_roots)
+        result = run_rule_with_mocks(find_dependees, rule_args=[request, address_to_dependees])
+        assert result == Dependees(expected)
+
+    assert_dependees([a], [b], transitive=False, include_roots=False)
+    assert_dependees([a], [a, b], transitive=False, include_roots=True)
+    assert_dependees([a], [b, c, d], transitive=True, include_roots=False)
+    assert_dependees([b], [c, d], transitive=True, include_roots=False)
+    assert_dependees([b], [b, c, d], transitive=True, include_roots=True)
+    assert_dependees([d], [], transitive=True, include_roots=False)
@@ -0,0 +1,173 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import hashlib
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Callable, ClassVar, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from pants.backend.python.dependency_inference.import_parser import ParsedPythonImports
+from pants.util.dirutil import safe_mkdir
+from pants.util.ordered_set import FrozenOrderedSet
+
+logger = logging.getLogger(__name__)
+
+# Bump this whenever `find_python_imports` changes in a way that would produce different results
+# for the same input, so that entries written by older versions of Pants are ignored.
+PARSER_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ImportParseCacheKey:
+    """Identifies the result of parsing one file's imports.
+
+    The module name is part of the key because it determines how relative imports are resolved.
+    """
+
+    content_digest: str
+    module_name: str
+
+    @classmethod
+    def create(cls, content: bytes, *, module_name: str) -> "ImportParseCacheKey":
+        return cls(hashlib.sha256(content).hexdigest(), module_name)
+
+
+class ImportParseCache:
+    """A persistent, content-addressed cache of `ParsedPythonImports`.
+
+    The cache is backed by a SQLite database so that parse results survive pantsd restarts and may
+    be shared between concurrent Pants runs. Entries are additionally keyed by the parser version,
+    which includes the interpreter's version because that determines which syntax `ast` accepts.
+
+    The cache is best-effort: any error reading or writing the database is logged and treated as a
+    cache miss.
+    """
+
+    _instances: ClassVar[Dict[str, "ImportParseCache"]] = {}
+    _instances_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._parser = f"{PARSER_VERSION}-py{sys.version_info[0]}.{sys.version_info[1]}"
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._disabled = False
+
+    @classmethod
+    def for_directory(cls, cache_dir: str) -> "ImportParseCache":
+        """Return the shared cache instance persisted in the given directory."""
+        path = os.path.join(os.path.abspath(cache_dir), "parsed_imports.db")
+        with cls._instances_lock:
+            instance = cls._instances.get(path)
+            if instance is None:
+                instance = cls._instances[path] = cls(path)
+            return instance
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        # NB: Must be called with `self._lock` held.
+        if self._connection is None and not self._disabled:
+            try:
+                safe_mkdir(os.path.dirname(self._path))
+                connection = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS parsed_imports ("
+                    "parser TEXT NOT NULL, "
+                    "digest TEXT NOT NULL, "
+                    "module TEXT NOT NULL, "
+                    "explicit_imports TEXT NOT NULL, "
+                    "inferred_imports TEXT NOT NULL, "
+                    "PRIMARY KEY (parser, digest, module)"
+                    ") WITHOUT ROWID"
+                )
+                connection.commit()
+                self._connection = connection
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(
+                    f"Disabling the Python import parse cache at {self._path} because it could "
+                    f"not be opened: {e}"
+                )
+                self._disabled = True
+        return self._connection
+
+    def get_many(
+        self, keys: Iterable[ImportParseCacheKey]
+    ) -> Dict[ImportParseCacheKey, ParsedPythonImports]:
+        """Return the cached results for whichever of the given keys are present."""
+        result: Dict[ImportParseCacheKey, ParsedPythonImports] = {}
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return result
+            try:
+                for key in keys:
+                    row = connection.execute(
+                        "SELECT explicit_imports, inferred_imports FROM parsed_imports "
+                        "WHERE parser = ? AND digest = ? AND module = ?",
+                        (self._parser, key.content_digest, key.module_name),
+                    ).fetchone()
+                    if row is not None:
+                        result[key] = ParsedPythonImports(
+                            explicit_imports=_decode_imports(row[0]),
+                            inferred_imports=_decode_imports(row[1]),
+                        )
+            except sqlite3.Error as e:
+                logger.debug(f"Failed to read from the Python import parse cache: {e}")
+        return result
+
+    def put_many(self, entries: Mapping[ImportParseCacheKey, ParsedPythonImports]) -> None:
+        """Persist the given parse results."""
+        if not entries:
+            return
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO parsed_imports VALUES (?, ?, ?, ?, ?)",
+                        (
+                            (
+                                self._parser,
+                                key.content_digest,
+                                key.module_name,
+                                _encode_imports(parsed.explicit_imports),
+                                _encode_imports(parsed.inferred_imports),
+                            )
+                            for key, parsed in entries.items()
+                        ),
+                    )
+            except sqlite3.Error as e:
+                logger.debug(f"Failed to write to the Python import parse cache: {e}")
+
+
+def _encode_imports(imports: Iterable[str]) -> str:
+    return "\n".join(imports)
+
+
+def _decode_imports(encoded: str) -> FrozenOrderedSet[str]:
+    return FrozenOrderedSet(encoded.split("\n") if encoded else ())
+
+
+def lookup_or_parse(
+    cache: Optional[ImportParseCache],
+    keys: Tuple[ImportParseCacheKey, ...],
+    parse_misses: Callable[[Sequence[int]], Iterable[ParsedPythonImports]],
+) -> Tuple[ParsedPythonImports, ...]:
+    """Return the parse result for each key, parsing only those which are not already cached.
+
+    `parse_misses` is called with the indexes of the keys which were not found in the cache, and
+    must return their parse results in the same order.
+    """
+    cached = cache.get_many(keys) if cache else {}
+    miss_indexes = [i for i, key in enumerate(keys) if key not in cached]
+    parsed = dict(zip((keys[i] for i in miss_indexes), parse_misses(miss_indexes)))
+    if cache:
+        cache.put_many(parsed)
+    return tuple(cached[key] if key in cached else parsed[key] for key in keys)
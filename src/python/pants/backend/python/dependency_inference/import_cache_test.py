@@ -0,0 +1,81 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from typing import List, Sequence
+
+from pants.backend.python.dependency_inference.import_cache import (
+    ImportParseCache,
+    ImportParseCacheKey,
+    lookup_or_parse,
+)
+from pants.backend.python.dependency_inference.import_parser import (
+    ParsedPythonImports,
+    find_python_imports,
+)
+from pants.util.contextutil import temporary_dir
+from pants.util.ordered_set import FrozenOrderedSet
+
+
+def test_key_includes_module_name() -> None:
+    content = b"from . import sibling"
+    assert ImportParseCacheKey.create(content, module_name="a.b") == ImportParseCacheKey.create(
+        content, module_name="a.b"
+    )
+    assert ImportParseCacheKey.create(content, module_name="a.b") != ImportParseCacheKey.create(
+        content, module_name="c.d"
+    )
+
+
+def test_round_trip() -> None:
+    parsed = ParsedPythonImports(
+        explicit_imports=FrozenOrderedSet(["os.path", "project.demo.Demo"]),
+        inferred_imports=FrozenOrderedSet(),
+    )
+    key = ImportParseCacheKey.create(b"import os.path", module_name="project.app")
+    missing = ImportParseCacheKey.create(b"import sys", module_name="project.app")
+    with temporary_dir() as tmpdir:
+        ImportParseCache(f"{tmpdir}/parsed_imports.db").put_many({key: parsed})
+        # A new instance reads from the same database, as would a restarted pantsd.
+        assert ImportParseCache(f"{tmpdir}/parsed_imports.db").get_many([key, missing]) == {
+            key: parsed
+        }
+
+
+def test_for_directory_is_shared() -> None:
+    with temporary_dir() as tmpdir:
+        assert ImportParseCache.for_directory(tmpdir) is ImportParseCache.for_directory(tmpdir)
+
+
+def test_lookup_or_parse_only_parses_misses() -> None:
+    sources = ["import os", "import sys", "import json"]
+    keys = tuple(ImportParseCacheKey.create(s.encode(), module_name="app") for s in sources)
+    parse_calls: List[Sequence[int]] = []
+
+    def parse_misses(miss_indexes: Sequence[int]) -> List[ParsedPythonImports]:
+        parse_calls.append(tuple(miss_indexes))
+        return [find_python_imports(sources[i], module_name="app") for i in miss_indexes]
+
+    with temporary_dir() as tmpdir:
+        cache = ImportParseCache(f"{tmpdir}/parsed_imports.db")
+        lookup_or_parse(cache, keys[:2], parse_misses)
+        result = lookup_or_parse(cache, keys, parse_misses)
+    assert parse_calls == [(0, 1), (2,)]
+    assert [list(r.explicit_imports) for r in result] == [["os"], ["sys"], ["json"]]
+
+
+def test_lookup_or_parse_without_cache() -> None:
+    keys = (ImportParseCacheKey.create(b"import os", module_name="app"),)
+    result = lookup_or_parse(
+        None, keys, lambda miss_indexes: [find_python_imports("import os", module_name="app")]
+    )
+    assert list(result[0].explicit_imports) == ["os"]
+
+
+def test_unusable_cache_dir_is_a_miss() -> None:
+    with temporary_dir() as tmpdir:
+        with open(f"{tmpdir}/not_a_dir", "w") as fp:
+            fp.write("")
+        cache = ImportParseCache(f"{tmpdir}/not_a_dir/parsed_imports.db")
+        key = ImportParseCacheKey.create(b"import os", module_name="app")
+        cache.put_many({key: find_python_imports("import os", module_name="app")})
+        assert cache.get_many([key]) == {}
@@ -2,10 +2,15 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 import ast as ast3
+import logging
+import multiprocessing
 import re
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from typing import Optional, Set, Tuple
+from typing import ClassVar, Dict, List, Optional, Sequence, Set, Tuple
 
 from typed_ast import ast27
 
@@ -13,6 +18,8 @@ from pants.util.memo import memoized_property
 from pants.util.ordered_set import FrozenOrderedSet
 from pants.util.strutil import ensure_text
 
+logger = logging.getLogger(__name__)
+
 
 class ImportParseError(ValueError):
     pass
@@ -71,6 +78,97 @@ def find_python_imports(source_code: str, *, module_name: str) -> ParsedPythonIm
     )
 
 
+def _find_python_imports_batch(
+    sources: Sequence[Tuple[str, str]]
+) -> List[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    """Parse a batch of `(source_code, module_name)` pairs in a worker process.
+
+    The result is returned as plain tuples so that it is cheap to pickle back to the parent.
+    """
+    result = []
+    for source_code, module_name in sources:
+        parsed = find_python_imports(source_code, module_name=module_name)
+        result.append((tuple(parsed.explicit_imports), tuple(parsed.inferred_imports)))
+    return result
+
+
+class ImportParserPool:
+    """A persistent pool of worker processes which parse imports in parallel.
+
+    Parsing is CPU bound and holds the GIL, so when run in the rule thread, concurrent inference
+    requests end up parsing one file at a time. Sending batches of sources to this pool instead
+    releases the GIL while waiting, which lets parsing scale with the number of cores.
+
+    Workers are started with the `spawn` method, as forking a multithreaded process like pantsd is
+    not safe.
+    """
+
+    _instances: ClassVar[Dict[int, "ImportParserPool"]] = {}
+    _instances_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, processes: int) -> None:
+        self._processes = processes
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def for_processes(cls, processes: int) -> "ImportParserPool":
+        """Return the shared pool with the given number of worker processes."""
+        with cls._instances_lock:
+            instance = cls._instances.get(processes)
+            if instance is None:
+                instance = cls._instances[processes] = cls(processes)
+            return instance
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def find_python_imports(
+        self, sources: Sequence[Tuple[str, str]]
+    ) -> Tuple[ParsedPythonImports, ...]:
+        """Parse the imports of each `(source_code, module_name)` pair, in order."""
+        if not sources:
+            return ()
+        # Split the sources into one chunk per worker, so that a large batch uses every worker
+        # while a small batch does not pay for more round trips than necessary.
+        chunk_size = -(-len(sources) // self._processes)
+        chunks = [sources[i : i + chunk_size] for i in range(0, len(sources), chunk_size)]
+        executor = self._get_executor()
+        try:
+            results = [
+                parsed
+                for chunk in executor.map(_find_python_imports_batch, chunks)
+                for parsed in chunk
+            ]
+        except BrokenProcessPool as e:
+            # A worker died (e.g. it was OOM killed). Fall back to parsing in this process, and
+            # start a fresh pool for the next batch.
+            logger.warning(f"Python import parser worker pool failed, parsing in-process: {e}")
+            self._reset_executor(executor)
+            return tuple(
+                find_python_imports(source_code, module_name=module_name)
+                for source_code, module_name in sources
+            )
+        return tuple(
+            ParsedPythonImports(
+                explicit_imports=FrozenOrderedSet(explicit_imports),
+                inferred_imports=FrozenOrderedSet(inferred_imports),
+            )
+            for explicit_imports, inferred_imports in results
+        )
+
+
 # This regex is used to infer imports from strings, e.g.
 #  `importlib.import_module("example.subdir.Foo")`.
 _INFERRED_IMPORT_REGEX = re.compile(r"^([a-z_][a-z_\d]*\.){2,}[a-zA-Z_]\w*$")
@@ -6,7 +6,10 @@ from textwrap import dedent
 
 import pytest
 
-from pants.backend.python.dependency_inference.import_parser import find_python_imports
+from pants.backend.python.dependency_inference.import_parser import (
+    ImportParserPool,
+    find_python_imports,
+)
 
 
 def test_normal_imports() -> None:
@@ -164,3 +167,17 @@ def test_works_with_python38() -> None:
     )
     assert set(imports.explicit_imports) == {"demo", "project.demo.Demo"}
     assert set(imports.inferred_imports) == {"dep.from.str"}
+
+
+def test_parser_pool() -> None:
+    sources = [
+        ("import os\nfrom . import sibling", "project.app"),
+        ("import requests", "project.other"),
+        ("from typing import List\nx = 'project.demo.Demo'", "project.util"),
+    ]
+    pool = ImportParserPool(processes=2)
+    assert pool.find_python_imports([]) == ()
+    assert pool.find_python_imports(sources) == tuple(
+        find_python_imports(source_code, module_name=module_name)
+        for source_code, module_name in sources
+    )
@@ -1,9 +1,10 @@
 # Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import PurePath
-from typing import Dict, Optional, Set
+from typing import DefaultDict, Dict, List, Optional, Set, Tuple
 
 from pants.backend.python.target_types import (
     ModuleMappingField,
@@ -13,14 +14,16 @@ from pants.backend.python.target_types import (
 from pants.base.specs import AddressSpecs, DescendantAddresses
 from pants.core.util_rules.source_files import SourceFilesRequest
 from pants.core.util_rules.stripped_source_files import StrippedSourceFiles
-from pants.engine.addresses import Address
+from pants.engine.addresses import Address, Addresses
+from pants.engine.collection import DeduplicatedCollection
 from pants.engine.rules import Get, MultiGet, collect_rules, rule
 from pants.engine.target import Targets
 from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
+from pants.util.memo import memoized_property
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, order=True)
 class PythonModule:
     module: str
 
@@ -62,28 +65,80 @@ class FirstPartyModuleToAddressMapping:
         return self.mapping.get(parent_module)
 
 
-@rule(desc="Creating map of first party targets to Python modules", level=LogLevel.DEBUG)
-async def map_first_party_modules_to_addresses() -> FirstPartyModuleToAddressMapping:
-    all_expanded_targets = await Get(Targets, AddressSpecs([DescendantAddresses("")]))
-    candidate_targets = tuple(tgt for tgt in all_expanded_targets if tgt.has_field(PythonSources))
+@dataclass(frozen=True)
+class FirstPartyModuleMappingShardRequest:
+    """A request to map the modules owned by the targets declared in a single directory."""
+
+    addresses: Addresses
+
+
+@dataclass(frozen=True)
+class FirstPartyModuleMappingShard:
+    """The modules owned by the targets declared in a single directory.
+
+    Unlike `FirstPartyModuleToAddressMapping`, every owner of a module is recorded, because
+    ambiguity can only be detected once all shards are merged.
+    """
+
+    mapping: FrozenDict[str, Tuple[Address, ...]]
+
+
+@rule(
+    desc="Creating map of first party targets to Python modules in a directory",
+    level=LogLevel.DEBUG,
+)
+async def map_first_party_modules_in_shard(
+    request: FirstPartyModuleMappingShardRequest,
+) -> FirstPartyModuleMappingShard:
+    expanded_targets = await Get(Targets, Addresses, request.addresses)
+    candidate_targets = tuple(tgt for tgt in expanded_targets if tgt.has_field(PythonSources))
     stripped_sources_per_explicit_target = await MultiGet(
         Get(StrippedSourceFiles, SourceFilesRequest([tgt[PythonSources]]))
         for tgt in candidate_targets
     )
 
-    modules_to_addresses: Dict[str, Address] = {}
-    modules_with_multiple_owners: Set[str] = set()
+    modules_to_addresses: DefaultDict[str, List[Address]] = defaultdict(list)
     for tgt, stripped_sources in zip(candidate_targets, stripped_sources_per_explicit_target):
         for stripped_f in stripped_sources.snapshot.files:
             module = PythonModule.create_from_stripped_path(PurePath(stripped_f)).module
-            if module in modules_to_addresses:
+            modules_to_addresses[module].append(tgt.address)
+    return FirstPartyModuleMappingShard(
+        FrozenDict(
+            (module, tuple(addresses)) for module, addresses in sorted(modules_to_addresses.items())
+        )
+    )
+
+
+@rule(desc="Creating map of first party targets to Python modules", level=LogLevel.DEBUG)
+async def map_first_party_modules_to_addresses() -> FirstPartyModuleToAddressMapping:
+    # NB: We compute the mapping for each directory separately and then merge the results. This
+    # means that a change to one directory's BUILD file or sources only recomputes that directory's
+    # shard, and the merged mapping will be equal to its previous value unless that shard's modules
+    # changed, which allows the engine to avoid re-running inference for every file.
+    all_addresses = await Get(Addresses, AddressSpecs([DescendantAddresses("")]))
+    addresses_by_directory: DefaultDict[str, List[Address]] = defaultdict(list)
+    for address in all_addresses:
+        addresses_by_directory[address.spec_path].append(address)
+    shards = await MultiGet(
+        Get(
+            FirstPartyModuleMappingShard,
+            FirstPartyModuleMappingShardRequest(Addresses(sorted(addresses))),
+        )
+        for _, addresses in sorted(addresses_by_directory.items())
+    )
+
+    modules_to_addresses: Dict[str, Address] = {}
+    modules_with_multiple_owners: Set[str] = set()
+    for shard in shards:
+        for module, owners in shard.mapping.items():
+            if len(owners) > 1 or module in modules_to_addresses:
                 modules_with_multiple_owners.add(module)
             else:
-                modules_to_addresses[module] = tgt.address
+                modules_to_addresses[module] = owners[0]
 
     # Remove modules with ambiguous owners.
     for module in modules_with_multiple_owners:
-        modules_to_addresses.pop(module)
+        modules_to_addresses.pop(module, None)
     return FirstPartyModuleToAddressMapping(FrozenDict(sorted(modules_to_addresses.items())))
 
 
@@ -128,6 +183,74 @@ async def map_third_party_modules_to_addresses() -> ThirdPartyModuleToAddressMap
     return ThirdPartyModuleToAddressMapping(FrozenDict(sorted(modules_to_addresses.items())))
 
 
+class _ModuleTrieNode:
+    __slots__ = ("children", "first_party", "third_party")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_ModuleTrieNode"] = {}
+        self.first_party: Optional[Address] = None
+        self.third_party: Optional[Address] = None
+
+
+@dataclass(frozen=True)
+class ModuleToAddressIndex:
+    """A trie of dotted module names, used to find the owners of both first- and third-party
+    modules with a single walk over each module's name.
+
+    A third-party module is owned by the target that owns it or its nearest ancestor, whereas a
+    first-party module is owned by the target that owns it or its direct parent. If both a third-
+    and a first-party target match, the third-party target wins.
+    """
+
+    first_party: FirstPartyModuleToAddressMapping
+    third_party: ThirdPartyModuleToAddressMapping
+
+    @memoized_property
+    def _root(self) -> _ModuleTrieNode:
+        root = _ModuleTrieNode()
+
+        def node_for(module: str) -> _ModuleTrieNode:
+            node = root
+            for part in module.split("."):
+                child = node.children.get(part)
+                if child is None:
+                    child = node.children[part] = _ModuleTrieNode()
+                node = child
+            return node
+
+        for module, address in self.first_party.mapping.items():
+            node_for(module).first_party = address
+        for module, address in self.third_party.mapping.items():
+            node_for(module).third_party = address
+        return root
+
+    def address_for_module(self, module: str) -> Optional[Address]:
+        parts = module.split(".")
+        direct_parent_depth = len(parts) - 2
+        first_party_address: Optional[Address] = None
+        third_party_address: Optional[Address] = None
+        node = self._root
+        for depth, part in enumerate(parts):
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            # Deeper matches are more specific, so they override shallower ones.
+            if node.third_party is not None:
+                third_party_address = node.third_party
+            if depth >= direct_parent_depth and node.first_party is not None:
+                first_party_address = node.first_party
+        return third_party_address or first_party_address
+
+
+@rule(desc="Creating index of Python modules to owning targets", level=LogLevel.DEBUG)
+async def index_modules_to_addresses(
+    first_party_mapping: FirstPartyModuleToAddressMapping,
+    third_party_mapping: ThirdPartyModuleToAddressMapping,
+) -> ModuleToAddressIndex:
+    return ModuleToAddressIndex(first_party_mapping, third_party_mapping)
+
+
 @dataclass(frozen=True)
 class PythonModuleOwner:
     """The target that owns a Python module.
@@ -141,17 +264,30 @@ class PythonModuleOwner:
 
 @rule
 async def map_module_to_address(
-    module: PythonModule,
-    first_party_mapping: FirstPartyModuleToAddressMapping,
-    third_party_mapping: ThirdPartyModuleToAddressMapping,
+    module: PythonModule, index: ModuleToAddressIndex
 ) -> PythonModuleOwner:
-    third_party_address = third_party_mapping.address_for_module(module.module)
-    if third_party_address:
-        return PythonModuleOwner(third_party_address)
-    first_party_address = first_party_mapping.address_for_module(module.module)
-    if first_party_address:
-        return PythonModuleOwner(first_party_address)
-    return PythonModuleOwner(address=None)
+    return PythonModuleOwner(index.address_for_module(module.module))
+
+
+class PythonModules(DeduplicatedCollection[PythonModule]):
+    """A batch of modules, e.g. all of the imports of a target, to find the owners of at once."""
+
+    sort_input = True
+
+
+class PythonModuleOwners(DeduplicatedCollection[Address]):
+    """The targets that own any of a batch of Python modules.
+
+    Modules without an unambiguous owner do not contribute an address.
+    """
+
+
+@rule
+async def map_modules_to_addresses(
+    modules: PythonModules, index: ModuleToAddressIndex
+) -> PythonModuleOwners:
+    addresses = (index.address_for_module(module.module) for module in modules)
+    return PythonModuleOwners(address for address in addresses if address is not None)
 
 
 def rules():
@@ -9,11 +9,17 @@ import pytest
 
 from pants.backend.python.dependency_inference.module_mapper import (
     FirstPartyModuleToAddressMapping,
+    ModuleToAddressIndex,
     PythonModule,
     PythonModuleOwner,
+    PythonModuleOwners,
+    PythonModules,
     ThirdPartyModuleToAddressMapping,
+    index_modules_to_addresses,
+    map_first_party_modules_in_shard,
     map_first_party_modules_to_addresses,
     map_module_to_address,
+    map_modules_to_addresses,
     map_third_party_modules_to_addresses,
 )
 from pants.backend.python.target_types import PythonLibrary, PythonRequirementLibrary
@@ -72,6 +78,39 @@ def test_third_party_modules_mapping() -> None:
     assert mapping.address_for_module("pants.task.task.Task") == pants_addr
 
 
+def test_module_to_address_index() -> None:
+    util_addr = Address.parse("src/python/util:strutil")
+    test_addr = Address.parse("tests/python/project_test:test")
+    colors_addr = Address.parse("//:ansicolors")
+    pants_addr = Address.parse("//:pantsbuild")
+    shadowed_addr = Address.parse("src/python/colors:colors")
+    index = ModuleToAddressIndex(
+        FirstPartyModuleToAddressMapping(
+            FrozenDict(
+                {
+                    "util.strutil": util_addr,
+                    "project_test.test": test_addr,
+                    "colors.red": shadowed_addr,
+                }
+            )
+        ),
+        ThirdPartyModuleToAddressMapping(FrozenDict({"colors": colors_addr, "pants": pants_addr})),
+    )
+    # First-party modules only consider their direct parent.
+    assert index.address_for_module("util.strutil") == util_addr
+    assert index.address_for_module("util.strutil.ensure_text") == util_addr
+    assert index.address_for_module("util") is None
+    assert index.address_for_module("project_test.test.TestDemo") == test_addr
+    assert index.address_for_module("project_test.test.TestDemo.method") is None
+    # Third-party modules consider every ancestor.
+    assert index.address_for_module("pants") == pants_addr
+    assert index.address_for_module("pants.task.task.Task") == pants_addr
+    # Third-party owners take precedence over first-party owners.
+    assert index.address_for_module("colors.red") == colors_addr
+    assert index.address_for_module("typing") is None
+    assert index.address_for_module("") is None
+
+
 class ModuleMapperTest(TestBase):
     @classmethod
     def rules(cls):
@@ -79,12 +118,16 @@ class ModuleMapperTest(TestBase):
             *super().rules(),
             *stripped_source_files.rules(),
             *source_files.rules(),
+            map_first_party_modules_in_shard,
             map_first_party_modules_to_addresses,
             map_module_to_address,
+            map_modules_to_addresses,
             map_third_party_modules_to_addresses,
+            index_modules_to_addresses,
             QueryRule(FirstPartyModuleToAddressMapping, (OptionsBootstrapper,)),
             QueryRule(ThirdPartyModuleToAddressMapping, (OptionsBootstrapper,)),
             QueryRule(PythonModuleOwner, (PythonModule, OptionsBootstrapper)),
+            QueryRule(PythonModuleOwners, (PythonModules, OptionsBootstrapper)),
         )
 
     @classmethod
@@ -215,3 +258,32 @@ class ModuleMapperTest(TestBase):
         assert get_owner("script.Demo") == Address(
             "", relative_file_path="script.py", target_name="script"
         )
+
+    def test_map_modules_to_addresses(self) -> None:
+        options_bootstrapper = create_options_bootstrapper(
+            args=["--source-root-patterns=['src/python']"]
+        )
+        self.add_to_build_file(
+            "3rdparty/python",
+            dedent(
+                """\
+                python_requirement_library(
+                  name='ansicolors',
+                  requirements=['ansicolors==1.21'],
+                  module_mapping={'ansicolors': ['colors']},
+                )
+                """
+            ),
+        )
+        self.create_files("src/python/project", ["app.py", "util.py"])
+        self.add_to_build_file("src/python/project", "python_library()")
+        modules = PythonModules(
+            PythonModule(module)
+            for module in ("colors.red", "colors", "project.app.main", "project.util", "typing")
+        )
+        result = self.request_product(PythonModuleOwners, [modules, options_bootstrapper])
+        assert set(result) == {
+            Address.parse("3rdparty/python:ansicolors"),
+            Address("src/python/project", relative_file_path="app.py", target_name="project"),
+            Address("src/python/project", relative_file_path="util.py", target_name="project"),
+        }
@@ -1,22 +1,36 @@
 # Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
-import itertools
+import os
 from pathlib import PurePath
-from typing import List, cast
+from typing import Iterable, List, Optional, Sequence, cast
 
 from pants.backend.python.dependency_inference import module_mapper
-from pants.backend.python.dependency_inference.import_parser import find_python_imports
-from pants.backend.python.dependency_inference.module_mapper import PythonModule, PythonModuleOwner
+from pants.backend.python.dependency_inference.import_cache import (
+    ImportParseCache,
+    ImportParseCacheKey,
+    lookup_or_parse,
+)
+from pants.backend.python.dependency_inference.import_parser import (
+    ImportParserPool,
+    ParsedPythonImports,
+    find_python_imports,
+)
+from pants.backend.python.dependency_inference.module_mapper import (
+    PythonModule,
+    PythonModuleOwners,
+    PythonModules,
+)
 from pants.backend.python.dependency_inference.python_stdlib.combined import combined_stdlib
 from pants.backend.python.rules import ancestor_files
 from pants.backend.python.rules.ancestor_files import AncestorFiles, AncestorFilesRequest
 from pants.backend.python.target_types import PythonSources, PythonTestsSources
+from pants.base.build_environment import get_pants_cachedir
 from pants.core.util_rules.source_files import SourceFilesRequest
 from pants.core.util_rules.stripped_source_files import StrippedSourceFiles
 from pants.engine.fs import Digest, DigestContents
 from pants.engine.internals.graph import Owners, OwnersRequest
-from pants.engine.rules import Get, MultiGet, collect_rules, rule
+from pants.engine.rules import Get, collect_rules, rule
 from pants.engine.target import (
     HydratedSources,
     HydrateSourcesRequest,
@@ -75,6 +89,29 @@ class PythonInference(Subsystem):
                 "Infer a test target's dependencies on any conftest.py files in parent directories."
             ),
         )
+        register(
+            "--parse-cache-dir",
+            advanced=True,
+            default=os.path.join(get_pants_cachedir(), "python_imports"),
+            help=(
+                "Directory in which to persist the imports parsed from each Python source file, "
+                "keyed by the file's content. This allows a new pantsd or CI run to reuse earlier "
+                "parse results rather than re-parsing unchanged files. Set to the empty string to "
+                "disable the cache."
+            ),
+        )
+        register(
+            "--parse-processes",
+            advanced=True,
+            type=int,
+            default=0,
+            help=(
+                "The number of worker processes to use to parse imports from Python sources. "
+                "Parsing in worker processes lets dependency inference scale with the number of "
+                "cores, at the cost of the memory used by each worker. If 0, parse in the Pants "
+                "process."
+            ),
+        )
 
     @property
     def imports(self) -> bool:
@@ -92,6 +129,20 @@ class PythonInference(Subsystem):
     def conftests(self) -> bool:
         return cast(bool, self.options.conftests)
 
+    @property
+    def parse_cache(self) -> Optional[ImportParseCache]:
+        cache_dir = cast(str, self.options.parse_cache_dir)
+        return ImportParseCache.for_directory(cache_dir) if cache_dir else None
+
+    @property
+    def parser_pool(self) -> Optional[ImportParserPool]:
+        processes = cast(int, self.options.parse_processes)
+        if processes < 0:
+            raise ValueError(
+                f"The option `--python-infer-parse-processes` must be >= 0, but was {processes}."
+            )
+        return ImportParserPool.for_processes(processes) if processes else None
+
 
 class InferPythonDependencies(InferDependenciesRequest):
     infer_from = PythonSources
@@ -111,28 +162,43 @@ async def infer_python_dependencies(
     )
     digest_contents = await Get(DigestContents, Digest, stripped_sources.snapshot.digest)
 
-    owner_requests: List[Get[PythonModuleOwner, PythonModule]] = []
-    for file_content, module in zip(digest_contents, modules):
-        file_imports_obj = find_python_imports(
-            file_content.content.decode(), module_name=module.module
-        )
+    parser_pool = python_inference.parser_pool
+
+    def parse_misses(miss_indexes: Sequence[int]) -> Iterable[ParsedPythonImports]:
+        sources = [(digest_contents[i].content.decode(), modules[i].module) for i in miss_indexes]
+        if parser_pool:
+            return parser_pool.find_python_imports(sources)
+        return [
+            find_python_imports(source_code, module_name=module_name)
+            for source_code, module_name in sources
+        ]
+
+    parsed_imports = lookup_or_parse(
+        python_inference.parse_cache,
+        tuple(
+            ImportParseCacheKey.create(file_content.content, module_name=module.module)
+            for file_content, module in zip(digest_contents, modules)
+        ),
+        parse_misses,
+    )
+
+    imported_modules: List[PythonModule] = []
+    for file_imports_obj in parsed_imports:
         detected_imports = (
             file_imports_obj.all_imports
             if python_inference.string_imports
             else file_imports_obj.explicit_imports
         )
-        owner_requests.extend(
-            Get(PythonModuleOwner, PythonModule(imported_module))
+        imported_modules.extend(
+            PythonModule(imported_module)
             for imported_module in detected_imports
             if imported_module not in combined_stdlib
         )
 
-    owner_per_import = await MultiGet(owner_requests)
-    result = (
-        owner.address
-        for owner in owner_per_import
-        if owner.address and owner.address != request.sources_field.address
-    )
+    # NB: We look up the owners of all imports at once, rather than with one `PythonModuleOwner`
+    # per import, to avoid adding a node to the graph for every import in the repo.
+    owners = await Get(PythonModuleOwners, PythonModules(imported_modules))
+    result = (address for address in owners if address != request.sources_field.address)
     return InferredDependencies(result, sibling_dependencies_inferrable=True)
 
 
@@ -158,12 +224,8 @@ async def infer_python_init_dependencies(
     # NB: Because the python_sources rules always locate __init__.py files, and will trigger an
     # error for files that have content but have not already been included via a dependency, we
     # don't need to error for unowned files here.
-    owners = await MultiGet(
-        Get(Owners, OwnersRequest((f,))) for f in extra_init_files.snapshot.files
-    )
-    return InferredDependencies(
-        itertools.chain.from_iterable(owners), sibling_dependencies_inferrable=False
-    )
+    owners = await Get(Owners, OwnersRequest(extra_init_files.snapshot.files))
+    return InferredDependencies(owners, sibling_dependencies_inferrable=False)
 
 
 class InferConftestDependencies(InferDependenciesRequest):
@@ -187,13 +249,10 @@ async def infer_python_conftest_dependencies(
 
     # And add dependencies on their owners.
     # NB: Because conftest.py files effectively always have content, we require an owning target.
-    owners = await MultiGet(
-        Get(Owners, OwnersRequest((f,), OwnersNotFoundBehavior.error))
-        for f in extra_conftest_files.snapshot.files
-    )
-    return InferredDependencies(
-        itertools.chain.from_iterable(owners), sibling_dependencies_inferrable=False
+    owners = await Get(
+        Owners, OwnersRequest(extra_conftest_files.snapshot.files, OwnersNotFoundBehavior.error)
     )
+    return InferredDependencies(owners, sibling_dependencies_inferrable=False)
 
 
 def rules():
@@ -16,6 +16,7 @@ from pants.backend.python.rules.pex import (
 )
 from pants.backend.python.rules.python_sources import PythonSourceFiles, PythonSourceFilesRequest
 from pants.backend.python.subsystems.python_tool_base import PythonToolBase
+from pants.core.goals.style_request import stable_batches
 from pants.core.goals.test import (
     ConsoleCoverageReport,
     CoverageData,
@@ -54,7 +55,10 @@ format).
 
 Step 2: Merge the results with `coverage combine`.
 We now have a bunch of individual `PytestCoverageData` values, each with their own `.coverage` file.
-We run `coverage combine` to convert this into a single `.coverage` file.
+We run `coverage combine` to convert this into a single `.coverage` file. To parallelize this, and to
+make it incremental, we combine in a tree: small batches of files are combined in parallel, then
+batches of those results, and so on. The batches are stable across runs, so when one test changes,
+only the combines on its path to the root need to rerun.
 
 Step 3: Generate the report with `coverage {html,xml,console}`.
 All the files in the single merged `.coverage` file are still stripped, and we want to generate a
@@ -209,19 +213,49 @@ class MergedCoverageData:
     coverage_data: Digest
 
 
+# How many `.coverage` files to combine in one process, on average.
+_COMBINE_BATCH_SIZE = 16
+
+
+@dataclass(frozen=True)
+class CoverageDataBatch:
+    """Coverage data to combine in a single process."""
+
+    data: Tuple[PytestCoverageData, ...]
+
+
 @rule(desc="Merge Pytest coverage data", level=LogLevel.DEBUG)
-async def merge_coverage_data(
-    data_collection: PytestCoverageDataCollection, coverage_setup: CoverageSetup
+async def merge_coverage_data(data_collection: PytestCoverageDataCollection) -> MergedCoverageData:
+    level: Sequence[PytestCoverageData] = data_collection
+    while len(level) > 1:
+        batches = stable_batches(level, _COMBINE_BATCH_SIZE)
+        if len(batches) == len(level):
+            # Guarantee progress if, by chance, every item ended its own batch.
+            batches = (tuple(level),)
+        merged = await MultiGet(
+            Get(MergedCoverageData, CoverageDataBatch(batch)) for batch in batches
+        )
+        # Each combined batch is identified by its first address in the next level of the tree.
+        level = [
+            PytestCoverageData(batch[0].address, merged_batch.coverage_data)
+            for batch, merged_batch in zip(batches, merged)
+        ]
+    return MergedCoverageData(level[0].digest)
+
+
+@rule(desc="Merge a batch of Pytest coverage data", level=LogLevel.DEBUG)
+async def merge_coverage_data_batch(
+    batch: CoverageDataBatch, coverage_setup: CoverageSetup
 ) -> MergedCoverageData:
-    if len(data_collection) == 1:
-        return MergedCoverageData(data_collection[0].digest)
+    if len(batch.data) == 1:
+        return MergedCoverageData(batch.data[0].digest)
     # We prefix each .coverage file with its corresponding address to avoid collisions.
     coverage_digests = await MultiGet(
         Get(Digest, AddPrefix(data.digest, prefix=data.address.path_safe_spec))
-        for data in data_collection
+        for data in batch.data
     )
     input_digest = await Get(Digest, MergeDigests((*coverage_digests, coverage_setup.pex.digest)))
-    prefixes = sorted(f"{data.address.path_safe_spec}/.coverage" for data in data_collection)
+    prefixes = sorted(f"{data.address.path_safe_spec}/.coverage" for data in batch.data)
     result = await Get(
         ProcessResult,
         PexProcess(
@@ -2,11 +2,20 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 from textwrap import dedent
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import pytest
 
-from pants.backend.python.rules.coverage import CoverageSubsystem, create_coverage_config
+from pants.backend.python.rules.coverage import (
+    CoverageDataBatch,
+    CoverageSubsystem,
+    MergedCoverageData,
+    PytestCoverageData,
+    PytestCoverageDataCollection,
+    create_coverage_config,
+    merge_coverage_data,
+)
+from pants.engine.addresses import Address
 from pants.engine.fs import CreateDigest, Digest, DigestContents, FileContent, PathGlobs
 from pants.testutil.option_util import create_subsystem
 from pants.testutil.rule_runner import MockGet, run_rule_with_mocks
@@ -134,3 +143,49 @@ def test_invalid_relative_files_setting() -> None:
         ValueError, match="relative_files under the 'run' section must be set to True"
     ):
         run_create_coverage_config_rule(coverage_config=config)
+
+
+def run_merge_coverage_data_rule(
+    data: List[PytestCoverageData],
+) -> Tuple[Digest, List[CoverageDataBatch]]:
+    batches: List[CoverageDataBatch] = []
+
+    def mock_merge_batch(batch: CoverageDataBatch) -> MergedCoverageData:
+        batches.append(batch)
+        fingerprint = "+".join(data.digest.fingerprint for data in batch.data)
+        return MergedCoverageData(Digest(f"({fingerprint})", 0))
+
+    result = run_rule_with_mocks(
+        merge_coverage_data,
+        rule_args=[PytestCoverageDataCollection(data)],
+        mock_gets=[
+            MockGet(
+                product_type=MergedCoverageData,
+                subject_type=CoverageDataBatch,
+                mock=mock_merge_batch,
+            )
+        ],
+    )
+    return result.coverage_data, batches
+
+
+def test_merge_coverage_data_in_tree() -> None:
+    data = [
+        PytestCoverageData(Address(f"tests/t{i:03}"), Digest(f"d{i:03}", 0)) for i in range(500)
+    ]
+    merged, batches = run_merge_coverage_data_rule(data)
+    # Every file is combined exactly once, in batches rather than in one process.
+    for i in range(500):
+        assert merged.fingerprint.count(f"d{i:03}") == 1
+    assert all(len(batch.data) <= 32 for batch in batches)
+    assert len(batches) > 1
+
+    # After one test's coverage changes, only the batches on its path to the root are new.
+    data[250] = PytestCoverageData(data[250].address, Digest("changed", 0))
+    _, new_batches = run_merge_coverage_data_rule(data)
+    assert len([batch for batch in new_batches if batch not in batches]) <= 3
+
+
+def test_merge_single_coverage_data() -> None:
+    data = PytestCoverageData(Address("tests"), Digest("d", 0))
+    assert run_merge_coverage_data_rule([data]) == (data.digest, [])
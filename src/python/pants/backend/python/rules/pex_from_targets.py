@@ -195,7 +195,8 @@ async def pex_from_targets(request: PexFromTargetsRequest, python_setup: PythonS
         # See: https://www.python.org/dev/peps/pep-0503/#normalized-names
 
         exact_req_projects = {
-            canonicalize_project_name(Requirement.parse(req).project_name) for req in exact_reqs
+            req: canonicalize_project_name(Requirement.parse(req).project_name)
+            for req in exact_reqs
         }
         constraints_file_contents = await Get(
             DigestContents,
@@ -212,7 +213,7 @@ async def pex_from_targets(request: PexFromTargetsRequest, python_setup: PythonS
         constraint_file_projects = {
             canonicalize_project_name(req.project_name) for req in constraints_file_reqs
         }
-        unconstrained_projects = exact_req_projects - constraint_file_projects
+        unconstrained_projects = set(exact_req_projects.values()) - constraint_file_projects
         if unconstrained_projects:
             logger.warning(
                 f"The constraints file {python_setup.requirement_constraints} does not contain "
@@ -223,14 +224,21 @@ async def pex_from_targets(request: PexFromTargetsRequest, python_setup: PythonS
             python_setup.resolve_all_constraints == ResolveAllConstraintsOption.NONDEPLOYABLES
             and request.internal_only
         ):
-            if unconstrained_projects:
-                logger.warning(
-                    "Ignoring resolve_all_constraints setting in [python_setup] scope "
-                    "because constraints file does not cover all requirements."
-                )
-            else:
-                requirements = PexRequirements(str(req) for req in constraints_file_reqs)
-                description = description or f"Resolving {python_setup.requirement_constraints}"
+            # Resolve the entire constraints file, so that every closure with the same
+            # interpreter constraints shares a single requirements PEX. Any requirements that the
+            # constraints file does not cover are resolved along with it, which still results in
+            # one resolve per distinct set of uncovered requirements rather than one per closure.
+            requirements = PexRequirements(
+                [
+                    *(str(req) for req in constraints_file_reqs),
+                    *(
+                        req
+                        for req, project in exact_req_projects.items()
+                        if project in unconstrained_projects
+                    ),
+                ]
+            )
+            description = description or f"Resolving {python_setup.requirement_constraints}"
     elif (
         python_setup.resolve_all_constraints != ResolveAllConstraintsOption.NEVER
         and python_setup.resolve_all_constraints_was_set_explicitly()
@@ -93,6 +93,12 @@ class PexTest(TestBase):
             ["Foo._-BAR==1.0.0", "bar==5.5.5", "baz==2.2.2", "qux==3.4.5"]
         )
 
+        # Requirements which are not in the constraints file are resolved along with it.
+        pex_req3 = get_pex_request("constraints2.txt", ResolveAllConstraintsOption.ALWAYS)
+        assert pex_req3.requirements == PexRequirements(
+            ["foo==1.0.0", "bar==5.5.5", "qux==3.4.5", "baz"]
+        )
+
         with self.assertRaises(ExecutionError) as err:
             get_pex_request(None, ResolveAllConstraintsOption.ALWAYS)
         assert len(err.exception.wrapped_exceptions) == 1
@@ -3,10 +3,13 @@
 
 import itertools
 import logging
+import os
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import PurePath
-from typing import Optional
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, cast
 from uuid import UUID
+from xml.etree import ElementTree
 
 from pants.backend.python.rules.coverage import (
     CoverageConfig,
@@ -25,24 +28,48 @@ from pants.backend.python.rules.python_sources import PythonSourceFiles, PythonS
 from pants.backend.python.subsystems.pytest import PyTest
 from pants.backend.python.target_types import (
     PythonInterpreterCompatibility,
+    PythonRequirementsField,
     PythonTestsSources,
     PythonTestsTimeout,
 )
-from pants.core.goals.test import TestDebugRequest, TestFieldSet, TestResult, TestSubsystem
+from pants.core.goals.style_request import stable_batches
+from pants.core.goals.test import (
+    TestBatchRequest,
+    TestDebugRequest,
+    TestFieldSet,
+    TestResult,
+    TestResults,
+    TestSubsystem,
+)
 from pants.core.util_rules.source_files import SourceFiles, SourceFilesRequest
-from pants.engine.addresses import Addresses
-from pants.engine.fs import AddPrefix, Digest, DigestSubset, MergeDigests, PathGlobs, Snapshot
+from pants.engine.addresses import Address, Addresses
+from pants.engine.fs import (
+    AddPrefix,
+    CreateDigest,
+    Digest,
+    DigestContents,
+    DigestSubset,
+    FileContent,
+    MergeDigests,
+    PathGlobs,
+    Snapshot,
+)
 from pants.engine.internals.uuid import UUIDRequest
 from pants.engine.process import FallibleProcessResult, InteractiveProcess, Process
 from pants.engine.rules import Get, MultiGet, collect_rules, rule
-from pants.engine.target import TransitiveTargets
+from pants.engine.target import TargetClosure
 from pants.engine.unions import UnionRule
 from pants.option.global_options import GlobalOptions
 from pants.python.python_setup import PythonSetup
 from pants.util.logging import LogLevel
+from pants.util.ordered_set import FrozenOrderedSet
+from pants.util.strutil import pluralize
 
 logger = logging.getLogger()
 
+# The JUnit XML written by a batch of tests, which is split into a result per target.
+BATCH_RESULTS_FILE_NAME = "pytest_batch_results.xml"
+
 
 @dataclass(frozen=True)
 class PythonTestFieldSet(TestFieldSet):
@@ -62,9 +89,13 @@ class PythonTestFieldSet(TestFieldSet):
 
 @dataclass(frozen=True)
 class TestSetupRequest:
-    field_set: PythonTestFieldSet
+    field_sets: Tuple[PythonTestFieldSet, ...]
     is_debug: bool
 
+    @property
+    def is_batch(self) -> bool:
+        return len(self.field_sets) > 1
+
 
 @dataclass(frozen=True)
 class TestSetup:
@@ -85,10 +116,14 @@ async def setup_pytest_for_target(
     coverage_subsystem: CoverageSubsystem,
     global_options: GlobalOptions,
 ) -> TestSetup:
-    test_addresses = Addresses((request.field_set.address,))
+    test_addresses = Addresses(field_set.address for field_set in request.field_sets)
 
-    transitive_targets = await Get(TransitiveTargets, Addresses, test_addresses)
-    all_targets = transitive_targets.closure
+    target_closures = await MultiGet(
+        Get(TargetClosure, Address, address) for address in test_addresses
+    )
+    all_targets = FrozenOrderedSet(
+        itertools.chain.from_iterable(target_closure.closure for target_closure in target_closures)
+    )
 
     interpreter_constraints = PexInterpreterConstraints.create_from_compatibility_fields(
         (
@@ -153,10 +188,10 @@ async def setup_pytest_for_target(
         PythonSourceFiles, PythonSourceFilesRequest(all_targets, include_files=True)
     )
 
-    # Get the file names for the test_target so that we can specify to Pytest precisely which files
-    # to test, rather than using auto-discovery.
+    # Get the file names for the test targets so that we can specify to Pytest precisely which
+    # files to test, rather than using auto-discovery.
     field_set_source_files_request = Get(
-        SourceFiles, SourceFilesRequest([request.field_set.sources])
+        SourceFiles, SourceFilesRequest(field_set.sources for field_set in request.field_sets)
     )
 
     (
@@ -190,8 +225,16 @@ async def setup_pytest_for_target(
     output_files = []
 
     results_file_name = None
-    if pytest.options.junit_xml_dir and not request.is_debug:
-        results_file_name = f"{request.field_set.address.path_safe_spec}.xml"
+    if request.is_batch:
+        # The results of a batch are demultiplexed by test file using its JUnit XML, which
+        # requires the test IDs to be relative to the build root.
+        results_file_name = BATCH_RESULTS_FILE_NAME
+        add_opts.append("--rootdir=.")
+    elif not request.is_debug:
+        # We always write JUnit XML, even if `--junit-xml-dir` is not set, because it reports how
+        # long the tests took to run.
+        results_file_name = f"{request.field_sets[0].address.path_safe_spec}.xml"
+    if results_file_name:
         add_opts.extend(
             (f"--junitxml={results_file_name}", "-o", f"junit_family={pytest.options.junit_family}")
         )
@@ -222,6 +265,20 @@ async def setup_pytest_for_target(
         uuid = await Get(UUID, UUIDRequest())
         extra_env["__PANTS_FORCE_TEST_RUN__"] = str(uuid)
 
+    # A batch may run for as long as its tests would have run for separately.
+    timeouts = [
+        field_set.timeout.calculate_from_global_options(pytest) for field_set in request.field_sets
+    ]
+    timeout_seconds = (
+        None if any(timeout is None for timeout in timeouts) else sum(cast(List[int], timeouts))
+    )
+    description = (
+        f"Run Pytest for {pluralize(len(request.field_sets), 'target')}, starting with "
+        f"{request.field_sets[0].address}"
+        if request.is_batch
+        else f"Run Pytest for {request.field_sets[0].address}"
+    )
+
     process = await Get(
         Process,
         PexProcess(
@@ -230,9 +287,9 @@ async def setup_pytest_for_target(
             extra_env=extra_env,
             input_digest=input_digest,
             output_files=output_files,
-            timeout_seconds=request.field_set.timeout.calculate_from_global_options(pytest),
+            timeout_seconds=timeout_seconds,
             execution_slot_variable=pytest.options.execution_slot_var,
-            description=f"Run Pytest for {request.field_set.address}",
+            description=description,
             level=LogLevel.DEBUG,
         ),
     )
@@ -246,7 +303,7 @@ async def run_python_test(
     if field_set.is_conftest():
         return TestResult.skip(field_set.address)
 
-    setup = await Get(TestSetup, TestSetupRequest(field_set, is_debug=False))
+    setup = await Get(TestSetup, TestSetupRequest((field_set,), is_debug=False))
     result = await Get(FallibleProcessResult, Process, setup.process)
 
     coverage_data = None
@@ -260,16 +317,20 @@ async def run_python_test(
             logger.warning(f"Failed to generate coverage data for {field_set.address}.")
 
     xml_results_digest = None
+    duration_seconds = None
     if setup.results_file_name:
         xml_results_snapshot = await Get(
             Snapshot, DigestSubset(result.output_digest, PathGlobs([setup.results_file_name]))
         )
         if xml_results_snapshot.files == (setup.results_file_name,):
-            xml_results_digest = await Get(
-                Digest,
-                AddPrefix(xml_results_snapshot.digest, pytest.options.junit_xml_dir),
-            )
-        else:
+            xml_results_contents = await Get(DigestContents, Digest, xml_results_snapshot.digest)
+            duration_seconds = junit_xml_duration(xml_results_contents[0].content)
+            if pytest.options.junit_xml_dir:
+                xml_results_digest = await Get(
+                    Digest,
+                    AddPrefix(xml_results_snapshot.digest, pytest.options.junit_xml_dir),
+                )
+        elif pytest.options.junit_xml_dir:
             logger.warning(f"Failed to generate JUnit XML data for {field_set.address}.")
 
     return TestResult.from_fallible_process_result(
@@ -277,6 +338,7 @@ async def run_python_test(
         address=field_set.address,
         coverage_data=coverage_data,
         xml_results=xml_results_digest,
+        duration_seconds=duration_seconds,
     )
 
 
@@ -284,9 +346,247 @@ async def run_python_test(
 async def debug_python_test(field_set: PythonTestFieldSet) -> TestDebugRequest:
     if field_set.is_conftest():
         return TestDebugRequest(None)
-    setup = await Get(TestSetup, TestSetupRequest(field_set, is_debug=True))
+    setup = await Get(TestSetup, TestSetupRequest((field_set,), is_debug=True))
     return TestDebugRequest(InteractiveProcess.from_process(setup.process))
 
 
+class PythonTestBatchRequest(TestBatchRequest):
+    field_set_type = PythonTestFieldSet
+
+
+@dataclass(frozen=True)
+class PytestBatch:
+    """Test targets with the same interpreter constraints and requirements to run in one process."""
+
+    field_sets: Tuple[PythonTestFieldSet, ...]
+
+
+@rule(desc="Partition Pytest targets into batches", level=LogLevel.DEBUG)
+async def run_python_tests_in_batches(
+    request: PythonTestBatchRequest, test_subsystem: TestSubsystem, python_setup: PythonSetup
+) -> TestResults:
+    field_sets = sorted(request.field_sets, key=lambda field_set: field_set.address)
+    skipped = [field_set for field_set in field_sets if field_set.is_conftest()]
+    runnable = [field_set for field_set in field_sets if not field_set.is_conftest()]
+
+    target_closures = await MultiGet(
+        Get(TargetClosure, Address, field_set.address) for field_set in runnable
+    )
+    environments: Dict[
+        Tuple[PexInterpreterConstraints, PexRequirements], List[PythonTestFieldSet]
+    ] = defaultdict(list)
+    for field_set, target_closure in zip(runnable, target_closures):
+        interpreter_constraints = PexInterpreterConstraints.create_from_compatibility_fields(
+            (
+                tgt[PythonInterpreterCompatibility]
+                for tgt in target_closure.closure
+                if tgt.has_field(PythonInterpreterCompatibility)
+            ),
+            python_setup,
+        )
+        requirements = PexRequirements.create_from_requirement_fields(
+            tgt[PythonRequirementsField]
+            for tgt in target_closure.closure
+            if tgt.has_field(PythonRequirementsField)
+        )
+        environments[(interpreter_constraints, requirements)].append(field_set)
+
+    batches = [
+        PytestBatch(batch)
+        for environment_field_sets in environments.values()
+        for batch in stable_batches(environment_field_sets, test_subsystem.batch_size)
+    ]
+    all_batch_results = await MultiGet(Get(TestResults, PytestBatch, batch) for batch in batches)
+    return TestResults(
+        (
+            *(TestResult.skip(field_set.address) for field_set in skipped),
+            *itertools.chain.from_iterable(all_batch_results),
+        )
+    )
+
+
+@rule(desc="Run Pytest on a batch", level=LogLevel.DEBUG)
+async def run_python_test_batch(
+    batch: PytestBatch, test_subsystem: TestSubsystem, pytest: PyTest
+) -> TestResults:
+    if len(batch.field_sets) == 1:
+        # Run a lone test exactly as it would run without batching, so that they share a cache key.
+        result = await Get(TestResult, PythonTestFieldSet, batch.field_sets[0])
+        return TestResults([result])
+
+    setup = await Get(TestSetup, TestSetupRequest(batch.field_sets, is_debug=False))
+    result = await Get(FallibleProcessResult, Process, setup.process)
+    results_contents = await Get(
+        DigestContents, DigestSubset(result.output_digest, PathGlobs([BATCH_RESULTS_FILE_NAME]))
+    )
+    all_source_files = await MultiGet(
+        Get(SourceFiles, SourceFilesRequest([field_set.sources])) for field_set in batch.field_sets
+    )
+
+    junit_results = None
+    # Pytest exits with 0 or 1 if all tests ran, whether or not they passed. Otherwise, e.g. on a
+    # usage error or a timeout, the result belongs to the batch as a whole.
+    if result.exit_code in (0, 1) and results_contents:
+        junit_results = demultiplex_junit_xml(
+            results_contents[0].content,
+            {
+                field_set.address: source_files.files
+                for field_set, source_files in zip(batch.field_sets, all_source_files)
+            },
+        )
+    if junit_results is None:
+        logger.warning(
+            "Failed to determine per-target results for the Pytest batch starting with "
+            f"{batch.field_sets[0].address}, so reporting the batch's result for each target."
+        )
+
+    coverage_data = None
+    if test_subsystem.use_coverage:
+        coverage_snapshot = await Get(
+            Snapshot, DigestSubset(result.output_digest, PathGlobs([".coverage"]))
+        )
+        if coverage_snapshot.files == (".coverage",):
+            # The coverage of the whole batch is attributed to its first target: it is combined
+            # with the coverage of every other target when generating a report anyway.
+            coverage_data = PytestCoverageData(
+                batch.field_sets[0].address, coverage_snapshot.digest
+            )
+        else:
+            logger.warning(
+                "Failed to generate coverage data for the Pytest batch starting with "
+                f"{batch.field_sets[0].address}."
+            )
+
+    xml_results_digests: Dict[Address, Digest] = {}
+    if pytest.options.junit_xml_dir and junit_results:
+        digests = await MultiGet(
+            Get(
+                Digest,
+                CreateDigest(
+                    [
+                        FileContent(
+                            os.path.join(
+                                pytest.options.junit_xml_dir, f"{address.path_safe_spec}.xml"
+                            ),
+                            junit_result.xml,
+                        )
+                    ]
+                ),
+            )
+            for address, junit_result in junit_results.items()
+        )
+        xml_results_digests = dict(zip(junit_results.keys(), digests))
+
+    exit_codes = [
+        junit_results[field_set.address].exit_code if junit_results else result.exit_code
+        for field_set in batch.field_sets
+    ]
+    # The output of the batch is reported once rather than for each of its targets: with its first
+    # failing target, or otherwise with its first target.
+    output_index = next((i for i, exit_code in enumerate(exit_codes) if exit_code != 0), 0)
+    return TestResults(
+        TestResult(
+            exit_code=exit_code,
+            stdout=result.stdout.decode() if i == output_index else "",
+            stderr=result.stderr.decode() if i == output_index else "",
+            address=field_set.address,
+            coverage_data=coverage_data if i == 0 else None,
+            xml_results=xml_results_digests.get(field_set.address),
+            duration_seconds=(
+                junit_results[field_set.address].duration_seconds if junit_results else None
+            ),
+        )
+        for i, (field_set, exit_code) in enumerate(zip(batch.field_sets, exit_codes))
+    )
+
+
+@dataclass(frozen=True)
+class JUnitResult:
+    """The results of one target's tests, extracted from the JUnit XML of a batch."""
+
+    exit_code: int
+    xml: bytes
+    duration_seconds: float
+
+
+def demultiplex_junit_xml(
+    content: bytes, files_by_address: Mapping[Address, Iterable[str]]
+) -> Optional[Dict[Address, JUnitResult]]:
+    """Split the JUnit XML written by one Pytest run of many targets into a result per target.
+
+    Each test case is attributed to the target owning the file that it was collected from, which
+    requires the test IDs to be relative to the build root. Returns None if the XML cannot be
+    parsed, or if any test case cannot be attributed to one of the targets.
+    """
+    # Pytest names each test case after its ID, e.g. `dir/foo_test.py::TestFoo::test_bar` becomes
+    # `dir.foo_test.TestFoo` plus `test_bar`, and so we match test cases against module names.
+    address_by_module = {
+        PurePath(file).with_suffix("").as_posix().replace("/", "."): address
+        for address, files in files_by_address.items()
+        for file in files
+    }
+    modules = sorted(address_by_module, key=len, reverse=True)
+    try:
+        root = ElementTree.fromstring(content)
+    except ElementTree.ParseError:
+        return None
+    suites = [root] if root.tag == "testsuite" else root.findall("testsuite")
+
+    cases_by_address: Dict[Address, List[ElementTree.Element]] = {
+        address: [] for address in files_by_address
+    }
+    for suite in suites:
+        for case in suite.iter("testcase"):
+            classname, name = case.get("classname", ""), case.get("name", "")
+            test_id = f"{classname}.{name}" if classname else name
+            module = next((m for m in modules if test_id == m or test_id.startswith(f"{m}.")), None)
+            if module is None:
+                return None
+            cases_by_address[address_by_module[module]].append(case)
+
+    results = {}
+    for address, cases in cases_by_address.items():
+        failures = sum(1 for case in cases if case.find("failure") is not None)
+        errors = sum(1 for case in cases if case.find("error") is not None)
+        duration_seconds = sum(float(case.get("time", 0)) for case in cases)
+        suite = ElementTree.Element(
+            "testsuite",
+            {
+                "name": "pytest",
+                "tests": str(len(cases)),
+                "failures": str(failures),
+                "errors": str(errors),
+                "skipped": str(sum(1 for case in cases if case.find("skipped") is not None)),
+                "time": f"{duration_seconds:.3f}",
+            },
+        )
+        suite.extend(cases)
+        testsuites = ElementTree.Element("testsuites")
+        testsuites.append(suite)
+        if not cases:
+            # Pytest's exit code when no tests were collected.
+            exit_code = 5
+        else:
+            exit_code = 1 if failures or errors else 0
+        results[address] = JUnitResult(
+            exit_code, ElementTree.tostring(testsuites, encoding="utf-8"), duration_seconds
+        )
+    return results
+
+
+def junit_xml_duration(content: bytes) -> Optional[float]:
+    """Return the total time reported by the test suites in a JUnit XML file, if any."""
+    try:
+        root = ElementTree.fromstring(content)
+        suites = [root] if root.tag == "testsuite" else root.findall("testsuite")
+        return sum(float(suite.get("time", 0)) for suite in suites)
+    except (ElementTree.ParseError, ValueError):
+        return None
+
+
 def rules():
-    return [*collect_rules(), UnionRule(TestFieldSet, PythonTestFieldSet)]
+    return [
+        *collect_rules(),
+        UnionRule(TestFieldSet, PythonTestFieldSet),
+        UnionRule(TestBatchRequest, PythonTestBatchRequest),
+    ]
@@ -10,9 +10,9 @@ from typing import List, Optional
 from pants.backend.python.dependency_inference import rules as dependency_inference_rules
 from pants.backend.python.rules import pex, pex_from_targets, pytest_runner, python_sources
 from pants.backend.python.rules.coverage import create_coverage_config
-from pants.backend.python.rules.pytest_runner import PythonTestFieldSet
+from pants.backend.python.rules.pytest_runner import PythonTestBatchRequest, PythonTestFieldSet
 from pants.backend.python.target_types import PythonLibrary, PythonRequirementLibrary, PythonTests
-from pants.core.goals.test import TestDebugRequest, TestResult
+from pants.core.goals.test import TestDebugRequest, TestResult, TestResults
 from pants.core.util_rules import source_files, stripped_source_files
 from pants.engine.addresses import Address
 from pants.engine.fs import DigestContents, FileContent
@@ -122,8 +122,18 @@ class PytestRunnerIntegrationTest(ExternalToolTestBase):
             *dependency_inference_rules.rules(),  # For conftest detection.
             QueryRule(TestResult, (PythonTestFieldSet, OptionsBootstrapper)),
             QueryRule(TestDebugRequest, (PythonTestFieldSet, OptionsBootstrapper)),
+            QueryRule(TestResults, (PythonTestBatchRequest, OptionsBootstrapper)),
         )
 
+    def pytest_args(self) -> List[str]:
+        return [
+            "--backend-packages=pants.backend.python",
+            f"--source-root-patterns={self.source_root}",
+            # pin to lower versions so that we can run Python 2 tests
+            "--pytest-version=pytest>=4.6.6,<4.7",
+            "--pytest-pytest-plugins=['zipp==1.0.0', 'pytest-cov>=2.8.1,<2.9']",
+        ]
+
     def run_pytest(
         self,
         *,
@@ -133,13 +143,7 @@ class PytestRunnerIntegrationTest(ExternalToolTestBase):
         use_coverage: bool = False,
         execution_slot_var: Optional[str] = None,
     ) -> TestResult:
-        args = [
-            "--backend-packages=pants.backend.python",
-            f"--source-root-patterns={self.source_root}",
-            # pin to lower versions so that we can run Python 2 tests
-            "--pytest-version=pytest>=4.6.6,<4.7",
-            "--pytest-pytest-plugins=['zipp==1.0.0', 'pytest-cov>=2.8.1,<2.9']",
-        ]
+        args = self.pytest_args()
         if passthrough_args:
             args.append(f"--pytest-args='{passthrough_args}'")
         if junit_xml_dir:
@@ -347,6 +351,54 @@ class PytestRunnerIntegrationTest(ExternalToolTestBase):
         assert file.path.startswith("dist/test-results")
         assert b"pants_test.test_good" in file.content
 
+    def test_batch(self) -> None:
+        self.write_file(self.good_source)
+        self.write_file(self.bad_source)
+        self.add_to_build_file(
+            self.package,
+            dedent(
+                """\
+                python_tests(name='good', sources=['test_good.py'])
+                python_tests(name='bad', sources=['test_bad.py'])
+                """
+            ),
+        )
+        good = Address(self.package, target_name="good")
+        bad = Address(self.package, target_name="bad")
+        request = PythonTestBatchRequest(
+            PythonTestFieldSet.create(PythonTests({"sources": [source]}, address=address))
+            for address, source in ((good, "test_good.py"), (bad, "test_bad.py"))
+        )
+        options_bootstrapper = create_options_bootstrapper(
+            args=[
+                *self.pytest_args(),
+                "--test-batch-size=2",
+                "--pytest-junit-xml-dir=dist/test-results",
+            ]
+        )
+        results = {
+            result.address: result
+            for result in self.request_product(TestResults, [request, options_bootstrapper])
+        }
+        assert results[good].exit_code == 0
+        assert results[bad].exit_code == 1
+
+        # Both targets ran in one process, whose output is only reported with the failing target.
+        assert f"{self.package}/test_bad.py F" in results[bad].stdout
+        assert f"{self.package}/test_good.py ." in results[bad].stdout
+        assert results[good].stdout == ""
+
+        for address, module, other_module in (
+            (good, b"pants_test.test_good", b"pants_test.test_bad"),
+            (bad, b"pants_test.test_bad", b"pants_test.test_good"),
+        ):
+            xml_results = results[address].xml_results
+            assert xml_results is not None
+            file = self.request_product(DigestContents, [xml_results])[0]
+            assert file.path == f"dist/test-results/{address.path_safe_spec}.xml"
+            assert module in file.content
+            assert other_module not in file.content
+
     def test_coverage(self) -> None:
         self.create_python_test_target([self.good_source])
         result = self.run_pytest(use_coverage=True)
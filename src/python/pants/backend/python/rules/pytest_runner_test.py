@@ -0,0 +1,82 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from textwrap import dedent
+from xml.etree import ElementTree
+
+from pants.backend.python.rules.pytest_runner import demultiplex_junit_xml, junit_xml_duration
+from pants.engine.addresses import Address
+
+BATCH_XML = dedent(
+    """\
+    <?xml version="1.0" encoding="utf-8"?>
+    <testsuites>
+      <testsuite name="pytest" errors="0" failures="1" skipped="0" tests="4" time="0.5">
+        <testcase classname="tests.a_test" name="test_good" time="0.1"/>
+        <testcase classname="tests.a_test.TestA" name="test_param[x.y]" time="0.1"/>
+        <testcase classname="tests.a_test_util_test" name="test_bad" time="0.2">
+          <failure message="assert False">assert False</failure>
+        </testcase>
+        <testcase classname="tests.sub.b_test" name="test_good" time="0.1"/>
+      </testsuite>
+    </testsuites>
+    """
+).encode()
+
+A = Address("tests", target_name="a")
+UTIL = Address("tests", target_name="util")
+B = Address("tests/sub", target_name="b")
+EMPTY = Address("tests", target_name="empty")
+
+
+def test_demultiplex_junit_xml() -> None:
+    results = demultiplex_junit_xml(
+        BATCH_XML,
+        {
+            A: ["tests/a_test.py"],
+            UTIL: ["tests/a_test_util_test.py"],
+            B: ["tests/sub/b_test.py"],
+            EMPTY: ["tests/empty_test.py"],
+        },
+    )
+    assert results is not None
+    assert {address: result.exit_code for address, result in results.items()} == {
+        A: 0,
+        UTIL: 1,
+        B: 0,
+        # Pytest's exit code when no tests are collected.
+        EMPTY: 5,
+    }
+    assert results[A].duration_seconds == 0.2
+    assert results[EMPTY].duration_seconds == 0
+
+    suite = ElementTree.fromstring(results[A].xml).find("testsuite")
+    assert suite is not None
+    assert suite.get("tests") == "2"
+    assert suite.get("failures") == "0"
+    assert [case.get("name") for case in suite.iter("testcase")] == [
+        "test_good",
+        "test_param[x.y]",
+    ]
+    util_suite = ElementTree.fromstring(results[UTIL].xml).find("testsuite")
+    assert util_suite is not None
+    assert util_suite.get("failures") == "1"
+
+
+def test_demultiplex_junit_xml_collection_error() -> None:
+    xml = b'<testsuite><testcase classname="" name="tests.a_test"><error/></testcase></testsuite>'
+    results = demultiplex_junit_xml(xml, {A: ["tests/a_test.py"], B: ["tests/sub/b_test.py"]})
+    assert results is not None
+    assert results[A].exit_code == 1
+    assert results[B].exit_code == 5
+
+
+def test_demultiplex_junit_xml_unattributable() -> None:
+    assert demultiplex_junit_xml(BATCH_XML, {A: ["tests/a_test.py"]}) is None
+    assert demultiplex_junit_xml(b"not xml", {A: ["tests/a_test.py"]}) is None
+
+
+def test_junit_xml_duration() -> None:
+    assert junit_xml_duration(BATCH_XML) == 0.5
+    assert junit_xml_duration(b'<testsuite time="1.5"></testsuite>') == 1.5
+    assert junit_xml_duration(b"not xml") is None
@@ -4,14 +4,26 @@
 import itertools
 import os
 from abc import ABC, ABCMeta, abstractmethod
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Sequence, Tuple, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
 from pants.base.exceptions import ResolveError
 from pants.build_graph.address import Address
 from pants.engine.fs import GlobExpansionConjunction, GlobMatchErrorBehavior, PathGlobs
 from pants.engine.internals.target_adaptor import TargetAdaptor
-from pants.util.dirutil import fast_relpath_optional, recursive_dirname
+from pants.util.dirutil import recursive_dirname
 from pants.util.meta import frozen_after_init
 
 if TYPE_CHECKING:
@@ -30,6 +42,53 @@ class AddressSpec(Spec, metaclass=ABCMeta):
     """Represents address selectors as passed from the command line."""
 
 
+class AddressFamiliesByDirectory(Mapping[str, "AddressFamily"]):
+    """AddressFamilies keyed by their directory, indexed to find the families above or below a path.
+
+    Both lookups take time proportional to the number of matching families, rather than to the
+    total number of families, so that resolving many `AddressGlobSpec`s against a large repo is
+    cheap.
+    """
+
+    def __init__(self, address_families: Iterable["AddressFamily"]) -> None:
+        self._by_directory: Dict[str, "AddressFamily"] = {
+            af.namespace: af for af in address_families
+        }
+        self._sorted_directories = sorted(self._by_directory)
+
+    def __getitem__(self, directory: str) -> "AddressFamily":
+        return self._by_directory[directory]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_directory)
+
+    def __len__(self) -> int:
+        return len(self._by_directory)
+
+    def descendants(self, directory: str) -> Tuple["AddressFamily", ...]:
+        """Return the families in the given directory and all of its subdirectories."""
+        directory = directory.rstrip("/")
+        if not directory:
+            return tuple(self._by_directory[d] for d in self._sorted_directories)
+        # All subdirectories of `directory` sort contiguously after `directory/`, and before
+        # `directory0`, because '0' is the character that immediately follows '/'.
+        start = bisect_left(self._sorted_directories, f"{directory}/")
+        end = bisect_left(self._sorted_directories, f"{directory}0", lo=start)
+        self_family = self._by_directory.get(directory)
+        return (
+            *((self_family,) if self_family is not None else ()),
+            *(self._by_directory[d] for d in self._sorted_directories[start:end]),
+        )
+
+    def ascendants(self, directory: str) -> Tuple["AddressFamily", ...]:
+        """Return the families in the given directory and all of its parent directories."""
+        return tuple(
+            self._by_directory[d]
+            for d in dict.fromkeys(recursive_dirname(directory.rstrip("/")))
+            if d in self._by_directory
+        )
+
+
 @dataclass(frozen=True)
 class AddressLiteralSpec(AddressSpec):
     """An AddressSpec for a single address.
@@ -52,9 +111,9 @@ class AddressGlobSpec(AddressSpec, metaclass=ABCMeta):
 
     @abstractmethod
     def matching_address_families(
-        self, address_families_dict: Mapping[str, "AddressFamily"]
+        self, address_families_dict: AddressFamiliesByDirectory
     ) -> Tuple["AddressFamily", ...]:
-        """Given a dict of (namespace path) -> AddressFamily, return the values matching this
+        """Given the AddressFamilies keyed by their namespace path, return those matching this
         address spec.
 
         :raises: :class:`ResolveError` if no address families matched this spec and this spec type
@@ -90,7 +149,7 @@ class SiblingAddresses(AddressGlobSpec):
         return tuple(os.path.join(self.directory, pat) for pat in build_patterns)
 
     def matching_address_families(
-        self, address_families_dict: Mapping[str, "AddressFamily"]
+        self, address_families_dict: AddressFamiliesByDirectory
     ) -> Tuple["AddressFamily", ...]:
         maybe_af = address_families_dict.get(self.directory)
         if maybe_af is None:
@@ -114,13 +173,9 @@ class DescendantAddresses(AddressGlobSpec):
         return tuple(os.path.join(self.directory, "**", pat) for pat in build_patterns)
 
     def matching_address_families(
-        self, address_families_dict: Mapping[str, "AddressFamily"]
+        self, address_families_dict: AddressFamiliesByDirectory
     ) -> Tuple["AddressFamily", ...]:
-        return tuple(
-            af
-            for ns, af in address_families_dict.items()
-            if fast_relpath_optional(ns, self.directory) is not None
-        )
+        return address_families_dict.descendants(self.directory)
 
     def matching_addresses(
         self, address_families: Sequence["AddressFamily"]
@@ -148,13 +203,9 @@ class AscendantAddresses(AddressGlobSpec):
         )
 
     def matching_address_families(
-        self, address_families_dict: Mapping[str, "AddressFamily"]
+        self, address_families_dict: AddressFamiliesByDirectory
     ) -> Tuple["AddressFamily", ...]:
-        return tuple(
-            af
-            for ns, af in address_families_dict.items()
-            if fast_relpath_optional(self.directory, ns) is not None
-        )
+        return address_families_dict.ascendants(self.directory)
 
 
 @frozen_after_init
@@ -2,6 +2,7 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 from pants.base.specs import (
+    AddressFamiliesByDirectory,
     AddressLiteralSpec,
     AddressSpecs,
     AscendantAddresses,
@@ -11,6 +12,8 @@ from pants.base.specs import (
     FilesystemSpecs,
     SiblingAddresses,
 )
+from pants.engine.internals.mapper import AddressFamily
+from pants.util.dirutil import fast_relpath_optional
 
 
 def test_address_specs_more_specific() -> None:
@@ -59,3 +62,23 @@ def test_filesystem_specs_more_specific() -> None:
 
     assert glob == FilesystemSpecs.more_specific(None, glob)
     assert glob == FilesystemSpecs.more_specific(glob, None)
+
+
+def test_address_families_by_directory() -> None:
+    directories = ["", "a", "a/b", "a/b/c", "a/bc", "a/b0", "a-b", "b", "b/a"]
+    address_families = AddressFamiliesByDirectory(
+        AddressFamily(namespace=d, name_to_target_adaptors={}) for d in directories
+    )
+    assert set(address_families) == set(directories)
+
+    def namespaces(families):
+        return sorted(af.namespace for af in families)
+
+    for directory in ["", "a", "a/b", "a/b/c", "a/b/d", "a-b", "b", "c"]:
+        # Equivalent to a linear scan over all families.
+        assert namespaces(address_families.descendants(directory)) == sorted(
+            d for d in directories if fast_relpath_optional(d, directory) is not None
+        )
+        assert namespaces(address_families.ascendants(directory)) == sorted(
+            d for d in directories if fast_relpath_optional(directory, d) is not None
+        )
@@ -54,6 +54,12 @@ class DaemonPantsRunner(RawFdRunner):
 
         Periodically prints a message on the given stderr_fd while exclusive access cannot be
         acquired.
+
+        Runs cannot yet share the daemon: each one mutates process-global state (`sys.std*`,
+        `os.environ`, `sys.argv`, logging handlers, global Subsystem instances and the RunTracker),
+        so a second run would observe the first run's state. Until that state is threaded through
+        from the caller, concurrent invocations must use `PANTS_CONCURRENT=True`.
+          see https://github.com/pantsbuild/pants/issues/7654
         """
 
         should_poll_forever = timeout <= 0
@@ -133,7 +139,10 @@ class DaemonPantsRunner(RawFdRunner):
         #   see https://github.com/pantsbuild/pants/issues/7654
         clean_global_runtime_state(reset_subsystem=True)
         options_bootstrapper = OptionsBootstrapper.create(
-            env=os.environ, args=sys.argv, allow_pantsrc=True
+            env=os.environ,
+            args=sys.argv,
+            allow_pantsrc=True,
+            cache_dir=OptionsBootstrapper.default_cache_dir(),
         )
         bootstrap_options = options_bootstrapper.bootstrap_options
         global_bootstrap_options = bootstrap_options.for_global_scope()
@@ -12,7 +12,7 @@ class PantsLoader:
     """Loads and executes entrypoints."""
 
     ENTRYPOINT_ENV_VAR = "PANTS_ENTRYPOINT"
-    DEFAULT_ENTRYPOINT = "pants.bin.pants_exe:main"
+    DEFAULT_ENTRYPOINT = "pants.bin.thin_client:main"
 
     ENCODING_IGNORE_ENV_VAR = "PANTS_IGNORE_UNRECOGNIZED_ENCODING"
 
@@ -9,6 +9,7 @@ from typing import List, Mapping
 from pants.base.exception_sink import ExceptionSink
 from pants.base.exiter import ExitCode
 from pants.bin.remote_pants_runner import RemotePantsRunner
+from pants.bin.thin_client import DAEMON_KILLING_GOALS
 from pants.init.logging import setup_logging
 from pants.init.util import init_workdir
 from pants.option.option_value_container import OptionValueContainer
@@ -29,8 +30,7 @@ class PantsRunner:
     # easier to make the daemon the default use case. Once the daemon lifecycle is stable enough we
     # should be able to avoid needing to kill it at all.
     def will_terminate_pantsd(self) -> bool:
-        _DAEMON_KILLING_GOALS = frozenset(["kill-pantsd", "clean-all"])
-        return not frozenset(self.args).isdisjoint(_DAEMON_KILLING_GOALS)
+        return not frozenset(self.args).isdisjoint(DAEMON_KILLING_GOALS)
 
     def _should_run_with_pantsd(self, global_bootstrap_options: OptionValueContainer) -> bool:
         # The parent_build_id option is set only for pants commands (inner runs)
@@ -66,7 +66,10 @@ class PantsRunner:
         self.scrub_pythonpath()
 
         options_bootstrapper = OptionsBootstrapper.create(
-            env=self.env, args=self.args, allow_pantsrc=True
+            env=self.env,
+            args=self.args,
+            allow_pantsrc=True,
+            cache_dir=OptionsBootstrapper.default_cache_dir(),
         )
         bootstrap_options = options_bootstrapper.bootstrap_options
         global_bootstrap_options = bootstrap_options.for_global_scope()
@@ -2,13 +2,16 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 import logging
+import os
 import sys
 import time
 from contextlib import contextmanager
 from typing import List, Mapping
 
+from pants.base.build_environment import get_default_pants_config_file
 from pants.base.exception_sink import ExceptionSink, SignalHandler
 from pants.base.exiter import ExitCode
+from pants.bin.thin_client import ThinClientToken, thin_client_key
 from pants.console.stty_utils import STTYSettings
 from pants.java.nailgun_client import NailgunClient
 from pants.java.nailgun_protocol import NailgunProtocol
@@ -205,5 +208,27 @@ class RemotePantsRunner:
             )
         )
 
+    def _write_thin_client_token(self, pantsd_handle: PantsDaemonClient.Handle) -> None:
+        """Records that runs with our key may connect to this pantsd without parsing options."""
+        global_options = self._bootstrap_options.for_global_scope()
+        config_files = [
+            get_default_pants_config_file(),
+            *self._options_bootstrapper.config.sources(),
+        ]
+        if global_options.pantsrc:
+            config_files.extend(
+                os.path.expanduser(str(rcfile)) for rcfile in global_options.pantsrc_files
+            )
+        token = ThinClientToken.create(
+            config_files=config_files,
+            metadata_base_dir=pantsd_handle.metadata_base_dir,
+            fingerprint=self._client.options_fingerprint,
+            pailgun_quit_timeout=global_options.pantsd_pailgun_quit_timeout,
+            request_timeout=global_options.pantsd_timeout_when_multiple_invocations,
+        )
+        token.store(thin_client_key(self._args, self._env))
+
     def run(self, start_time: float) -> ExitCode:
-        return self._run_pants_with_retry(self._client.maybe_launch())
+        pantsd_handle = self._client.maybe_launch()
+        self._write_thin_client_token(pantsd_handle)
+        return self._run_pants_with_retry(pantsd_handle)
@@ -0,0 +1,282 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A client for an already running pantsd, with a minimal import footprint.
+
+Parsing options requires importing most of Pants, which dominates the latency of no-op runs that
+are handled by pantsd. Instead, whenever the full client (`PantsRunner`) connects to pantsd, it
+records a `ThinClientToken` describing what it verified: the config files that it read, and the
+fingerprint of the daemon that it connected to. Later runs with the same `PANTS_*` environment and
+flags validate the token and forward argv, env and stdio straight to pantsd over the nailgun
+protocol. Runs without a valid token fall back to the full client.
+
+N.B. This module must only import from the standard library and from modules that do the same. This
+is enforced by `build-support/bin/check_thin_client_imports.py`.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import pkgutil
+import signal
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from pants.base.build_root import BuildRoot
+from pants.base.exiter import PANTS_FAILED_EXIT_CODE, ExitCode
+from pants.console.stty_utils import STTYSettings
+from pants.java.nailgun_client import NailgunClient
+from pants.java.nailgun_protocol import NailgunProtocol
+
+# Goals that terminate pantsd, and so must never be run by the daemon that they would terminate.
+DAEMON_KILLING_GOALS = frozenset(["kill-pantsd", "clean-all"])
+
+# Bump this whenever the format of tokens changes, so that tokens written by older versions of this
+# module are ignored.
+_TOKEN_VERSION = 1
+
+
+def _cache_dir() -> str:
+    # N.B. This mirrors `pants.base.build_environment.get_pants_cachedir`, which is not used directly
+    # because importing it would import `pants.version` and `pants.scm`.
+    cache_home = os.environ.get("XDG_CACHE_HOME") or "~/.cache"
+    return os.path.expanduser(os.path.join(cache_home, "pants", "thin_client"))
+
+
+def _maybe_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as fp:
+            return hashlib.sha1(fp.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _read_metadata(metadata_dir: str, key: str) -> Optional[str]:
+    try:
+        with open(os.path.join(metadata_dir, key), "r") as fp:
+            return fp.read().strip()
+    except OSError:
+        return None
+
+
+def thin_client_key(args: Sequence[str], env: Mapping[str, str]) -> str:
+    """Computes the key of the runs that a `ThinClientToken` is valid for.
+
+    The key covers everything other than config files that may affect the bootstrap options: the
+    `PANTS_*` env, and every flag before `--`. Flags are not filtered down to bootstrap flags
+    because that would require registering options, so runs with distinct goal flags use distinct
+    tokens.
+    """
+    flags = [arg for arg in itertools.takewhile(lambda arg: arg != "--", args) if arg[:1] == "-"]
+    version = pkgutil.get_data("pants", "VERSION")
+    components = [
+        _TOKEN_VERSION,
+        version.decode().strip() if version else None,
+        sys.executable,
+        BuildRoot().path,
+        os.path.expanduser("~"),
+        sorted((k, v) for k, v in env.items() if k.startswith("PANTS_")),
+        flags,
+    ]
+    return hashlib.sha256(json.dumps(components).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class ThinClientToken:
+    """What a full client verified before connecting to pantsd.
+
+    :param config_digests: The config and pantsrc files that were (or could have been) read while
+      bootstrapping options, with their digests. A digest of None records that the file did not
+      exist.
+    :param metadata_base_dir: The `--pants-subprocessdir` containing the metadata of pantsd: its pid,
+      socket and fingerprint.
+    :param fingerprint: The fingerprint of the daemon options that pantsd was verified to match.
+    :param pailgun_quit_timeout: The value of `--pantsd-pailgun-quit-timeout`.
+    :param request_timeout: The value of `--pantsd-timeout-when-multiple-invocations`.
+    """
+
+    config_digests: Tuple[Tuple[str, Optional[str]], ...]
+    metadata_base_dir: str
+    fingerprint: str
+    pailgun_quit_timeout: float
+    request_timeout: float
+
+    @classmethod
+    def create(
+        cls,
+        *,
+        config_files: Iterable[str],
+        metadata_base_dir: str,
+        fingerprint: str,
+        pailgun_quit_timeout: float,
+        request_timeout: float,
+    ) -> "ThinClientToken":
+        return cls(
+            config_digests=tuple((path, _maybe_digest(path)) for path in sorted(set(config_files))),
+            metadata_base_dir=metadata_base_dir,
+            fingerprint=fingerprint,
+            pailgun_quit_timeout=pailgun_quit_timeout,
+            request_timeout=request_timeout,
+        )
+
+    @staticmethod
+    def path(key: str) -> str:
+        return os.path.join(_cache_dir(), key)
+
+    @classmethod
+    def load(cls, key: str) -> Optional["ThinClientToken"]:
+        try:
+            with open(cls.path(key), "r") as fp:
+                data = json.load(fp)
+            return cls(
+                config_digests=tuple((path, digest) for path, digest in data["config_digests"]),
+                metadata_base_dir=data["metadata_base_dir"],
+                fingerprint=data["fingerprint"],
+                pailgun_quit_timeout=float(data["pailgun_quit_timeout"]),
+                request_timeout=float(data["request_timeout"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def store(self, key: str) -> None:
+        """Atomically writes this token, ignoring errors: a missing token only costs a full run."""
+        path = self.path(key)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w") as fp:
+                json.dump(asdict(self), fp)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def daemon(self) -> Optional[Tuple[int, int]]:
+        """Returns the pid and port of pantsd if this token is still valid, and None otherwise."""
+        if any(_maybe_digest(path) != digest for path, digest in self.config_digests):
+            return None
+        metadata_dir = os.path.join(self.metadata_base_dir, "pantsd")
+        if _read_metadata(metadata_dir, "fingerprint") != self.fingerprint:
+            return None
+        pid = _read_metadata(metadata_dir, "pid")
+        port = _read_metadata(metadata_dir, "socket")
+        if not pid or not port or not pid.isdigit() or not port.isdigit():
+            return None
+        try:
+            os.kill(int(pid), 0)
+        except OSError:
+            return None
+        return int(pid), int(port)
+
+
+class ThinClient:
+    """Forwards a run to pantsd without parsing options, if a valid `ThinClientToken` exists."""
+
+    def __init__(
+        self,
+        args: Sequence[str],
+        env: MutableMapping[str, str],
+        start_time: float,
+        stdin=None,
+        stdout=None,
+        stderr=None,
+    ) -> None:
+        self._args = list(args)
+        self._env = env
+        self._start_time = start_time
+        self._stdin = stdin or sys.stdin
+        self._stdout = stdout or sys.stdout.buffer
+        self._stderr = stderr or sys.stderr.buffer
+
+    def _can_run(self) -> bool:
+        # Runs that the full client would not send to pantsd, or would need to log a warning for.
+        if not DAEMON_KILLING_GOALS.isdisjoint(self._args):
+            return False
+        if self._env.get("PANTSC_PROFILE"):
+            return False
+        if "PYTHONPATH" in self._env and "RUNNING_PANTS_FROM_SOURCES" not in self._env:
+            return False
+        return True
+
+    def _scrub_pythonpath(self) -> None:
+        # N.B. This mirrors `PantsRunner.scrub_pythonpath`, other than the warning, which is handled
+        # by falling back in `_can_run`.
+        if self._env.pop("PYTHONPATH", None):
+            self._env.pop("RUNNING_PANTS_FROM_SOURCES", None)
+
+    @contextmanager
+    def _trapped_signals(self, client: NailgunClient, timeout: float) -> Iterator[None]:
+        """Forwards SIGINT, SIGQUIT and SIGTERM to pantsd, as `PailgunClientSignalHandler` does."""
+
+        def forward(signum, _frame):
+            client.set_exit_timeout(
+                timeout=timeout,
+                reason=KeyboardInterrupt("Interrupted by user over pailgun client!"),
+            )
+            client.maybe_send_signal(signum)
+
+        signums = (signal.SIGINT, signal.SIGQUIT, signal.SIGTERM)
+        previous = {signum: signal.signal(signum, forward) for signum in signums}
+        try:
+            yield
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def run(self) -> Optional[ExitCode]:
+        """Runs in pantsd, or returns None if the full client should be used instead.
+
+        A run is only ever abandoned before pantsd has accepted it, so it is always safe to fall
+        back.
+        """
+        if not self._can_run():
+            return None
+        try:
+            token = ThinClientToken.load(thin_client_key(self._args, self._env))
+        except BuildRoot.NotFoundError:
+            return None
+        daemon = token.daemon() if token else None
+        if token is None or daemon is None:
+            return None
+        pid, port = daemon
+
+        self._scrub_pythonpath()
+        env = {
+            **self._env,
+            **NailgunProtocol.ttynames_to_env(self._stdin, self._stdout, self._stderr),
+            "PANTSD_RUNTRACKER_CLIENT_START_TIME": str(self._start_time),
+            "PANTSD_REQUEST_TIMEOUT_LIMIT": str(token.request_timeout),
+        }
+        client = NailgunClient(
+            port=port,
+            remote_pid=pid,
+            ins=self._stdin,
+            out=self._stdout,
+            err=self._stderr,
+            exit_on_broken_pipe=True,
+            metadata_base_dir=token.metadata_base_dir,
+        )
+        try:
+            with self._trapped_signals(client, token.pailgun_quit_timeout):
+                with STTYSettings.preserved():
+                    return client.execute(self._args[0], self._args[1:], env)
+        except NailgunClient.NailgunConnectionError:
+            return None
+        except NailgunClient.NailgunError as e:
+            print(f"\nlost active connection to pantsd: {e!r}", file=sys.stderr)
+            return PANTS_FAILED_EXIT_CODE
+
+
+def main() -> None:
+    """An entrypoint that runs in pantsd when possible, and otherwise runs `pants_exe:main`."""
+    exit_code = ThinClient(args=sys.argv, env=os.environ, start_time=time.time()).run()
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    # N.B. Inlining this import is the point of this module.
+    from pants.bin import pants_exe
+
+    pants_exe.main()
@@ -0,0 +1,107 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import os
+from typing import Iterator, Optional
+from unittest.mock import patch
+
+import pytest
+
+from pants.bin.thin_client import ThinClient, ThinClientToken, thin_client_key
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+@pytest.fixture
+def tmpdir() -> Iterator[str]:
+    with temporary_dir() as tmpdir, patch.dict(
+        os.environ, {"XDG_CACHE_HOME": os.path.join(tmpdir, "cache")}
+    ):
+        yield tmpdir
+
+
+def write_pantsd_metadata(tmpdir: str, *, fingerprint: str, pid: Optional[int] = None) -> str:
+    metadata_base_dir = os.path.join(tmpdir, ".pids")
+    metadata_dir = os.path.join(metadata_base_dir, "pantsd")
+    safe_file_dump(os.path.join(metadata_dir, "fingerprint"), fingerprint, makedirs=True)
+    safe_file_dump(os.path.join(metadata_dir, "pid"), str(pid or os.getpid()))
+    safe_file_dump(os.path.join(metadata_dir, "socket"), "2113")
+    return metadata_base_dir
+
+
+def create_token(tmpdir: str, *config_files: str) -> ThinClientToken:
+    return ThinClientToken.create(
+        config_files=config_files,
+        metadata_base_dir=write_pantsd_metadata(tmpdir, fingerprint="abc"),
+        fingerprint="abc",
+        pailgun_quit_timeout=5.0,
+        request_timeout=60.0,
+    )
+
+
+def test_key() -> None:
+    args = ["pants_loader.py", "-ldebug", "test", "src/python::", "--", "-v"]
+    env = {"PANTS_CONCURRENT": "true", "TERM": "xterm"}
+    key = thin_client_key(args, env)
+
+    # Only flags before `--`, and only the `PANTS_*` env, are part of the key.
+    assert key == thin_client_key(
+        ["pants_loader.py", "list", "-ldebug", "::", "--", "-x"], {"PANTS_CONCURRENT": "true"}
+    )
+    assert key != thin_client_key([*args[:-2], "--test-debug"], env)
+    assert key != thin_client_key(args, {**env, "PANTS_CONCURRENT": "false"})
+
+
+def test_token_round_trip(tmpdir: str) -> None:
+    token = create_token(tmpdir, os.path.join(tmpdir, "pants.toml"))
+    assert ThinClientToken.load("key") is None
+    token.store("key")
+    assert token == ThinClientToken.load("key")
+
+
+def test_token_validation(tmpdir: str) -> None:
+    config = os.path.join(tmpdir, "pants.toml")
+    rcfile = os.path.join(tmpdir, ".pants.rc")
+    safe_file_dump(config, "[GLOBAL]\n")
+
+    token = create_token(tmpdir, config, rcfile)
+    assert (os.getpid(), 2113) == token.daemon()
+
+    # Creating a config file that did not exist invalidates the token, as does editing one.
+    safe_file_dump(rcfile, "[GLOBAL]\n")
+    assert token.daemon() is None
+    token = create_token(tmpdir, config, rcfile)
+    safe_file_dump(config, "[GLOBAL]\nlevel = 'debug'\n")
+    assert token.daemon() is None
+
+    # As does pantsd restarting with other options.
+    token = create_token(tmpdir, config, rcfile)
+    write_pantsd_metadata(tmpdir, fingerprint="def")
+    assert token.daemon() is None
+
+
+def test_falls_back(tmpdir: str) -> None:
+    args = ["pants_loader.py", "list", "::"]
+
+    def run(*args: str, **env: str) -> Optional[int]:
+        with open(os.devnull, "rb") as stdin, open(os.devnull, "wb") as out, patch(
+            "sys.stdin", stdin
+        ):
+            client = ThinClient(args, env, start_time=0, stdin=stdin, stdout=out, stderr=out)
+            return client.run()
+
+    # Without a token.
+    assert run(*args) is None
+
+    create_token(tmpdir).store(thin_client_key(args, {}))
+    create_token(tmpdir).store(thin_client_key([args[0], "kill-pantsd"], {}))
+    with patch.object(ThinClientToken, "daemon", return_value=(os.getpid(), 1)):
+        # With a valid token, but for a pantsd that is no longer listening.
+        assert run(*args) is None
+
+        with patch("pants.java.nailgun_client.NailgunClient.execute", return_value=0):
+            assert 0 == run(*args)
+            # For goals that would terminate pantsd, and for runs that the full client warns about.
+            assert run(args[0], "kill-pantsd") is None
+            assert run(*args, PYTHONPATH="src/python") is None
+            assert 0 == run(*args, PYTHONPATH="src/python", RUNNING_PANTS_FROM_SOURCES="1")
@@ -2,9 +2,11 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 import os
+import sys
+import weakref
 from dataclasses import dataclass
 from pathlib import PurePath
-from typing import Optional, Sequence
+from typing import Any, ClassVar, Dict, Optional, Sequence, Tuple
 
 from pants.base.deprecated import deprecated
 from pants.util.dirutil import fast_relpath, longest_dir_prefix
@@ -237,13 +239,23 @@ class Address:
             spec, relative_to=relative_to, subproject_roots=subproject_roots
         ).dir_to_address()
 
-    def __init__(
-        self,
+    # Addresses are immutable, and a large build graph holds many equal copies of the same address
+    # (in dependencies, dependees, and owners mappings), so every Address is interned: constructing
+    # an Address equal to a live one returns the existing instance. This saves memory, and makes
+    # most equality checks an identity check.
+    __slots__ = ("spec_path", "_relative_file_path", "_target_name", "_hash", "__weakref__")
+
+    _interned: ClassVar[
+        "weakref.WeakValueDictionary[Tuple[str, Optional[str], Optional[str]], Address]"
+    ] = weakref.WeakValueDictionary()
+
+    def __new__(
+        cls,
         spec_path: str,
         *,
         relative_file_path: Optional[str] = None,
         target_name: Optional[str] = None,
-    ) -> None:
+    ) -> "Address":
         """
         :param spec_path: The path from the build root to the directory containing the BUILD file
           for the target.
@@ -254,19 +266,39 @@ class Address:
           BUILD file in the spec_path directory, or None if this path refers to the default
           target in that directory.
         """
-        self.spec_path = spec_path
-        self._relative_file_path = relative_file_path
         # If the target_name is the same as the default name would be, we normalize to None.
-        self._target_name = (
-            target_name if target_name and target_name != os.path.basename(self.spec_path) else None
+        if not target_name or target_name == os.path.basename(spec_path):
+            target_name = None
+        key = (spec_path, relative_file_path, target_name)
+        address = cls._interned.get(key)
+        if address is not None:
+            return address
+
+        address = super().__new__(cls)
+        address.spec_path = sys.intern(spec_path)
+        address._relative_file_path = (
+            sys.intern(relative_file_path) if relative_file_path is not None else None
         )
-        self._hash = hash((self.spec_path, self._relative_file_path, self._target_name))
+        address._target_name = sys.intern(target_name) if target_name is not None else None
+        address._hash = hash(key)
         if PurePath(spec_path).name.startswith("BUILD"):
             raise InvalidSpecPath(
-                f"The address {self.spec} has {PurePath(spec_path).name} as the last part of its "
-                f"path, but BUILD is a reserved name. Please make sure that you did not name any "
-                f"directories BUILD."
+                f"The address {address.spec} has {PurePath(spec_path).name} as the last part of "
+                f"its path, but BUILD is a reserved name. Please make sure that you did not name "
+                f"any directories BUILD."
             )
+        cls._interned[key] = address
+        return address
+
+    def __getnewargs_ex__(self) -> Tuple[Tuple[str], Dict[str, Any]]:
+        # Unpickling and copying go through `__new__`, and so are interned as well.
+        return (
+            (self.spec_path,),
+            {"relative_file_path": self._relative_file_path, "target_name": self._target_name},
+        )
+
+    def __getstate__(self) -> None:
+        return None
 
     @property
     def is_base_target(self) -> bool:
@@ -355,10 +387,13 @@ class Address:
         return self.__class__(self.spec_path, relative_file_path=None, target_name=self.target_name)
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Address):
             return False
         return (
-            self.spec_path == other.spec_path
+            self._hash == other._hash
+            and self.spec_path == other.spec_path
             and self._relative_file_path == other._relative_file_path
             and self._target_name == other._target_name
         )
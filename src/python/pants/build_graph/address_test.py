@@ -1,6 +1,8 @@
 # Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import copy
+import pickle
 from typing import Optional
 
 import pytest
@@ -232,6 +234,17 @@ def test_address_equality() -> None:
     )
 
 
+def test_address_interning() -> None:
+    addr = Address("a/b", relative_file_path="c.txt", target_name="original")
+    assert addr is Address("a/b", relative_file_path="c.txt", target_name="original")
+    # Normalized target names are interned to the same instance.
+    assert Address("a/b") is Address("a/b", target_name="b")
+    assert Address("a/b", target_name="c") is not Address("a/b", target_name="d")
+    assert pickle.loads(pickle.dumps(addr)) is addr
+    assert copy.deepcopy(addr) is addr
+    assert not hasattr(addr, "__dict__")
+
+
 def test_address_spec() -> None:
     def assert_spec(address: Address, *, expected: str, expected_path_spec: str) -> None:
         assert address.spec == expected
@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from typing import ClassVar, Iterable, List, Optional, Tuple, Type, cast
 
 from pants.base.deprecated import resolve_conflicting_options
+from pants.core.goals.style_request import stable_batches
 from pants.core.util_rules.filter_empty_sources import TargetsWithSources, TargetsWithSourcesRequest
 from pants.engine.console import Console
 from pants.engine.engine_aware import EngineAwareReturnType
@@ -165,6 +166,24 @@ class FmtSubsystem(GoalSubsystem):
                 "will now run per every file, rather than per target."
             ),
         )
+        register(
+            "--batch-size",
+            advanced=True,
+            type=int,
+            default=0,
+            help=(
+                "If set, rather than formatting all files in a single batch, format them in "
+                "batches of roughly this many files, which run in parallel. Batches hold files "
+                "from the same or neighboring directories, and are chosen so that editing, "
+                "adding, or removing a file only invalidates its own batch. This trades off "
+                "between the cache hits of `--per-file-caching` and the lower startup overhead of "
+                "a single batch. Ignored if `--per-file-caching` is set."
+            ),
+        )
+
+    @property
+    def batch_size(self) -> int:
+        return cast(int, self.options.batch_size)
 
     @property
     def per_file_caching(self) -> bool:
@@ -226,15 +245,16 @@ async def fmt(
         if language_targets_with_sources
     )
 
-    if fmt_subsystem.per_file_caching:
+    if fmt_subsystem.per_file_caching or fmt_subsystem.batch_size > 0:
+        batch_size = 1 if fmt_subsystem.per_file_caching else fmt_subsystem.batch_size
         per_language_results = await MultiGet(
             Get(
                 LanguageFmtResults,
                 LanguageFmtTargets,
-                language_target_collection.__class__(Targets([target])),
+                language_target_collection.__class__(Targets(batch)),
             )
             for language_target_collection in valid_language_target_collections
-            for target in language_target_collection.targets
+            for batch in stable_batches(language_target_collection.targets, batch_size)
         )
     else:
         per_language_results = await MultiGet(
@@ -268,7 +288,7 @@ async def fmt(
 
     # We group all results for the same formatter so that we can give one final status in the
     # summary. This is only relevant if there were multiple results because of
-    # `--per-file-caching`.
+    # `--per-file-caching` or `--batch-size`.
     formatter_to_results = defaultdict(set)
     for result in individual_results:
         formatter_to_results[result.formatter_name].add(result)
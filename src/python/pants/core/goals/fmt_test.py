@@ -146,6 +146,7 @@ class FmtTest(TestBase):
         result_digest: Digest,
         per_file_caching: bool,
         include_sources: bool = True,
+        batch_size: int = 0,
     ) -> str:
         console = MockConsole(use_colors=False)
         union_membership = UnionMembership({LanguageFmtTargets: language_target_collection_types})
@@ -155,7 +156,10 @@ class FmtTest(TestBase):
                 console,
                 Targets(targets),
                 create_goal_subsystem(
-                    FmtSubsystem, per_file_caching=per_file_caching, per_target_caching=False
+                    FmtSubsystem,
+                    per_file_caching=per_file_caching,
+                    per_target_caching=False,
+                    batch_size=batch_size,
                 ),
                 Workspace(self.scheduler),
                 union_membership,
@@ -244,12 +248,13 @@ class FmtTest(TestBase):
             self.make_target(addr, target_cls=SmalltalkTarget) for addr in smalltalk_addresses
         ]
 
-        def assert_expected(*, per_file_caching: bool) -> None:
+        def assert_expected(*, per_file_caching: bool, batch_size: int = 0) -> None:
             stderr = self.run_fmt_rule(
                 language_target_collection_types=[FortranTargets, SmalltalkTargets],
                 targets=[*fortran_targets, *smalltalk_targets],
                 result_digest=self.merged_digest,
                 per_file_caching=per_file_caching,
+                batch_size=batch_size,
             )
             self.assert_workspace_modified(fortran_formatted=True, smalltalk_formatted=True)
             assert stderr == dedent(
@@ -263,6 +268,7 @@ class FmtTest(TestBase):
 
         assert_expected(per_file_caching=False)
         assert_expected(per_file_caching=True)
+        assert_expected(per_file_caching=False, batch_size=1)
 
 
 def test_streaming_output_skip() -> None:
@@ -7,7 +7,7 @@ from dataclasses import dataclass
 from typing import Iterable, Optional, Tuple, cast
 
 from pants.base.deprecated import resolve_conflicting_options
-from pants.core.goals.style_request import StyleRequest
+from pants.core.goals.style_request import StyleRequest, stable_batches
 from pants.core.util_rules.filter_empty_sources import (
     FieldSetsWithSources,
     FieldSetsWithSourcesRequest,
@@ -176,6 +176,20 @@ class LintSubsystem(GoalSubsystem):
                 "will now run per every file, rather than per target."
             ),
         )
+        register(
+            "--batch-size",
+            advanced=True,
+            type=int,
+            default=0,
+            help=(
+                "If set, rather than linting all files in a single batch, lint them in batches "
+                "of roughly this many files, which run in parallel. Batches hold files from the "
+                "same or neighboring directories, and are chosen so that editing, adding, or "
+                "removing a file only invalidates its own batch. This trades off between the "
+                "cache hits of `--per-file-caching` and the lower startup overhead of a single "
+                "batch. Ignored if `--per-file-caching` is set."
+            ),
+        )
         register(
             "--reports-dir",
             type=str,
@@ -200,6 +214,10 @@ class LintSubsystem(GoalSubsystem):
         )
         return cast(bool, val)
 
+    @property
+    def batch_size(self) -> int:
+        return cast(int, self.options.batch_size)
+
     @property
     def reports_dir(self) -> Optional[str]:
         return cast(Optional[str], self.options.reports_dir)
@@ -236,22 +254,23 @@ async def lint(
         if request
     )
 
-    if lint_subsystem.per_file_caching:
-        all_per_file_results = await MultiGet(
-            Get(LintResults, LintRequest, request.__class__([field_set]))
+    if lint_subsystem.per_file_caching or lint_subsystem.batch_size > 0:
+        batch_size = 1 if lint_subsystem.per_file_caching else lint_subsystem.batch_size
+        all_batch_results = await MultiGet(
+            Get(LintResults, LintRequest, request.__class__(batch))
             for request in valid_requests
-            for field_set in request.field_sets
+            for batch in stable_batches(request.field_sets, batch_size)
         )
         # We consolidate all results for each linter into a single `LintResults`.
         all_results = tuple(
             LintResults(
                 itertools.chain.from_iterable(
-                    per_file_results.results for per_file_results in all_linter_results
+                    batch_results.results for batch_results in all_linter_results
                 ),
                 linter_name=linter_name,
             )
             for linter_name, all_linter_results in itertools.groupby(
-                all_per_file_results, key=lambda results: results.linter_name
+                all_batch_results, key=lambda results: results.linter_name
             )
         )
     else:
@@ -270,6 +289,8 @@ async def lint(
         if linters_with_multiple_reports:
             if lint_subsystem.per_file_caching:
                 suggestion = "Try running without `--lint-per-file-caching` set."
+            elif lint_subsystem.batch_size > 0:
+                suggestion = "Try running without `--lint-batch-size` set."
             else:
                 suggestion = (
                     "The linters likely partitioned the input targets, such as grouping by Python "
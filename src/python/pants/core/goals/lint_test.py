@@ -112,6 +112,7 @@ class LintTest(TestBase):
         targets: List[Target],
         per_file_caching: bool,
         include_sources: bool = True,
+        batch_size: int = 0,
     ) -> Tuple[int, str]:
         console = MockConsole(use_colors=False)
         workspace = Workspace(self.scheduler)
@@ -123,7 +124,10 @@ class LintTest(TestBase):
                 workspace,
                 Targets(targets),
                 create_goal_subsystem(
-                    LintSubsystem, per_file_caching=per_file_caching, per_target_caching=False
+                    LintSubsystem,
+                    per_file_caching=per_file_caching,
+                    per_target_caching=False,
+                    batch_size=batch_size,
                 ),
                 union_membership,
             ],
@@ -186,7 +190,7 @@ class LintTest(TestBase):
         good_address = Address.parse(":good")
         bad_address = Address.parse(":bad")
 
-        def assert_expected(*, per_file_caching: bool) -> None:
+        def assert_expected(*, per_file_caching: bool, batch_size: int = 0) -> None:
             exit_code, stderr = self.run_lint_rule(
                 lint_request_types=[
                     ConditionallySucceedsRequest,
@@ -196,6 +200,7 @@ class LintTest(TestBase):
                 ],
                 targets=[self.make_target(good_address), self.make_target(bad_address)],
                 per_file_caching=per_file_caching,
+                batch_size=batch_size,
             )
             assert exit_code == FailingRequest.exit_code([bad_address])
             assert stderr == dedent(
@@ -210,6 +215,7 @@ class LintTest(TestBase):
 
         assert_expected(per_file_caching=False)
         assert_expected(per_file_caching=True)
+        assert_expected(per_file_caching=False, batch_size=1)
 
 
 def test_streaming_output_skip() -> None:
@@ -1,10 +1,14 @@
 # Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import hashlib
 from abc import ABCMeta
 from dataclasses import dataclass
-from typing import ClassVar, Generic, Iterable, Optional, Type, TypeVar
+from typing import ClassVar, Generic, Iterable, List, Optional, Tuple, Type, TypeVar
 
+from typing_extensions import Protocol
+
+from pants.engine.addresses import Address
 from pants.engine.collection import Collection
 from pants.engine.fs import Snapshot
 from pants.engine.target import FieldSetWithOrigin
@@ -35,3 +39,33 @@ class StyleRequest(Generic[_FS], metaclass=ABCMeta):
     ) -> None:
         self.field_sets = Collection[_FS](field_sets)
         self.prior_formatter_result = prior_formatter_result
+
+
+class _Addressable(Protocol):
+    address: Address
+
+
+_A = TypeVar("_A", bound=_Addressable)
+
+
+def stable_batches(items: Iterable[_A], batch_size: int) -> Tuple[Tuple[_A, ...], ...]:
+    """Partition the items into batches of roughly `batch_size`, which are stable across edits.
+
+    Items are sorted by address, so that a batch holds items from the same or neighboring
+    directories, and a batch ends after each item whose address hashes to 0 modulo `batch_size`.
+    Because whether a batch ends after an item depends only on that item, adding, removing, or
+    editing an item only changes the batch containing it (or at most its neighbor), rather than
+    shifting every later batch like fixed-size chunks would. This means that only that batch needs
+    to be rerun. Batches are capped at twice `batch_size` items.
+    """
+    batches: List[Tuple[_A, ...]] = []
+    batch: List[_A] = []
+    for item in sorted(items, key=lambda item: item.address):
+        batch.append(item)
+        address_hash = int(hashlib.sha1(item.address.spec.encode()).hexdigest()[:8], 16)
+        if address_hash % batch_size == 0 or len(batch) >= 2 * batch_size:
+            batches.append(tuple(batch))
+            batch = []
+    if batch:
+        batches.append(tuple(batch))
+    return tuple(batches)
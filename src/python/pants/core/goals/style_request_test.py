@@ -0,0 +1,41 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from pants.core.goals.style_request import stable_batches
+from pants.engine.addresses import Address
+
+
+@dataclass(frozen=True)
+class MockItem:
+    address: Address
+
+
+def make_items(*names: str) -> List[MockItem]:
+    return [MockItem(Address(f"src/{name}")) for name in names]
+
+
+def batch_names(batches: Tuple[Tuple[MockItem, ...], ...]) -> List[List[str]]:
+    return [[item.address.spec_path[len("src/") :] for item in batch] for batch in batches]
+
+
+def test_stable_batches_size() -> None:
+    items = make_items(*(f"d{i:03}" for i in range(1000)))
+    batches = stable_batches(reversed(items), 10)
+    # Every item is in exactly one batch, in address order.
+    assert [item for batch in batches for item in batch] == items
+    assert all(len(batch) <= 20 for batch in batches)
+    assert 50 <= len(batches) <= 200
+    assert stable_batches(items, 1) == tuple((item,) for item in items)
+
+
+def test_stable_batches_only_change_locally() -> None:
+    items = make_items(*(f"d{i:03}" for i in range(0, 1000, 2)))
+    before = batch_names(stable_batches(items, 10))
+    after = batch_names(stable_batches([*items, *make_items("d501")], 10))
+    changed = [batch for batch in after if batch not in before]
+    # Only the batch which gained the new item differs, e.g. rather than every later batch.
+    assert len(changed) == 1
+    assert "d501" in changed[0]
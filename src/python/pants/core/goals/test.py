@@ -2,12 +2,29 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 import itertools
+import json
 import logging
+import os
 from abc import ABC, ABCMeta
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import PurePath
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar, Union, cast
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from pants.core.util_rules.filter_empty_sources import (
     FieldSetsWithSources,
@@ -29,7 +46,10 @@ from pants.engine.target import (
     TargetsToValidFieldSetsRequest,
 )
 from pants.engine.unions import UnionMembership, union
+from pants.option.global_options import GlobalOptions
+from pants.util.dirutil import safe_mkdir_for
 from pants.util.logging import LogLevel
+from pants.util.meta import frozen_after_init
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +82,9 @@ class TestResult:
     address: Address
     coverage_data: Optional["CoverageData"] = None
     xml_results: Optional[Digest] = None
+    # How long the tests took to run, as reported by the test runner, if it reports that. Unlike
+    # the wall time of the process, this does not depend on whether the result was cached.
+    duration_seconds: Optional[float] = None
 
     # Prevent this class from being detected by pytest as a test class.
     __test__ = False
@@ -78,6 +101,7 @@ class TestResult:
         *,
         coverage_data: Optional["CoverageData"] = None,
         xml_results: Optional[Digest] = None,
+        duration_seconds: Optional[float] = None,
     ) -> "TestResult":
         return cls(
             exit_code=process_result.exit_code,
@@ -86,9 +110,17 @@ class TestResult:
             address=address,
             coverage_data=coverage_data,
             xml_results=xml_results,
+            duration_seconds=duration_seconds,
         )
 
 
+class TestResults(Collection[TestResult]):
+    """The results of running a batch of tests, one per field set in the batch."""
+
+    # Prevent this class from being detected by pytest as a test class.
+    __test__ = False
+
+
 @dataclass(frozen=True)
 class EnrichedTestResult(EngineAwareReturnType):
     exit_code: Optional[int]
@@ -98,6 +130,7 @@ class EnrichedTestResult(EngineAwareReturnType):
     output_setting: "ShowOutput"
     coverage_data: Optional["CoverageData"] = None
     xml_results: Optional[Digest] = None
+    duration_seconds: Optional[float] = None
 
     @property
     def skipped(self) -> bool:
@@ -171,6 +204,32 @@ class TestFieldSet(FieldSet, EngineAwareParameter, metaclass=ABCMeta):
         return self.address.spec
 
 
+_TFS = TypeVar("_TFS", bound=TestFieldSet)
+
+
+@union
+@frozen_after_init
+@dataclass(unsafe_hash=True)
+class TestBatchRequest(Generic[_TFS], metaclass=ABCMeta):
+    """A request to run the tests for many `TestFieldSet`s of the same type together.
+
+    Test runners that can run many targets in a single process, and so amortize its startup cost,
+    should subclass this, set `field_set_type`, and register a `UnionRule(TestBatchRequest,
+    Subclass)` along with a rule from the subclass to `TestResults`. That rule must return exactly
+    one `TestResult` per field set, and is free to split the field sets into as many processes as
+    it needs to, e.g. to respect `--test-batch-size`.
+    """
+
+    field_set_type: ClassVar[Type[_TFS]]
+
+    field_sets: Tuple[_TFS, ...]
+
+    __test__ = False
+
+    def __init__(self, field_sets: Iterable[_TFS]) -> None:
+        self.field_sets = tuple(field_sets)
+
+
 class CoverageData(ABC):
     """Base class for inputs to a coverage report.
 
@@ -317,6 +376,51 @@ class TestSubsystem(GoalSubsystem):
             ),
         )
 
+        register(
+            "--batch-size",
+            type=int,
+            default=1,
+            advanced=True,
+            help=(
+                "Run up to this many test targets in a single process, for test runners that "
+                "support it. Targets are only batched with others that have the same environment, "
+                "e.g. the same interpreter constraints and requirements for Pytest. Exit codes, "
+                "durations and JUnit XML results are still reported per target, but the "
+                "stdout/stderr of a batch is reported once, with its first failing target (or its "
+                "first target if none failed), and coverage data is recorded per batch rather than "
+                "per target. Batching amortizes the startup cost of the test runner, which "
+                "dominates for many small test files, but a batch's process is rerun if any of its "
+                "targets change. Batch boundaries are chosen so that adding or removing a target "
+                "only changes the batch that contains it."
+            ),
+        )
+
+        register(
+            "--shard",
+            type=str,
+            default="",
+            metavar="<k>/<N>",
+            help=(
+                "Only run the tests in shard k of N, where 0 <= k < N, e.g. `--shard=3/20` on the "
+                "fourth of 20 CI workers. Shards are balanced using the durations in "
+                "`--timings-file`, so every worker must use the same timings to get disjoint "
+                "shards which cover every test, e.g. by restoring that file from the same CI "
+                "cache. Tests without a recorded duration are assumed to take the average time."
+            ),
+        )
+        register(
+            "--timings-file",
+            type=str,
+            default=None,
+            metavar="<path>",
+            advanced=True,
+            help=(
+                "Where to record how long each test target takes to run, as reported by its test "
+                "runner, which is used to balance `--shard`s and to start the slowest tests "
+                "first. Defaults to `test_timings.json` in the Pants workdir."
+            ),
+        )
+
     @property
     def debug(self) -> bool:
         return cast(bool, self.options.debug)
@@ -337,6 +441,102 @@ class TestSubsystem(GoalSubsystem):
     def open_coverage(self) -> bool:
         return cast(bool, self.options.open_coverage)
 
+    @property
+    def batch_size(self) -> int:
+        return cast(int, self.options.batch_size)
+
+    @property
+    def shard(self) -> Optional[Tuple[int, int]]:
+        """The shard to run, as `(k, N)`, if any."""
+        shard = cast(str, self.options.shard)
+        if not shard:
+            return None
+        k, sep, n = shard.partition("/")
+        if not (sep and k.isdigit() and n.isdigit() and int(k) < int(n)):
+            raise ValueError(
+                f"Invalid value for `--{self.name}-shard`: {shard!r}. Expected `k/N`, where k "
+                "and N are integers, and 0 <= k < N."
+            )
+        return int(k), int(n)
+
+    def timings_file(self, global_options: GlobalOptions) -> str:
+        return cast(
+            str,
+            self.options.timings_file
+            or os.path.join(global_options.options.pants_workdir, "test_timings.json"),
+        )
+
+
+class TestTimings:
+    """How long each test target took to run, persisted between runs.
+
+    Reading and writing is best-effort: a missing or unreadable file is treated as having no
+    timings.
+    """
+
+    __test__ = False
+
+    _VERSION = 1
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    def load(self) -> Dict[str, float]:
+        try:
+            with open(self._path, "r") as fp:
+                data = json.load(fp)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable test timings file {self._path}: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self._VERSION:
+            return {}
+        return cast(Dict[str, float], data.get("durations", {}))
+
+    def update(self, durations: Mapping[str, float]) -> None:
+        """Record the given durations, keeping the existing durations of any other tests."""
+        if not durations:
+            return
+        merged = {**self.load(), **durations}
+        tmp_path = f"{self._path}.{os.getpid()}.tmp"
+        try:
+            safe_mkdir_for(self._path)
+            with open(tmp_path, "w") as fp:
+                json.dump({"version": self._VERSION, "durations": merged}, fp, sort_keys=True)
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.warning(f"Failed to record test timings to {self._path}: {e}")
+
+
+_F = TypeVar("_F", bound=FieldSet)
+
+
+def shard_field_sets(
+    field_sets: Sequence[_F], durations: Mapping[str, float], *, shard: int, num_shards: int
+) -> Tuple[_F, ...]:
+    """Return the field sets in the given shard, slowest first.
+
+    Field sets are assigned greedily, slowest first, to whichever shard has the least total
+    duration so far, which balances the shards well in practice. The assignment only depends on
+    the field sets and durations, so every shard computes the same partition.
+    """
+    known = [durations[fs.address.spec] for fs in field_sets if fs.address.spec in durations]
+    default_duration = sum(known) / len(known) if known else 1.0
+
+    def duration(field_set: _F) -> float:
+        return durations.get(field_set.address.spec, default_duration)
+
+    by_duration = sorted(field_sets, key=lambda fs: (-duration(fs), fs.address.spec))
+    totals = [0.0] * num_shards
+    assigned: List[_F] = []
+    for field_set in by_duration:
+        target_shard = min(range(num_shards), key=lambda i: (totals[i], i))
+        totals[target_shard] += duration(field_set)
+        if target_shard == shard:
+            assigned.append(field_set)
+    return tuple(assigned)
+
 
 class Test(Goal):
     subsystem_cls = TestSubsystem
@@ -351,6 +551,7 @@ async def run_tests(
     interactive_runner: InteractiveRunner,
     workspace: Workspace,
     union_membership: UnionMembership,
+    global_options: GlobalOptions,
 ) -> Test:
     if test_subsystem.debug:
         targets_to_valid_field_sets = await Get(
@@ -384,8 +585,62 @@ async def run_tests(
         FieldSetsWithSources, FieldSetsWithSourcesRequest(targets_to_valid_field_sets.field_sets)
     )
 
-    results = await MultiGet(
-        Get(EnrichedTestResult, TestFieldSet, field_set) for field_set in field_sets_with_sources
+    # Start the slowest tests first, so that they don't end up running alone at the end.
+    timings = TestTimings(test_subsystem.timings_file(global_options))
+    durations = timings.load()
+    shard = test_subsystem.shard
+    field_sets_to_run = shard_field_sets(
+        field_sets_with_sources,
+        durations,
+        shard=shard[0] if shard else 0,
+        num_shards=shard[1] if shard else 1,
+    )
+
+    batch_request_types: Dict[Type[TestFieldSet], Type[TestBatchRequest]] = (
+        {
+            request_type.field_set_type: request_type
+            for request_type in union_membership.get(TestBatchRequest)
+        }
+        if test_subsystem.batch_size > 1
+        else {}
+    )
+    field_sets_to_batch: Dict[Type[TestBatchRequest], List[TestFieldSet]] = {}
+    unbatched_field_sets = []
+    for field_set in field_sets_to_run:
+        request_type = batch_request_types.get(type(field_set))
+        if request_type is None:
+            unbatched_field_sets.append(field_set)
+        else:
+            field_sets_to_batch.setdefault(request_type, []).append(field_set)
+
+    # Request the batched and unbatched tests in a single MultiGet, so that they run concurrently.
+    all_results = await MultiGet(
+        itertools.chain(
+            (
+                Get(TestResults, TestBatchRequest, request_type(field_sets))
+                for request_type, field_sets in field_sets_to_batch.items()
+            ),
+            (
+                Get(EnrichedTestResult, TestFieldSet, field_set)
+                for field_set in unbatched_field_sets
+            ),
+        )
+    )
+    batched_results = cast(Tuple[TestResults, ...], all_results[: len(field_sets_to_batch)])
+    unbatched_results = cast(
+        Tuple[EnrichedTestResult, ...], all_results[len(field_sets_to_batch) :]
+    )
+    enriched_batched_results = await MultiGet(
+        Get(EnrichedTestResult, TestResult, result)
+        for result in itertools.chain.from_iterable(batched_results)
+    )
+    results = (*unbatched_results, *enriched_batched_results)
+    timings.update(
+        {
+            result.address.spec: result.duration_seconds
+            for result in results
+            if result.duration_seconds is not None
+        }
     )
 
     # Print summary.
@@ -456,6 +711,7 @@ def enrich_test_result(
         address=test_result.address,
         coverage_data=test_result.coverage_data,
         xml_results=test_result.xml_results,
+        duration_seconds=test_result.duration_seconds,
         output_setting=test_subsystem.output,
     )
 
@@ -7,6 +7,8 @@ from functools import partial
 from textwrap import dedent
 from typing import List, Optional, Tuple, Type
 
+import pytest
+
 from pants.base.specs import AddressLiteralSpec
 from pants.core.goals.test import (
     ConsoleCoverageReport,
@@ -16,10 +18,15 @@ from pants.core.goals.test import (
     EnrichedTestResult,
     ShowOutput,
     Test,
+    TestBatchRequest,
     TestDebugRequest,
     TestFieldSet,
+    TestResult,
+    TestResults,
     TestSubsystem,
+    TestTimings,
     run_tests,
+    shard_field_sets,
 )
 from pants.core.util_rules.filter_empty_sources import (
     FieldSetsWithSources,
@@ -37,7 +44,8 @@ from pants.engine.target import (
     TargetWithOrigin,
 )
 from pants.engine.unions import UnionMembership
-from pants.testutil.option_util import create_goal_subsystem
+from pants.option.global_options import GlobalOptions
+from pants.testutil.option_util import create_goal_subsystem, create_subsystem
 from pants.testutil.rule_runner import MockConsole, MockGet, run_rule_with_mocks
 from pants.testutil.test_base import TestBase
 from pants.util.logging import LogLevel
@@ -89,6 +97,22 @@ class ConditionallySucceedsFieldSet(MockTestFieldSet):
         return 27 if address.target_name == "bad" else 0
 
 
+class ConditionallySucceedsBatchRequest(TestBatchRequest):
+    field_set_type = ConditionallySucceedsFieldSet
+
+
+def run_mock_batch(request: ConditionallySucceedsBatchRequest) -> TestResults:
+    return TestResults(
+        TestResult(
+            exit_code=field_set.exit_code(field_set.address),
+            stdout="batched",
+            stderr="",
+            address=field_set.address,
+        )
+        for field_set in request.field_sets
+    )
+
+
 class TestTest(TestBase):
     def make_interactive_process(self) -> InteractiveProcess:
         digest = self.request_product(
@@ -115,6 +139,8 @@ class TestTest(TestBase):
         output: ShowOutput = ShowOutput.ALL,
         include_sources: bool = True,
         valid_targets: bool = True,
+        batch_size: int = 1,
+        shard: str = "",
     ) -> Tuple[int, str]:
         console = MockConsole(use_colors=False)
         test_subsystem = create_goal_subsystem(
@@ -122,11 +148,19 @@ class TestTest(TestBase):
             debug=debug,
             use_coverage=use_coverage,
             output=output,
+            batch_size=batch_size,
+            shard=shard,
+            timings_file=None,
         )
+        global_options = create_subsystem(GlobalOptions, pants_workdir=self.pants_workdir)
         interactive_runner = InteractiveRunner(self.scheduler)
         workspace = Workspace(self.scheduler)
         union_membership = UnionMembership(
-            {TestFieldSet: [field_set], CoverageDataCollection: [MockCoverageDataCollection]}
+            {
+                TestFieldSet: [field_set],
+                TestBatchRequest: [ConditionallySucceedsBatchRequest],
+                CoverageDataCollection: [MockCoverageDataCollection],
+            }
         )
 
         def mock_find_valid_field_sets(
@@ -152,7 +186,14 @@ class TestTest(TestBase):
 
         result: Test = run_rule_with_mocks(
             run_tests,
-            rule_args=[console, test_subsystem, interactive_runner, workspace, union_membership],
+            rule_args=[
+                console,
+                test_subsystem,
+                interactive_runner,
+                workspace,
+                union_membership,
+                global_options,
+            ],
             mock_gets=[
                 MockGet(
                     product_type=TargetsToValidFieldSets,
@@ -164,6 +205,22 @@ class TestTest(TestBase):
                     subject_type=TestFieldSet,
                     mock=lambda fs: fs.test_result,
                 ),
+                MockGet(
+                    product_type=TestResults,
+                    subject_type=TestBatchRequest,
+                    mock=run_mock_batch,
+                ),
+                MockGet(
+                    product_type=EnrichedTestResult,
+                    subject_type=TestResult,
+                    mock=lambda result: EnrichedTestResult(
+                        exit_code=result.exit_code,
+                        stdout=result.stdout,
+                        stderr=result.stderr,
+                        address=result.address,
+                        output_setting=output,
+                    ),
+                ),
                 MockGet(
                     product_type=TestDebugRequest,
                     subject_type=TestFieldSet,
@@ -236,6 +293,44 @@ class TestTest(TestBase):
             """
         )
 
+    def test_batched_summary(self) -> None:
+        good_address = Address.parse(":good")
+        bad_address = Address.parse(":bad")
+
+        exit_code, stderr = self.run_test_rule(
+            field_set=ConditionallySucceedsFieldSet,
+            targets=[
+                self.make_target_with_origin(good_address),
+                self.make_target_with_origin(bad_address),
+            ],
+            batch_size=2,
+        )
+        assert exit_code == ConditionallySucceedsFieldSet.exit_code(bad_address)
+        assert stderr == dedent(
+            """\
+
+            ✓ //:good succeeded.
+            𐄂 //:bad failed.
+            """
+        )
+
+    def test_shard(self) -> None:
+        addresses = [Address.parse(f":t{i}") for i in range(4)]
+        summaries = [
+            self.run_test_rule(
+                field_set=SuccessfulFieldSet,
+                targets=[self.make_target_with_origin(address) for address in addresses],
+                shard=f"{k}/2",
+            )[1]
+            for k in range(2)
+        ]
+        ran = [
+            [address for address in addresses if f"{address} succeeded" in summary]
+            for summary in summaries
+        ]
+        assert len(ran[0]) == len(ran[1]) == 2
+        assert sorted([*ran[0], *ran[1]]) == sorted(addresses)
+
     def test_debug_target(self) -> None:
         exit_code, _ = self.run_test_rule(
             field_set=SuccessfulFieldSet,
@@ -343,3 +438,43 @@ def test_streaming_output_failure() -> None:
     assert_failure_streamed(
         output_setting=ShowOutput.NONE, expected_message="demo_test failed (exit code 1)."
     )
+
+
+def test_shard_field_sets() -> None:
+    field_sets = [
+        SuccessfulFieldSet.create(MockTarget({}, address=Address("", target_name=name)))
+        for name in ("slow", "medium", "fast1", "fast2", "unknown")
+    ]
+    durations = {"//:slow": 10.0, "//:medium": 6.0, "//:fast1": 3.0, "//:fast2": 3.0}
+
+    def specs(shard: int) -> List[str]:
+        return [
+            fs.address.spec
+            for fs in shard_field_sets(field_sets, durations, shard=shard, num_shards=2)
+        ]
+
+    # `unknown` is assumed to take the average duration of 5.5 seconds.
+    assert specs(0) == ["//:slow", "//:fast1"]
+    assert specs(1) == ["//:medium", "//:unknown", "//:fast2"]
+
+
+def test_test_timings(tmp_path) -> None:
+    timings = TestTimings(str(tmp_path / "timings.json"))
+    assert timings.load() == {}
+    timings.update({"//:a": 1.0, "//:b": 2.0})
+    timings.update({"//:b": 3.0})
+    assert TestTimings(str(tmp_path / "timings.json")).load() == {"//:a": 1.0, "//:b": 3.0}
+
+    (tmp_path / "corrupt.json").write_text("{")
+    assert TestTimings(str(tmp_path / "corrupt.json")).load() == {}
+
+
+def test_shard_option() -> None:
+    def parse(value: str) -> Optional[Tuple[int, int]]:
+        return create_goal_subsystem(TestSubsystem, shard=value).shard
+
+    assert parse("") is None
+    assert parse("3/20") == (3, 20)
+    for invalid in ("20/20", "3", "a/b", "-1/2"):
+        with pytest.raises(ValueError):
+            parse(invalid)
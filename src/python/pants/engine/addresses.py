@@ -7,7 +7,7 @@ from typing import Sequence
 from pants.base.exceptions import ResolveError
 from pants.base.specs import Spec
 from pants.build_graph.address import Address as Address
-from pants.build_graph.address import AddressInput as AddressInput  # noqa: F401: rexport.
+from pants.build_graph.address import AddressInput as AddressInput
 from pants.build_graph.address import BuildFileAddress as BuildFileAddress  # noqa: F401: rexport.
 from pants.engine.collection import Collection
 
@@ -30,6 +30,10 @@ class Addresses(Collection[Address]):
         return self[0]
 
 
+class AddressInputs(Collection[AddressInput]):
+    """AddressInputs to be resolved into `Addresses` in a single batch, preserving their order."""
+
+
 @dataclass(frozen=True)
 class AddressWithOrigin:
     """An Address along with the cmd-line spec it was generated from."""
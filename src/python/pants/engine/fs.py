@@ -39,6 +39,21 @@ class Snapshot:
     dirs: Tuple[str, ...]
 
 
+@dataclass(frozen=True)
+class Paths:
+    """A Paths object is a collection of sorted file paths and dir paths.
+
+    Paths is like a Snapshot, but has the performance optimization that it does not digest the
+    files or save them to the store. It is only invalidated when matching files are added or
+    removed, rather than when their content changes.
+
+    You can find the Paths matched by some globs with `await Get(Paths, PathGlobs, my_globs)`.
+    """
+
+    files: Tuple[str, ...]
+    dirs: Tuple[str, ...]
+
+
 @dataclass(frozen=True)
 class FileContent:
     """The content of a file."""
@@ -258,6 +273,7 @@ def rules():
     return (
         QueryRule(Digest, (CreateDigest,)),
         QueryRule(Digest, (PathGlobs,)),
+        QueryRule(Paths, (PathGlobs,)),
         QueryRule(Digest, (AddPrefix,)),
         QueryRule(Digest, (RemovePrefix,)),
         QueryRule(Digest, (DownloadFile,)),
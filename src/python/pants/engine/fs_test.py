@@ -30,6 +30,7 @@ from pants.engine.fs import (
     MergeDigests,
     PathGlobs,
     PathGlobsAndRoot,
+    Paths,
     RemovePrefix,
     Snapshot,
 )
@@ -283,6 +284,18 @@ class FSTest(TestBase, SchedulerTestBase):
     def test_files_digest_literal(self) -> None:
         self.assert_digest(["a/3.txt", "4.txt"], ["a/3.txt", "4.txt"])
 
+    def test_paths(self) -> None:
+        with self.mk_project_tree() as project_tree:
+            scheduler = self.mk_scheduler(rules=[*fs_rules()], project_tree=project_tree)
+            globs = PathGlobs(["a/*", "4.txt"])
+            paths = self.execute_expecting_one_result(scheduler, Paths, globs).value
+            assert ("4.txt", "a/3.txt", "a/4.txt.ln") == paths.files
+            assert ("a/b",) == paths.dirs
+
+            # Editing the content of a matched file does not change its Paths.
+            Path(project_tree.build_root, "a/3.txt").write_text("not three")
+            assert paths == self.execute_expecting_one_result(scheduler, Paths, globs).value
+
     def test_snapshot_from_outside_buildroot(self) -> None:
         with temporary_dir() as temp_dir:
             Path(temp_dir, "roland").write_text("European Burmese")
@@ -6,16 +6,17 @@ from typing import Any, Dict
 
 from pants.base.exceptions import ResolveError
 from pants.base.project_tree import Dir
-from pants.base.specs import AddressSpec, AddressSpecs
+from pants.base.specs import AddressFamiliesByDirectory, AddressSpec, AddressSpecs
 from pants.engine.addresses import (
     Address,
     Addresses,
     AddressesWithOrigins,
     AddressInput,
+    AddressInputs,
     AddressWithOrigin,
     BuildFileAddress,
 )
-from pants.engine.fs import DigestContents, GlobMatchErrorBehavior, PathGlobs, Snapshot
+from pants.engine.fs import DigestContents, GlobMatchErrorBehavior, PathGlobs, Paths, Snapshot
 from pants.engine.internals.mapper import AddressFamily, AddressMap, AddressSpecsFilter
 from pants.engine.internals.parser import BuildFilePreludeSymbols, Parser, error_on_imports
 from pants.engine.internals.target_adaptor import TargetAdaptor
@@ -51,16 +52,7 @@ async def evaluate_preludes(global_options: GlobalOptions) -> BuildFilePreludeSy
     return BuildFilePreludeSymbols(FrozenDict(values))
 
 
-@rule
-async def resolve_address(address_input: AddressInput) -> Address:
-    # Determine the type of the path_component of the input.
-    if address_input.path_component:
-        snapshot = await Get(Snapshot, PathGlobs(globs=(address_input.path_component,)))
-        is_file, is_dir = bool(snapshot.files), bool(snapshot.dirs)
-    else:
-        # It is an address in the root directory.
-        is_file, is_dir = False, True
-
+def _classified_address(address_input: AddressInput, *, is_file: bool, is_dir: bool) -> Address:
     if is_file:
         return address_input.file_to_address()
     elif is_dir:
@@ -75,6 +67,64 @@ async def resolve_address(address_input: AddressInput) -> Address:
         )
 
 
+@rule
+async def resolve_address(address_input: AddressInput) -> Address:
+    # Determine the type of the path_component of the input.
+    if address_input.path_component:
+        snapshot = await Get(Snapshot, PathGlobs(globs=(address_input.path_component,)))
+        is_file, is_dir = bool(snapshot.files), bool(snapshot.dirs)
+    else:
+        # It is an address in the root directory.
+        is_file, is_dir = False, True
+    return _classified_address(address_input, is_file=is_file, is_dir=is_dir)
+
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+@rule
+async def resolve_addresses(address_inputs: AddressInputs) -> Addresses:
+    """Resolve many AddressInputs at once.
+
+    Rather than globbing for each path component individually, this lists each distinct parent
+    directory once and classifies every path component against those listings. The listings are
+    memoized by the engine, so they are shared by all the requests which refer to the same
+    directories. They do not digest file content, so they are only invalidated by adding or
+    removing files in those directories.
+    """
+    # NB: Path components which contain glob characters fall back to being resolved individually,
+    # because they can't be looked up in a directory listing.
+    listed_inputs = []
+    fallback_inputs = []
+    for ai in address_inputs:
+        if not ai.path_component:
+            continue
+        if _GLOB_CHARS.intersection(ai.path_component):
+            fallback_inputs.append(ai)
+        else:
+            listed_inputs.append(ai)
+
+    parents = sorted({os.path.dirname(ai.path_component) for ai in listed_inputs})
+    listings = await MultiGet(
+        Get(Paths, PathGlobs([os.path.join(parent, "*"), os.path.join(parent, ".*")]))
+        for parent in parents
+    )
+    fallback_addresses = await MultiGet(Get(Address, AddressInput, ai) for ai in fallback_inputs)
+    files = {f for listing in listings for f in listing.files}
+    dirs = {d for listing in listings for d in listing.dirs}
+
+    resolved = dict(zip(fallback_inputs, fallback_addresses))
+    for ai in listed_inputs:
+        resolved[ai] = _classified_address(
+            ai, is_file=ai.path_component in files, is_dir=ai.path_component in dirs
+        )
+    return Addresses(
+        # An empty path component is an address in the root directory.
+        resolved[ai] if ai.path_component else ai.dir_to_address()
+        for ai in address_inputs
+    )
+
+
 @rule
 async def parse_address_family(
     parser: Parser,
@@ -164,9 +214,12 @@ async def addresses_with_origins_from_address_specs(
 
     # First convert all `AddressLiteralSpec`s. Some of the resulting addresses may be file
     # addresses. This will raise an exception if any of the addresses are not valid.
-    literal_addresses = await MultiGet(
-        Get(Address, AddressInput(spec.path_component, spec.target_component))
-        for spec in address_specs.literals
+    literal_addresses = await Get(
+        Addresses,
+        AddressInputs(
+            AddressInput(spec.path_component, spec.target_component)
+            for spec in address_specs.literals
+        ),
     )
     literal_target_adaptors = await MultiGet(
         Get(TargetAdaptor, Address, addr.maybe_convert_to_base_target())
@@ -196,7 +249,7 @@ async def addresses_with_origins_from_address_specs(
     )
     dirnames = {os.path.dirname(f) for f in snapshot.files}
     address_families = await MultiGet(Get(AddressFamily, Dir(d)) for d in dirnames)
-    address_family_by_directory = {af.namespace: af for af in address_families}
+    address_family_by_directory = AddressFamiliesByDirectory(address_families)
 
     for glob_spec in address_specs.globs:
         # These may raise ResolveError, depending on the type of spec.
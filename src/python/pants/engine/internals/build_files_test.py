@@ -20,8 +20,10 @@ from pants.base.specs import (
 from pants.build_graph.build_file_aliases import BuildFileAliases
 from pants.engine.addresses import (
     Address,
+    Addresses,
     AddressesWithOrigins,
     AddressInput,
+    AddressInputs,
     AddressWithOrigin,
     BuildFileAddress,
 )
@@ -155,6 +157,42 @@ def test_resolve_address() -> None:
     assert "'a/b/fake' does not exist on disk" in str(exc.value)
 
 
+def test_resolve_addresses() -> None:
+    rule_runner = RuleRunner(rules=[QueryRule(Addresses, (AddressInputs,))])
+    rule_runner.create_file("a/b/c.txt")
+    rule_runner.create_file("a/b/.hidden")
+    rule_runner.create_file("f.txt")
+    address_inputs = [
+        AddressInput("a/b/c.txt"),
+        AddressInput("a/b"),
+        AddressInput("a/b", target_component="c"),
+        AddressInput("a/b/c.txt", target_component="c"),
+        AddressInput("a/b/.hidden", target_component="c"),
+        AddressInput("a/b/c.*", target_component="c"),
+        AddressInput("f.txt", target_component="original"),
+        AddressInput("", target_component="t"),
+    ]
+    # The batch resolves exactly as each input would individually, and in the same order.
+    assert rule_runner.request_product(Addresses, [AddressInputs(address_inputs)]) == Addresses(
+        [
+            Address("a/b", relative_file_path="c.txt"),
+            Address("a/b"),
+            Address("a/b", target_name="c"),
+            Address("a/b", relative_file_path="c.txt", target_name="c"),
+            Address("a/b", relative_file_path=".hidden", target_name="c"),
+            Address("a/b", relative_file_path="c.*", target_name="c"),
+            Address("", relative_file_path="f.txt", target_name="original"),
+            Address("", target_name="t"),
+        ]
+    )
+
+    with pytest.raises(ExecutionError) as exc:
+        rule_runner.request_product(
+            Addresses, [AddressInputs([AddressInput("a/b"), AddressInput("a/b/fake")])]
+        )
+    assert "'a/b/fake' does not exist on disk" in str(exc.value)
+
+
 @pytest.fixture
 def target_adaptor_rule_runner() -> RuleRunner:
     return RuleRunner(
@@ -5,9 +5,23 @@ import functools
 import itertools
 import logging
 import os.path
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import PurePath
-from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Type, Union
+from typing import (
+    DefaultDict,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from pants.base.exceptions import ResolveError
 from pants.base.specs import (
@@ -16,6 +30,7 @@ from pants.base.specs import (
     FilesystemLiteralSpec,
     FilesystemSpec,
     FilesystemSpecs,
+    SiblingAddresses,
     Specs,
 )
 from pants.engine.addresses import (
@@ -23,6 +38,7 @@ from pants.engine.addresses import (
     Addresses,
     AddressesWithOrigins,
     AddressInput,
+    AddressInputs,
     AddressWithOrigin,
     BuildFileAddress,
 )
@@ -54,6 +70,7 @@ from pants.engine.target import (
     Sources,
     Subtargets,
     Target,
+    TargetClosure,
     Targets,
     TargetsToValidFieldSets,
     TargetsToValidFieldSetsRequest,
@@ -65,11 +82,13 @@ from pants.engine.target import (
     WrappedTarget,
     _AbstractFieldSet,
     generate_subtarget,
-    generate_subtarget_address,
+    generate_subtargets_for_files,
 )
 from pants.engine.unions import UnionMembership
 from pants.option.global_options import GlobalOptions, OwnersNotFoundBehavior
-from pants.source.filespec import matches_filespec
+from pants.source.filespec import Filespec, matches_filespec
+from pants.util.dirutil import recursive_dirname
+from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
 from pants.util.ordered_set import FrozenOrderedSet, OrderedSet
 
@@ -80,6 +99,28 @@ logger = logging.getLogger(__name__)
 # -----------------------------------------------------------------------------------------------
 
 
+@dataclass(frozen=True)
+class SubtargetsRequest:
+    """A request for the subtargets of a base target for the given files."""
+
+    base_target: Target
+    full_file_names: Tuple[str, ...]
+
+
+@rule
+def generate_subtargets_in_bulk(
+    request: SubtargetsRequest, union_membership: UnionMembership
+) -> Subtargets:
+    return Subtargets(
+        request.base_target,
+        generate_subtargets_for_files(
+            request.base_target,
+            full_file_names=request.full_file_names,
+            union_membership=union_membership,
+        ),
+    )
+
+
 @rule
 async def generate_subtargets(address: Address, global_options: GlobalOptions) -> Subtargets:
     if not address.is_base_target:
@@ -100,19 +141,12 @@ async def generate_subtargets(address: Address, global_options: GlobalOptions) -
     if sources_field_path_globs is None:
         return Subtargets(base_target, ())
 
-    # Generate a subtarget per source.
+    # Generate a subtarget per source. All of them are generated by a single node, which depends
+    # only on the base target and the names of its files, and so is not re-run when the content of
+    # the files changes.
     snapshot = await Get(Snapshot, PathGlobs, sources_field_path_globs)
     sources_field.validate_snapshot(snapshot)
-    wrapped_subtargets = await MultiGet(
-        Get(
-            WrappedTarget,
-            Address,
-            generate_subtarget_address(address, full_file_name=subtarget_file),
-        )
-        for subtarget_file in snapshot.files
-    )
-
-    return Subtargets(base_target, tuple(wt.target for wt in wrapped_subtargets))
+    return await Get(Subtargets, SubtargetsRequest(base_target, snapshot.files))
 
 
 @rule
@@ -122,10 +156,15 @@ async def resolve_target(
     union_membership: UnionMembership,
 ) -> WrappedTarget:
     if not address.is_base_target:
-        base_target = await Get(WrappedTarget, Address, address.maybe_convert_to_base_target())
-        subtarget = generate_subtarget(
-            base_target.target, full_file_name=address.filename, union_membership=union_membership
-        )
+        # Select the subtarget from those generated in bulk for the base target, so that each file
+        # has a single shared instance, however it was requested.
+        subtargets = await Get(Subtargets, Address, address.maybe_convert_to_base_target())
+        subtarget = subtargets.by_address.get(address)
+        if subtarget is None:
+            # E.g. the file does not exist (anymore), but may still be referred to.
+            subtarget = generate_subtarget(
+                subtargets.base, full_file_name=address.filename, union_membership=union_membership
+            )
         return WrappedTarget(subtarget)
 
     target_adaptor = await Get(TargetAdaptor, Address, address)
@@ -225,73 +264,134 @@ async def resolve_targets_with_origins(
 
 
 class CycleException(Exception):
-    def __init__(self, subject: Address, path: Tuple[Address, ...]) -> None:
-        path_string = "\n".join((f"-> {a}" if a == subject else f"   {a}") for a in path)
-        super().__init__(f"Dependency graph contained a cycle:\n{path_string}")
+    def __init__(
+        self,
+        subject: Address,
+        path: Tuple[Address, ...],
+        *,
+        additional_cycles: Sequence[Tuple[Address, Tuple[Address, ...]]] = (),
+    ) -> None:
+        def format_path(cycle_subject: Address, cycle_path: Tuple[Address, ...]) -> str:
+            return "\n".join((f"-> {a}" if a == cycle_subject else f"   {a}") for a in cycle_path)
+
+        if additional_cycles:
+            cycles_string = "\n\n".join(
+                format_path(*cycle) for cycle in ((subject, path), *additional_cycles)
+            )
+            msg = (
+                f"Dependency graph contained {len(additional_cycles) + 1} cycles:\n{cycles_string}"
+            )
+        else:
+            msg = f"Dependency graph contained a cycle:\n{format_path(subject, path)}"
+        super().__init__(msg)
         self.subject = subject
         self.path = path
+        self.additional_cycles = tuple(additional_cycles)
 
 
 def _detect_cycles(
     roots: Tuple[Address, ...], dependency_mapping: Dict[Address, Tuple[Address, ...]]
 ) -> None:
-    path_stack: OrderedSet[Address] = OrderedSet()
+    """Walk the graph depth first from each root, and raise if any cycles were found.
+
+    This is iterative, so that it does not hit the recursion limit on deep graphs, and visits each
+    edge once. Every edge which leads back onto the current path closes a cycle, and all such
+    cycles are reported together.
+    """
+    path_stack: List[Address] = []
+    path_index: Dict[Address, int] = {}
+    # The number of file addresses in `path_stack[:i]`, for each `i`, so that we can check whether
+    # a cycle contains a file address in constant time.
+    file_address_counts: List[int] = [0]
+    dependency_iterators: List[Iterator[Address]] = []
     visited: Set[Address] = set()
+    cycles: List[Tuple[Address, Tuple[Address, ...]]] = []
 
-    def maybe_report_cycle(address: Address) -> None:
-        # NB: File-level dependencies are cycle tolerant.
-        if not address.is_base_target or address not in path_stack:
-            return
-
-        # The path of the cycle is shorter than the entire path to the cycle: if the suffix of
-        # the path representing the cycle contains a file dep, it is ignored.
-        in_cycle = False
-        for path_address in path_stack:
-            if in_cycle and not path_address.is_base_target:
-                # There is a file address inside the cycle: do not report it.
-                return
-            elif in_cycle:
-                # Not a file address.
-                continue
-            else:
-                # We're entering the suffix of the path that contains the cycle if we've reached
-                # the address in question.
-                in_cycle = path_address == address
-        # If we did not break out early, it's because there were no file addresses in the cycle.
-        raise CycleException(address, (*path_stack, address))
-
-    def visit(address: Address):
-        if address in visited:
-            maybe_report_cycle(address)
-            return
-        path_stack.add(address)
+    def push(address: Address) -> None:
+        path_index[address] = len(path_stack)
+        path_stack.append(address)
+        file_address_counts.append(file_address_counts[-1] + (not address.is_base_target))
+        dependency_iterators.append(iter(dependency_mapping[address]))
         visited.add(address)
 
-        for dep_address in dependency_mapping[address]:
-            visit(dep_address)
-
-        path_stack.remove(address)
+    def pop() -> None:
+        del path_index[path_stack.pop()]
+        file_address_counts.pop()
+        dependency_iterators.pop()
 
     for root in roots:
-        visit(root)
-        if path_stack:
-            raise AssertionError(
-                f"The stack of visited nodes should have been empty at the end of recursion, "
-                f"but it still contained: {path_stack}"
-            )
+        if root in visited:
+            continue
+        push(root)
+        while dependency_iterators:
+            dep_address = next(dependency_iterators[-1], None)
+            if dep_address is None:
+                pop()
+                continue
+            if dep_address not in visited:
+                push(dep_address)
+                continue
+            # NB: File-level dependencies are cycle tolerant.
+            cycle_start = path_index.get(dep_address)
+            if cycle_start is None or not dep_address.is_base_target:
+                continue
+            # The path of the cycle is shorter than the entire path to the cycle: if the suffix of
+            # the path representing the cycle contains a file dep, it is ignored.
+            if file_address_counts[-1] - file_address_counts[cycle_start] > 0:
+                continue
+            cycles.append((dep_address, (*path_stack, dep_address)))
+
+    if cycles:
+        (subject, path), *additional_cycles = cycles
+        raise CycleException(subject, path, additional_cycles=additional_cycles)
+
+
+@dataclass(frozen=True)
+class _TransitiveClosure:
+    """The closure of a single target, along with its direct dependencies."""
+
+    target: Target
+    dependencies: Tuple[Target, ...]
+    # The target itself, followed by its transitive dependencies.
+    closure: FrozenOrderedSet[Target]
+    # Whether the closure contains a cycle which must be reported. File-level cycles are tolerated,
+    # and so do not count.
+    contains_cycle: bool
 
 
 @rule
-async def transitive_targets(targets: Targets) -> TransitiveTargets:
-    """Find all the targets transitively depended upon by the target roots.
+async def transitive_closure(address: Address) -> _TransitiveClosure:
+    """Find the closure of a single target by composing the closures of its direct dependencies.
 
-    This uses iteration, rather than recursion, so that we can tolerate dependency cycles. Unlike a
-    traditional BFS algorithm, we batch each round of traversals via `MultiGet` for improved
-    performance / concurrency.
+    The closures of the dependencies are requested weakly, so that if one of them is already being
+    computed further up a dependency cycle, the engine returns None for it rather than failing. In
+    that case the closure is found by walking the dependencies directly instead. Only the first
+    target to close a cycle walks it: the rest of the targets on the cycle reuse its closure.
     """
-    visited: OrderedSet[Target] = OrderedSet()
-    queued = FrozenOrderedSet(targets)
-    dependency_mapping: Dict[Address, Tuple[Address, ...]] = {}
+    wrapped_target = await Get(WrappedTarget, Address, address)
+    target = wrapped_target.target
+    dependencies = await Get(Targets, DependenciesRequest(target.get(Dependencies)))
+    maybe_dependency_closures = await MultiGet(
+        Get(_TransitiveClosure, Address, dep.address, weak=True) for dep in dependencies
+    )
+    dependency_closures = [c for c in maybe_dependency_closures if c is not None]
+    if len(dependency_closures) == len(dependencies):
+        return _TransitiveClosure(
+            target,
+            tuple(dependencies),
+            FrozenOrderedSet(itertools.chain([target], *(c.closure for c in dependency_closures))),
+            any(c.contains_cycle for c in dependency_closures),
+        )
+
+    # This uses iteration, rather than recursion, so that we can tolerate dependency cycles. Unlike
+    # a traditional BFS algorithm, we batch each round of traversals via `MultiGet` for improved
+    # performance / concurrency.
+    dependency_mapping: Dict[Address, Tuple[Address, ...]] = {
+        address: tuple(t.address for t in dependencies)
+    }
+    visited: OrderedSet[Target] = OrderedSet([target])
+    queued = FrozenOrderedSet(dependencies).difference(visited)
+    visited.update(queued)
     while queued:
         direct_dependencies = await MultiGet(
             Get(Targets, DependenciesRequest(tgt.get(Dependencies))) for tgt in queued
@@ -309,9 +409,60 @@ async def transitive_targets(targets: Targets) -> TransitiveTargets:
         )
         visited.update(queued)
 
-    transitive_targets = TransitiveTargets(tuple(targets), FrozenOrderedSet(visited))
-    _detect_cycles(tuple(t.address for t in targets), dependency_mapping)
-    return transitive_targets
+    try:
+        _detect_cycles((address,), dependency_mapping)
+    except CycleException:
+        contains_cycle = True
+    else:
+        contains_cycle = False
+    return _TransitiveClosure(
+        target, tuple(dependencies), FrozenOrderedSet(visited), contains_cycle
+    )
+
+
+@rule
+async def target_closure(address: Address) -> TargetClosure:
+    closure = await Get(_TransitiveClosure, Address, address)
+    if closure.contains_cycle:
+        # Report the cycle relative to this target, which is the same as `TransitiveTargets` does.
+        await Get(TransitiveTargets, Addresses([address]))
+    return TargetClosure(closure.target, closure.closure)
+
+
+@rule
+async def transitive_targets(targets: Targets) -> TransitiveTargets:
+    """Find all the targets transitively depended upon by the target roots.
+
+    The closures of the roots are composed from the memoized closure of each target, so the only
+    work done here is to walk the composed dependency mapping breadth first from all of the roots
+    at once, without any further traversal of the build graph.
+    """
+    root_closures = await MultiGet(Get(_TransitiveClosure, Address, tgt.address) for tgt in targets)
+    closures = await MultiGet(
+        Get(_TransitiveClosure, Address, tgt.address)
+        for tgt in FrozenOrderedSet(itertools.chain.from_iterable(c.closure for c in root_closures))
+    )
+    dependency_mapping: Dict[Address, Tuple[Target, ...]] = {
+        c.target.address: c.dependencies for c in closures
+    }
+
+    if any(c.contains_cycle for c in root_closures):
+        _detect_cycles(
+            tuple(t.address for t in targets),
+            {
+                address: tuple(t.address for t in deps)
+                for address, deps in dependency_mapping.items()
+            },
+        )
+
+    visited: OrderedSet[Target] = OrderedSet()
+    queued = FrozenOrderedSet(targets)
+    while queued:
+        queued = FrozenOrderedSet(
+            itertools.chain.from_iterable(dependency_mapping[tgt.address] for tgt in queued)
+        ).difference(visited)
+        visited.update(queued)
+    return TransitiveTargets(tuple(targets), FrozenOrderedSet(visited))
 
 
 # -----------------------------------------------------------------------------------------------
@@ -335,8 +486,63 @@ class Owners(Collection[Address]):
     pass
 
 
+@dataclass(frozen=True)
+class DirectoryOwnersRequest:
+    """A request for the owners of the files claimed by the targets declared in a directory."""
+
+    directory: str
+
+
+@dataclass(frozen=True)
+class DirectoryOwners:
+    """An index from existing file paths to the targets declared in one directory that own them.
+
+    A target owns the files matched by its `sources` field, as well as the BUILD file that it is
+    declared in. Generated subtargets are used for files which have them, so that the index has
+    file level precision.
+
+    Because the index is computed per directory, it is shared by every `OwnersRequest` which
+    touches that directory, and is only recomputed when the directory's targets change.
+    """
+
+    owners_by_path: FrozenDict[str, Tuple[Address, ...]]
+
+
+@rule
+async def find_directory_owners(request: DirectoryOwnersRequest) -> DirectoryOwners:
+    targets = await Get(Targets, AddressSpecs([SiblingAddresses(request.directory)]))
+    build_file_addresses = await MultiGet(
+        Get(BuildFileAddress, Address, tgt.address) for tgt in targets
+    )
+    # Generated subtargets own exactly their file, but any base target which was not expanded
+    # must have its sources expanded to find the files that it owns.
+    unexpanded_targets = tuple(
+        tgt for tgt in targets if tgt.address.is_base_target and tgt.has_field(Sources)
+    )
+    unexpanded_sources_snapshots = await MultiGet(
+        Get(Snapshot, PathGlobs, _filespec_path_globs(tgt[Sources].filespec))
+        for tgt in unexpanded_targets
+    )
+
+    owners_by_path: DefaultDict[str, OrderedSet[Address]] = defaultdict(OrderedSet)
+    for tgt, bfa in zip(targets, build_file_addresses):
+        owners_by_path[bfa.rel_path].add(tgt.address)
+        if not tgt.address.is_base_target:
+            owners_by_path[tgt.address.filename].add(tgt.address)
+    for tgt, snapshot in zip(unexpanded_targets, unexpanded_sources_snapshots):
+        for f in snapshot.files:
+            owners_by_path[f].add(tgt.address)
+    return DirectoryOwners(
+        FrozenDict((path, tuple(owners)) for path, owners in sorted(owners_by_path.items()))
+    )
+
+
+def _filespec_path_globs(filespec: Filespec) -> PathGlobs:
+    return PathGlobs((*filespec["includes"], *(f"!{e}" for e in filespec.get("excludes", []))))
+
+
 @rule
-async def find_owners(owners_request: OwnersRequest) -> Owners:
+async def find_owners(owners_request: OwnersRequest, global_options: GlobalOptions) -> Owners:
     # Determine which of the sources are live and which are deleted.
     sources_set_snapshot = await Get(Snapshot, PathGlobs(owners_request.sources))
 
@@ -347,34 +553,46 @@ async def find_owners(owners_request: OwnersRequest) -> Owners:
 
     matching_addresses: OrderedSet[Address] = OrderedSet()
     unmatched_sources = set(owners_request.sources)
-    for live in (True, False):
-        # Walk up the buildroot looking for targets that would conceivably claim changed sources.
-        # For live files, we use expanded Targets, which have file level precision but which are
-        # only created for existing files. For deleted files we use UnexpandedTargets, which have
-        # the original declared glob.
-        candidate_targets: Iterable[Target]
-        if live:
-            if not live_dirs:
-                continue
-            sources_set = live_files
-            candidate_specs = tuple(AscendantAddresses(directory=d) for d in live_dirs)
-            candidate_targets = await Get(Targets, AddressSpecs(candidate_specs))
-        else:
-            if not deleted_dirs:
-                continue
-            sources_set = deleted_files
-            candidate_specs = tuple(AscendantAddresses(directory=d) for d in deleted_dirs)
-            candidate_targets = await Get(UnexpandedTargets, AddressSpecs(candidate_specs))
 
+    # For live files, we look up each file in the owners index of each ancestor directory which
+    # contains a BUILD file. The indexes use expanded Targets, which have file level precision but
+    # which are only created for existing files.
+    if live_dirs:
+        build_files_snapshot = await Get(
+            Snapshot,
+            PathGlobs,
+            AddressSpecs(AscendantAddresses(directory=d) for d in live_dirs).to_path_globs(
+                build_patterns=global_options.options.build_patterns,
+                build_ignore_patterns=global_options.options.build_ignore,
+            ),
+        )
+        build_dirs = sorted({os.path.dirname(f) for f in build_files_snapshot.files})
+        all_directory_owners = await MultiGet(
+            Get(DirectoryOwners, DirectoryOwnersRequest(d)) for d in build_dirs
+        )
+        directory_owners_by_dir = dict(zip(build_dirs, all_directory_owners))
+        for live_file in live_files:
+            for ancestor in OrderedSet(recursive_dirname(os.path.dirname(live_file))):
+                directory_owners = directory_owners_by_dir.get(ancestor)
+                if directory_owners is None:
+                    continue
+                owners = directory_owners.owners_by_path.get(live_file)
+                if owners:
+                    unmatched_sources.discard(live_file)
+                    matching_addresses.update(owners)
+
+    # For deleted files we use UnexpandedTargets, which have the original declared glob.
+    if deleted_dirs:
+        candidate_specs = tuple(AscendantAddresses(directory=d) for d in deleted_dirs)
+        candidate_targets = await Get(UnexpandedTargets, AddressSpecs(candidate_specs))
         build_file_addresses = await MultiGet(
             Get(BuildFileAddress, Address, tgt.address) for tgt in candidate_targets
         )
-
         for candidate_tgt, bfa in zip(candidate_targets, build_file_addresses):
             matching_files = set(
-                matches_filespec(candidate_tgt.get(Sources).filespec, paths=sources_set)
+                matches_filespec(candidate_tgt.get(Sources).filespec, paths=deleted_files)
             )
-            if not matching_files and bfa.rel_path not in sources_set:
+            if not matching_files and bfa.rel_path not in deleted_files:
                 continue
 
             unmatched_sources -= matching_files
@@ -730,10 +948,11 @@ async def resolve_dependencies(
         registered_target_types=registered_target_types.types,
         union_membership=union_membership,
     )
-    literal_addresses = await MultiGet(Get(Address, AddressInput, ai) for ai in provided.addresses)
-    ignored_addresses = set(
-        await MultiGet(Get(Address, AddressInput, ai) for ai in provided.ignored_addresses)
+    literal_addresses, ignored = await MultiGet(
+        Get(Addresses, AddressInputs(provided.addresses)),
+        Get(Addresses, AddressInputs(provided.ignored_addresses)),
     )
+    ignored_addresses = set(ignored)
 
     # Inject any dependencies. This is determined by the `request.field` class. For example, if
     # there is a rule to inject for FortranDependencies, then FortranDependencies and any subclass
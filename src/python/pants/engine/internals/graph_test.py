@@ -2,10 +2,11 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 import itertools
+import sys
 from dataclasses import dataclass
 from pathlib import PurePath
 from textwrap import dedent
-from typing import Iterable, List, Optional, Set, Tuple, Type
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type
 
 import pytest
 
@@ -42,7 +43,11 @@ from pants.engine.internals.graph import (
     OwnersRequest,
     TooManyTargetsException,
     TransitiveExcludesNotSupportedError,
+    _detect_cycles,
+    _TransitiveClosure,
     parse_dependencies_field,
+    transitive_closure,
+    transitive_targets,
 )
 from pants.engine.internals.scheduler import ExecutionError
 from pants.engine.rules import Get, MultiGet, QueryRule, rule
@@ -62,6 +67,7 @@ from pants.engine.target import (
     Sources,
     Tags,
     Target,
+    TargetClosure,
     Targets,
     TargetsToValidFieldSets,
     TargetsToValidFieldSetsRequest,
@@ -73,6 +79,7 @@ from pants.engine.target import (
 from pants.engine.unions import UnionMembership, UnionRule, union
 from pants.option.options_bootstrapper import OptionsBootstrapper
 from pants.testutil.option_util import create_options_bootstrapper
+from pants.testutil.rule_runner import MockGet, run_rule_with_mocks
 from pants.testutil.test_base import TestBase
 from pants.util.ordered_set import FrozenOrderedSet
 
@@ -93,6 +100,7 @@ class GraphTest(TestBase):
             *super().rules(),
             QueryRule(Targets, (DependenciesRequest, OptionsBootstrapper)),
             QueryRule(TransitiveTargets, (Addresses, OptionsBootstrapper)),
+            QueryRule(TargetClosure, (Address, OptionsBootstrapper)),
             QueryRule(SourcesSnapshot, (Specs, OptionsBootstrapper)),
         )
 
@@ -141,6 +149,29 @@ class GraphTest(TestBase):
         assert transitive_targets.dependencies == FrozenOrderedSet([d1, d2, d3, t2, t1])
         assert transitive_targets.closure == FrozenOrderedSet([root, d2, d1, d3, t2, t1])
 
+    def test_target_closure(self) -> None:
+        self.add_to_build_file(
+            "",
+            dedent(
+                """\
+                target(name='t1')
+                target(name='t2', dependencies=[':t1'])
+                target(name='root', dependencies=[':t2', ':t1'])
+                """
+            ),
+        )
+        bootstrapper = create_options_bootstrapper()
+
+        def get_closure(name: str) -> TargetClosure:
+            return self.request_product(
+                TargetClosure, [Address("", target_name=name), bootstrapper]
+            )
+
+        root_closure = get_closure("root")
+        assert root_closure.target.address == Address("", target_name="root")
+        assert [tgt.address.target_name for tgt in root_closure.closure] == ["root", "t2", "t1"]
+        assert get_closure("t2").closure == FrozenOrderedSet(list(root_closure.closure)[1:])
+
     def transitive_targets_transitive_exclude(self) -> None:
         self.add_to_build_file(
             "",
@@ -208,18 +239,16 @@ class GraphTest(TestBase):
     def assert_failed_cycle(
         self, *, root_target_name: str, subject_target_name: str, path_target_names: Tuple[str, ...]
     ) -> None:
-        with self.assertRaises(ExecutionError) as e:
-            self.request_product(
-                TransitiveTargets,
-                [
-                    Addresses([Address("", target_name=root_target_name)]),
-                    create_options_bootstrapper(),
-                ],
+        root = Address("", target_name=root_target_name)
+        for product, subject in ((TransitiveTargets, Addresses([root])), (TargetClosure, root)):
+            with self.assertRaises(ExecutionError) as e:
+                self.request_product(product, [subject, create_options_bootstrapper()])
+            (cycle_exception,) = e.exception.wrapped_exceptions
+            assert isinstance(cycle_exception, CycleException)
+            assert cycle_exception.subject == Address("", target_name=subject_target_name)
+            assert cycle_exception.path == tuple(
+                Address("", target_name=p) for p in path_target_names
             )
-        (cycle_exception,) = e.exception.wrapped_exceptions
-        assert isinstance(cycle_exception, CycleException)
-        assert cycle_exception.subject == Address("", target_name=subject_target_name)
-        assert cycle_exception.path == tuple(Address("", target_name=p) for p in path_target_names)
 
     def test_cycle_self(self) -> None:
         self.add_to_build_file(
@@ -325,6 +354,161 @@ class GraphTest(TestBase):
         assert result.snapshot.files == ("demo/BUILD", "demo/f1.txt", "demo/f2.txt")
 
 
+def mock_closures(
+    direct_deps: Dict[Target, Tuple[Target, ...]]
+) -> Dict[Address, _TransitiveClosure]:
+    """Compute the closure of each of the given (acyclic) targets, as `transitive_closure` would."""
+    closures: Dict[Address, _TransitiveClosure] = {}
+
+    def closure(tgt: Target) -> _TransitiveClosure:
+        if tgt.address not in closures:
+            closures[tgt.address] = _TransitiveClosure(
+                tgt,
+                direct_deps[tgt],
+                FrozenOrderedSet(
+                    itertools.chain([tgt], *(closure(dep).closure for dep in direct_deps[tgt]))
+                ),
+                contains_cycle=False,
+            )
+        return closures[tgt.address]
+
+    for tgt in direct_deps:
+        closure(tgt)
+    return closures
+
+
+def test_transitive_closure_reuses_dependency_closures() -> None:
+    t1, t2, d1, d2, root = (
+        MockTarget({}, address=Address("", target_name=name))
+        for name in ("t1", "t2", "d1", "d2", "root")
+    )
+    closures = mock_closures({root: (d1, d2), d1: (t1,), d2: (t2,), t2: (t1,), t1: ()})
+    requested_dependencies: List[Address] = []
+    requested_closures: List[Address] = []
+
+    def mock_dependencies(request: DependenciesRequest) -> Targets:
+        requested_dependencies.append(request.field.address)
+        return Targets([d1, d2])
+
+    def mock_closure(address: Address) -> _TransitiveClosure:
+        requested_closures.append(address)
+        return closures[address]
+
+    result = run_rule_with_mocks(
+        transitive_closure,
+        rule_args=[root.address],
+        mock_gets=[
+            MockGet(
+                product_type=WrappedTarget, subject_type=Address, mock=lambda _: WrappedTarget(root)
+            ),
+            MockGet(product_type=Targets, subject_type=DependenciesRequest, mock=mock_dependencies),
+            MockGet(product_type=_TransitiveClosure, subject_type=Address, mock=mock_closure),
+        ],
+    )
+    assert result.target == root
+    assert result.dependencies == (d1, d2)
+    assert result.closure == FrozenOrderedSet([root, d1, t1, d2, t2])
+    assert not result.contains_cycle
+    # Only the direct dependencies of the root were resolved: the rest of its closure was reused
+    # from the closures of those dependencies.
+    assert requested_dependencies == [root.address]
+    assert requested_closures == [d1.address, d2.address]
+
+
+def test_transitive_closure_walks_cycles() -> None:
+    t1, t2, t3_file = (
+        MockTarget({}, address=address)
+        for address in (
+            Address("", target_name="t1"),
+            Address("", target_name="t2"),
+            Address("", relative_file_path="t3.txt", target_name="t3"),
+        )
+    )
+
+    def run(direct_deps: Dict[Target, Tuple[Target, ...]]) -> _TransitiveClosure:
+        targets_by_address = {tgt.address: tgt for tgt in direct_deps}
+        return run_rule_with_mocks(
+            transitive_closure,
+            rule_args=[t1.address],
+            mock_gets=[
+                MockGet(
+                    product_type=WrappedTarget,
+                    subject_type=Address,
+                    mock=lambda address: WrappedTarget(targets_by_address[address]),
+                ),
+                MockGet(
+                    product_type=Targets,
+                    subject_type=DependenciesRequest,
+                    mock=lambda request: Targets(
+                        direct_deps[targets_by_address[request.field.address]]
+                    ),
+                ),
+                # The engine returns None for a weak dependency which would create a cycle.
+                MockGet(product_type=_TransitiveClosure, subject_type=Address, mock=lambda _: None),
+            ],
+        )
+
+    result = run({t1: (t2,), t2: (t1,)})
+    assert result.closure == FrozenOrderedSet([t1, t2])
+    assert result.contains_cycle
+
+    # File-level cycles are tolerated.
+    result = run({t1: (t3_file,), t3_file: (t1,)})
+    assert result.closure == FrozenOrderedSet([t1, t3_file])
+    assert not result.contains_cycle
+
+
+def test_transitive_targets_composes_closures() -> None:
+    t1, t2, d1, d2, d3, root = (
+        MockTarget({}, address=Address("", target_name=name))
+        for name in ("t1", "t2", "d1", "d2", "d3", "root")
+    )
+    closures = mock_closures({root: (d1, d2, d3), d1: (t1,), d2: (t2,), d3: (), t2: (t1,), t1: ()})
+
+    result = run_rule_with_mocks(
+        transitive_targets,
+        rule_args=[Targets([root, d2])],
+        mock_gets=[
+            MockGet(
+                product_type=_TransitiveClosure, subject_type=Address, mock=closures.__getitem__
+            )
+        ],
+    )
+    # The order is that of a breadth first walk from both roots at once.
+    assert result.roots == (root, d2)
+    assert result.dependencies == FrozenOrderedSet([d1, d2, d3, t2, t1])
+
+
+def test_detect_cycles_reports_all_cycles() -> None:
+    t1, t2, t3, t4 = (Address("", target_name=n) for n in ("t1", "t2", "t3", "t4"))
+    dependency_mapping = {t1: (t2, t3), t2: (t1,), t3: (t4,), t4: (t3,)}
+    with pytest.raises(CycleException) as e:
+        _detect_cycles((t1,), dependency_mapping)
+    assert e.value.subject == t1
+    assert e.value.path == (t1, t2, t1)
+    assert e.value.additional_cycles == ((t3, (t1, t3, t4, t3)),)
+    assert "Dependency graph contained 2 cycles" in str(e.value)
+
+
+def test_detect_cycles_tolerates_file_addresses() -> None:
+    t1 = Address("", target_name="t1")
+    t2_file = Address("", relative_file_path="t2.txt", target_name="t2")
+    _detect_cycles((t1,), {t1: (t2_file,), t2_file: (t1,)})
+
+
+def test_detect_cycles_deep_graph() -> None:
+    """Cycle detection must not be limited by the recursion limit."""
+    chain = [Address("", target_name=f"t{i}") for i in range(sys.getrecursionlimit() * 2)]
+    dependency_mapping = {a: (b,) for a, b in zip(chain, chain[1:])}
+    dependency_mapping[chain[-1]] = ()
+    _detect_cycles((chain[0],), dependency_mapping)
+
+    dependency_mapping[chain[-1]] = (chain[0],)
+    with pytest.raises(CycleException) as e:
+        _detect_cycles((chain[0],), dependency_mapping)
+    assert e.value.path == (*chain, chain[0])
+
+
 class TestOwners(TestBase):
     @classmethod
     def target_types(cls):
@@ -413,6 +597,23 @@ class TestOwners(TestBase):
             },
         )
 
+    def test_owners_batched_across_directories(self) -> None:
+        """Owners may be declared in any ancestor directory, and one request may cover many
+        directories."""
+        self.create_files("demo", ["f.txt"])
+        self.create_files("demo/subdir", ["f.txt", "unowned.txt"])
+        self.add_to_build_file("demo", "target(sources=['f.txt', 'subdir/f.txt'])")
+        self.create_files("other", ["f.txt"])
+        self.add_to_build_file("other", "target(sources=['*.txt'])")
+        self.assert_owners(
+            ["demo/f.txt", "demo/subdir/f.txt", "demo/subdir/unowned.txt", "other/f.txt"],
+            expected={
+                Address("demo", relative_file_path="f.txt", target_name="demo"),
+                Address("demo", relative_file_path="subdir/f.txt", target_name="demo"),
+                Address("other", relative_file_path="f.txt", target_name="other"),
+            },
+        )
+
 
 class TestSpecsToAddresses(TestBase):
     @classmethod
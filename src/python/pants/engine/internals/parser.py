@@ -1,18 +1,26 @@
 # Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import hashlib
+import logging
+import marshal
 import os.path
 import tokenize
 from dataclasses import dataclass
+from importlib.util import MAGIC_NUMBER
 from io import StringIO
-from typing import Any, Dict, Iterable, List, Tuple, cast
+from types import CodeType
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, cast
 
 from pants.base.exceptions import UnaddressableObjectError
 from pants.base.parse_context import ParseContext
 from pants.build_graph.build_file_aliases import BuildFileAliases
 from pants.engine.internals.target_adaptor import TargetAdaptor
+from pants.util.dirutil import safe_mkdir
 from pants.util.frozendict import FrozenDict
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class BuildFilePreludeSymbols:
@@ -23,13 +31,150 @@ class ParseError(Exception):
     """Indicates an error parsing BUILD configuration."""
 
 
+@dataclass(frozen=True)
+class CompiledBuildFile:
+    # A digest of the interpreter's bytecode version, and of the BUILD file's path and content.
+    key: str
+    code: CodeType
+    # The line of the first import statement in the file, if any.
+    import_lineno: Optional[int]
+
+    @property
+    def names(self) -> FrozenSet[str]:
+        """All global and attribute names referenced by the BUILD file, including in functions."""
+        names: Set[str] = set()
+        code_objects = [self.code]
+        while code_objects:
+            code = code_objects.pop()
+            names.update(code.co_names)
+            code_objects.extend(c for c in code.co_consts if isinstance(c, CodeType))
+        return frozenset(names)
+
+
+# Builtins which may make the result of evaluating a BUILD file depend on something other than its
+# content.
+_IMPURE_BUILTINS = frozenset(
+    (
+        "__import__",
+        "compile",
+        "eval",
+        "exec",
+        "getattr",
+        "globals",
+        "input",
+        "locals",
+        "open",
+        "vars",
+    )
+)
+
+
+class BuildFileCache:
+    """A cache of compiled BUILD files, and of the targets that they declare.
+
+    Compiled files are kept in memory for the lifetime of the cache, and, if a directory is given,
+    persisted there so that they survive pantsd restarts. Declared targets are only persisted,
+    since the engine already memoizes parsed BUILD files in memory. Persisted entries are keyed by
+    the content of the BUILD file, so stale entries are never matched, and are ignored if they
+    cannot be read.
+
+    The persistent cache is best-effort: any error reading or writing it is logged and treated as a
+    cache miss.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None) -> None:
+        self._cache_dir = cache_dir
+        # NB: Only the most recent content of each BUILD file is kept in memory.
+        self._compiled: Dict[str, CompiledBuildFile] = {}
+
+    @property
+    def persistent(self) -> bool:
+        return self._cache_dir is not None
+
+    def compile(self, filepath: str, build_file_content: str) -> CompiledBuildFile:
+        key = hashlib.sha256(
+            b"%s%s\0%s" % (MAGIC_NUMBER, filepath.encode(), build_file_content.encode())
+        ).hexdigest()
+        cached = self._compiled.get(filepath)
+        if cached is not None and cached.key == key:
+            return cached
+        loaded = self._load("code", key)
+        if loaded is not None:
+            import_lineno, code = loaded
+            compiled = CompiledBuildFile(key=key, code=code, import_lineno=import_lineno)
+        else:
+            compiled = CompiledBuildFile(
+                key=key,
+                code=compile(build_file_content, filepath, "exec", dont_inherit=True),
+                import_lineno=find_import_lineno(build_file_content),
+            )
+            self._store("code", key, (compiled.import_lineno, compiled.code))
+        self._compiled[filepath] = compiled
+        return compiled
+
+    def load_target_adaptors(self, key: str) -> Optional[List[TargetAdaptor]]:
+        loaded = self._load("targets", key)
+        if loaded is None:
+            return None
+        return [TargetAdaptor(type_alias, name, **kwargs) for type_alias, name, kwargs in loaded]
+
+    def store_target_adaptors(self, key: str, target_adaptors: Iterable[TargetAdaptor]) -> None:
+        # NB: `marshal` only supports plain data, so targets with any other kind of field value
+        # (such as objects created by a plugin) fail to be stored, and are parsed every time.
+        self._store(
+            "targets",
+            key,
+            [(tgt.type_alias, tgt.name, tgt.kwargs) for tgt in target_adaptors],
+        )
+
+    def _path(self, kind: str, key: str) -> Optional[str]:
+        return os.path.join(self._cache_dir, kind, key[:2], key) if self._cache_dir else None
+
+    def _load(self, kind: str, key: str) -> Any:
+        path = self._path(kind, key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as fp:
+                return marshal.load(fp)
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            logger.debug(f"Failed to read the cached BUILD file entry at {path}: {e}")
+            return None
+
+    def _store(self, kind: str, key: str, value: Any) -> None:
+        path = self._path(kind, key)
+        if path is None:
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            safe_mkdir(os.path.dirname(path))
+            with open(tmp_path, "wb") as fp:
+                marshal.dump(value, fp)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Failed to write the cached BUILD file entry to {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+
 class Parser:
     def __init__(
-        self, *, target_type_aliases: Iterable[str], object_aliases: BuildFileAliases
+        self,
+        *,
+        target_type_aliases: Iterable[str],
+        object_aliases: BuildFileAliases,
+        build_file_cache: Optional[BuildFileCache] = None,
     ) -> None:
+        target_type_aliases = frozenset(target_type_aliases)
         self._symbols, self._parse_context = self._generate_symbols(
             target_type_aliases, object_aliases
         )
+        self._target_type_aliases = target_type_aliases
+        self._build_file_cache = build_file_cache or BuildFileCache()
+        self._prelude_symbols: Optional[BuildFilePreludeSymbols] = None
+        self._global_symbols: Dict[str, Any] = {}
+        self._symbols_fingerprint = ""
+        self._impure_names: FrozenSet[str] = frozenset()
 
     @staticmethod
     def _generate_symbols(
@@ -78,6 +223,50 @@ class Parser:
         # Mutate the parse context with the new path.
         self._parse_context._storage.clear(os.path.dirname(filepath))
 
+        compiled = self._build_file_cache.compile(filepath, build_file_content)
+        global_symbols = dict(self._global_symbols_with_preludes(extra_symbols))
+
+        # If the BUILD file only declares targets, then the targets depend only on its content and
+        # on the names of the available symbols, so they may be reused from a previous run. If it
+        # refers to any objects, macros, or impure builtins, it is evaluated every time.
+        cache_key = None
+        if (
+            self._build_file_cache.persistent
+            and compiled.import_lineno is None
+            and compiled.names.isdisjoint(self._impure_names)
+        ):
+            cache_key = hashlib.sha256(
+                f"{compiled.key}\0{self._symbols_fingerprint}".encode()
+            ).hexdigest()
+            cached = self._build_file_cache.load_target_adaptors(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            exec(compiled.code, global_symbols)
+        except NameError as e:
+            valid_symbols = sorted(s for s in global_symbols.keys() if s != "__builtins__")
+            original = e.args[0].capitalize()
+            raise ParseError(f"{original}.\n\nAll registered symbols: {valid_symbols}")
+
+        if compiled.import_lineno is not None:
+            _raise_import_error(filepath, compiled.import_lineno)
+
+        target_adaptors = cast(List[TargetAdaptor], list(self._parse_context._storage.objects))
+        if cache_key is not None:
+            self._build_file_cache.store_target_adaptors(cache_key, target_adaptors)
+        return target_adaptors
+
+    def _global_symbols_with_preludes(
+        self, extra_symbols: BuildFilePreludeSymbols
+    ) -> Dict[str, Any]:
+        """Return the symbols visible to BUILD files, which only change when the preludes do.
+
+        Each BUILD file is evaluated against its own copy of the returned dict.
+        """
+        if extra_symbols == self._prelude_symbols:
+            return self._global_symbols
+
         # We update the known symbols with Build File Preludes. This is subtle code; functions have
         # their own globals set on __globals__ which they derive from the environment where they
         # were executed. So for each extra_symbol which comes from a separate execution
@@ -90,34 +279,43 @@ class Parser:
             if hasattr(v, "__globals__"):
                 v.__globals__.update(global_symbols)
             global_symbols[k] = v
+        self._prelude_symbols = extra_symbols
+        self._global_symbols = global_symbols
+        self._symbols_fingerprint = hashlib.sha256(
+            "\0".join(sorted(global_symbols)).encode()
+        ).hexdigest()
+        self._impure_names = frozenset(
+            (set(global_symbols) - self._target_type_aliases) | _IMPURE_BUILTINS
+        )
+        return global_symbols
 
-        try:
-            exec(build_file_content, global_symbols)
-        except NameError as e:
-            valid_symbols = sorted(s for s in global_symbols.keys() if s != "__builtins__")
-            original = e.args[0].capitalize()
-            raise ParseError(f"{original}.\n\nAll registered symbols: {valid_symbols}")
-
-        error_on_imports(build_file_content, filepath)
 
-        return cast(List[TargetAdaptor], list(self._parse_context._storage.objects))
+def error_on_imports(build_file_content: str, filepath: str) -> None:
+    import_lineno = find_import_lineno(build_file_content)
+    if import_lineno is not None:
+        _raise_import_error(filepath, import_lineno)
 
 
-def error_on_imports(build_file_content: str, filepath: str) -> None:
+def find_import_lineno(build_file_content: str) -> Optional[int]:
+    """Return the line of the first import statement in the given source, if any."""
     # This is poor sandboxing; there are many ways to get around this. But it's sufficient to tell
     # users who aren't malicious that they're doing something wrong, and it has a low performance
     # overhead.
     if "import" not in build_file_content:
-        return
+        return None
     io_wrapped_python = StringIO(build_file_content)
     for token in tokenize.generate_tokens(io_wrapped_python.readline):
         token_str = token[1]
         lineno, _ = token[2]
-        if token_str != "import":
-            continue
-        raise ParseError(
-            f"Import used in {filepath} at line {lineno}. Import statements are banned in "
-            "BUILD files because they can easily break Pants caching and lead to stale results. "
-            "\n\nInstead, consider writing a macro (https://www.pantsbuild.org/docs/macros) or "
-            "writing a plugin (https://www.pantsbuild.org/docs/plugins-overview)."
-        )
+        if token_str == "import":
+            return cast(int, lineno)
+    return None
+
+
+def _raise_import_error(filepath: str, lineno: int) -> None:
+    raise ParseError(
+        f"Import used in {filepath} at line {lineno}. Import statements are banned in "
+        "BUILD files because they can easily break Pants caching and lead to stale results. "
+        "\n\nInstead, consider writing a macro (https://www.pantsbuild.org/docs/macros) or "
+        "writing a plugin (https://www.pantsbuild.org/docs/plugins-overview)."
+    )
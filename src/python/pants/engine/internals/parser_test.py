@@ -1,10 +1,20 @@
 # Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import os
+from typing import List
+
 import pytest
 
 from pants.build_graph.build_file_aliases import BuildFileAliases
-from pants.engine.internals.parser import BuildFilePreludeSymbols, ParseError, Parser
+from pants.engine.internals.parser import (
+    BuildFileCache,
+    BuildFilePreludeSymbols,
+    ParseError,
+    Parser,
+)
+from pants.engine.internals.target_adaptor import TargetAdaptor
+from pants.util.contextutil import temporary_dir
 from pants.util.frozendict import FrozenDict
 
 
@@ -17,6 +27,83 @@ def test_imports_banned() -> None:
     assert "Import used in dir/BUILD at line 4" in str(exc.value)
 
 
+def test_imports_banned_when_cached() -> None:
+    content = "\nx = 'hello'\n\nimport os\n"
+    with temporary_dir() as tmpdir:
+        BuildFileCache(tmpdir).compile("dir/BUILD", content)
+        parser = Parser(
+            target_type_aliases=[],
+            object_aliases=BuildFileAliases(),
+            build_file_cache=BuildFileCache(tmpdir),
+        )
+        with pytest.raises(ParseError) as exc:
+            parser.parse("dir/BUILD", content, BuildFilePreludeSymbols(FrozenDict()))
+    assert "Import used in dir/BUILD at line 4" in str(exc.value)
+
+
+def test_code_cache() -> None:
+    with temporary_dir() as tmpdir:
+        cache = BuildFileCache(tmpdir)
+        compiled = cache.compile("dir/BUILD", "tgt()")
+        assert cache.compile("dir/BUILD", "tgt()") is compiled
+        assert compiled.import_lineno is None
+        assert compiled.code.co_filename == "dir/BUILD"
+
+        # A new cache reads from the same directory, as would a restarted pantsd.
+        reloaded = BuildFileCache(tmpdir).compile("dir/BUILD", "tgt()")
+        assert reloaded == compiled
+        assert BuildFileCache(tmpdir).compile("dir/BUILD", "tgt(name='x')") != compiled
+        other = BuildFileCache(tmpdir).compile("other/BUILD", "tgt()")
+        assert other.code.co_filename == "other/BUILD"
+
+
+def test_target_adaptors_cache() -> None:
+    object_aliases = BuildFileAliases(
+        objects={"obj": object()},
+        context_aware_object_factories={"caof": lambda parse_context: lambda: "caof"},
+    )
+    prelude_symbols = BuildFilePreludeSymbols(FrozenDict({"prelude": lambda: "prelude"}))
+
+    with temporary_dir() as tmpdir:
+
+        def parse(content: str) -> List[TargetAdaptor]:
+            # A new parser and cache for every parse, as would be used by a restarted pantsd.
+            parser = Parser(
+                target_type_aliases=["tgt"],
+                object_aliases=object_aliases,
+                build_file_cache=BuildFileCache(tmpdir),
+            )
+            return parser.parse("dir/BUILD", content, prelude_symbols)
+
+        def cached_entries() -> int:
+            return sum(len(files) for _, _, files in os.walk(os.path.join(tmpdir, "targets")))
+
+        content = "tgt(tags=['a', 'b'], sources=('f.txt',))\ntgt(name='other', timeout=10)"
+        parsed = parse(content)
+        assert cached_entries() == 1
+        assert parse(content) == parsed
+        assert [tgt.name for tgt in parsed] == ["dir", "other"]
+
+        # BUILD files which refer to objects, macros, or impure builtins are never cached.
+        for impure_content in [
+            "tgt(name=caof())",
+            "tgt(name=prelude())",
+            "tgt(name=str(id(obj)))",
+            "tgt(name='x')\nif False:\n    open('f')",
+        ]:
+            parse(impure_content)
+        assert cached_entries() == 1
+
+
+def test_symbols_do_not_leak_between_files() -> None:
+    parser = Parser(target_type_aliases=["tgt"], object_aliases=BuildFileAliases())
+    prelude_symbols = BuildFilePreludeSymbols(FrozenDict({"prelude": 0}))
+    parser.parse("a/BUILD", "local = 'a'\ntgt(name=local)", prelude_symbols)
+    with pytest.raises(ParseError) as exc:
+        parser.parse("b/BUILD", "tgt(name=local)", prelude_symbols)
+    assert str(exc.value).startswith("Name 'local' is not defined.")
+
+
 def test_unrecognized_symbol() -> None:
     parser = Parser(
         target_type_aliases=["tgt"],
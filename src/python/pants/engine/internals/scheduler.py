@@ -27,6 +27,7 @@ from pants.engine.fs import (
     MergeDigests,
     PathGlobs,
     PathGlobsAndRoot,
+    Paths,
     RemovePrefix,
     Snapshot,
 )
@@ -121,6 +122,13 @@ class Scheduler:
         self._native = native
         self.include_trace_on_error = include_trace_on_error
         self._visualize_to_dir = visualize_to_dir
+        # Totals for evictions of graph Nodes under memory pressure, reported with the metrics of
+        # every session.
+        self._eviction_metrics = {
+            "graph_evictions": 0,
+            "graph_evicted_node_count": 0,
+            "graph_eviction_dirtied_node_count": 0,
+        }
         # Validate and register all provided and intrinsic tasks.
         rule_index = RuleIndex.create(rules)
 
@@ -130,6 +138,7 @@ class Scheduler:
         types = PyTypes(
             directory_digest=Digest,
             snapshot=Snapshot,
+            paths=Paths,
             file_content=FileContent,
             digest_contents=DigestContents,
             address=Address,
@@ -288,6 +297,27 @@ class Scheduler:
     def graph_len(self):
         return self._native.lib.graph_len(self._scheduler)
 
+    def cheaply_recomputable_len(self) -> Tuple[int, int]:
+        """Returns the number of completed Nodes which `evict_cheaply_recomputable` would evict, and
+        the total number of completed Nodes."""
+        return cast(
+            Tuple[int, int], self._native.lib.graph_cheaply_recomputable_len(self._scheduler)
+        )
+
+    def evict_cheaply_recomputable(self) -> int:
+        """Evict the values of Nodes which are cheap to recompute, such as filesystem operations,
+        intrinsics over the Store, and cached processes.
+
+        Their dependents are dirtied, and will be rerun if they are requested again.
+
+        :returns: The number of evicted Nodes.
+        """
+        evicted, dirtied = self._native.lib.graph_evict_cheaply_recomputable(self._scheduler)
+        self._eviction_metrics["graph_evictions"] += 1
+        self._eviction_metrics["graph_evicted_node_count"] += evicted
+        self._eviction_metrics["graph_eviction_dirtied_node_count"] += dirtied
+        return cast(int, evicted)
+
     def execution_add_root_select(self, execution_request, subject_or_params, product):
         params = self._to_params_list(subject_or_params)
         self._native.lib.execution_add_root_select(
@@ -310,7 +340,10 @@ class Scheduler:
         return self._visualize_to_dir
 
     def _metrics(self, session):
-        return self._native.lib.scheduler_metrics(self._scheduler, session)
+        return {
+            **self._native.lib.scheduler_metrics(self._scheduler, session),
+            **self._eviction_metrics,
+        }
 
     def poll_workunits(self, session, max_log_verbosity: LogLevel) -> PolledWorkunits:
         result: Tuple[Tuple[Workunit], Tuple[Workunit]] = self._native.lib.poll_session_workunits(
@@ -17,6 +17,7 @@ from typing import (
     Iterator,
     Mapping,
     Optional,
+    Sequence,
     Tuple,
     Type,
     TypeVar,
@@ -246,6 +247,27 @@ class AsyncField(Field, metaclass=ABCMeta):
 # NB: This TypeVar is what allows `Target.get()` to properly work with MyPy so that MyPy knows
 # the precise Field returned.
 _F = TypeVar("_F", bound=Field)
+_Tgt = TypeVar("_Tgt", bound="Target")
+
+
+# PrimitiveFields do not store their address, and are immutable, so every target which does not
+# define a particular optional field can share a single instance of it with its default value.
+_DEFAULT_FIELDS: Dict[Type[Field], Field] = {}
+
+
+def _default_field(field_type: Type[_F], *, address: Address) -> _F:
+    if not issubclass(field_type, PrimitiveField) or field_type.required:
+        return field_type(raw_value=None, address=address)
+    default = _DEFAULT_FIELDS.get(field_type)
+    if default is None:
+        # NB: If computing the default fails, the error refers to this target's address, and the
+        # default will be computed (and fail) again for the next target.
+        default = _DEFAULT_FIELDS[field_type] = field_type(raw_value=None, address=address)
+    return cast(_F, default)
+
+
+def _sorted_field_values(fields: Iterable[Field]) -> FrozenDict[Type[Field], Field]:
+    return FrozenDict(sorted(((type(field), field) for field in fields), key=lambda x: x[0].alias))
 
 
 @frozen_after_init
@@ -288,13 +310,30 @@ class Target(ABC):
             field_values[field_type] = field_type(value, address=address)
         # For undefined fields, mark the raw value as None.
         for field_type in set(self.field_types) - set(field_values.keys()):
-            field_values[field_type] = field_type(raw_value=None, address=address)
-        self.field_values = FrozenDict(
-            sorted(
-                field_values.items(),
-                key=lambda field_type_to_val_pair: field_type_to_val_pair[0].alias,
-            )
-        )
+            field_values[field_type] = _default_field(field_type, address=address)
+        self.field_values = _sorted_field_values(field_values.values())
+
+    @final
+    @classmethod
+    def _create_from_fields(
+        cls: Type[_Tgt],
+        fields: Iterable[Field],
+        *,
+        address: Address,
+        plugin_fields: Tuple[Type[Field], ...],
+    ) -> _Tgt:
+        """Create a target from already hydrated fields, which may be shared with other targets.
+
+        The caller is responsible for providing exactly one field for each of the target type's
+        field types.
+        """
+        tgt = cls.__new__(cls)
+        tgt.address = address
+        tgt.plugin_fields = plugin_fields
+        tgt.field_values = _sorted_field_values(fields)
+        # NB: Mark the instance as frozen, as `@frozen_after_init` would once `__init__` completed.
+        tgt._is_frozen = True
+        return tgt
 
     @final
     @property
@@ -519,6 +558,10 @@ class Subtargets:
     # The subtargets, one per file that was owned by the base target.
     subtargets: Tuple[Target, ...]
 
+    @memoized_property
+    def by_address(self) -> Dict[Address, Target]:
+        return {subtarget.address: subtarget for subtarget in self.subtargets}
+
 
 @dataclass(frozen=True)
 class WrappedTarget:
@@ -599,6 +642,20 @@ class TransitiveTargets:
         return FrozenOrderedSet([*self.roots, *self.dependencies])
 
 
+@dataclass(frozen=True)
+class TargetClosure:
+    """A single Target, and the targets that it transitively depends upon.
+
+    This is requested with an `Address`, and is computed from the closures of the target's direct
+    dependencies, so the engine memoizes it per address. Prefer it to `TransitiveTargets` when you
+    need the closures of many individual targets which share dependencies, such as tests.
+    """
+
+    target: Target
+    # The target itself, followed by its transitive dependencies.
+    closure: FrozenOrderedSet[Target]
+
+
 @frozen_after_init
 @dataclass(unsafe_hash=True)
 class RegisteredTargetTypes:
@@ -649,9 +706,6 @@ def generate_subtarget_address(base_target_address: Address, *, full_file_name:
     )
 
 
-_Tgt = TypeVar("_Tgt", bound=Target)
-
-
 def generate_subtarget(
     base_target: _Tgt,
     *,
@@ -668,40 +722,82 @@ def generate_subtarget(
     are able to deduce specifically which files are being used, we can use only the files we care
     about, rather than the entire `sources` field.
     """
+    (subtarget,) = generate_subtargets_for_files(
+        base_target, full_file_names=(full_file_name,), union_membership=union_membership
+    )
+    return subtarget
+
+
+def generate_subtargets_for_files(
+    base_target: _Tgt,
+    *,
+    full_file_names: Sequence[str],
+    # NB: `union_membership` is only optional to facilitate tests. See generate_subtarget().
+    union_membership: Optional[UnionMembership] = None,
+) -> Tuple[_Tgt, ...]:
+    """Generate a subtarget of the base target for each of the given files, in the same order.
+
+    This is equivalent to calling generate_subtarget() for each file, but only does the work that
+    is common to all of the subtargets, such as matching the files against the base target's
+    `sources` field, once.
+    """
     if not base_target.has_field(Dependencies) or not base_target.has_field(Sources):
         raise ValueError(
             f"Target {base_target.address.spec} of type {type(base_target).__qualname__} does "
             "not have both a `dependencies` and `sources` field, and thus cannot generate a "
-            f"subtarget for the file {full_file_name}."
+            f"subtarget for the file {full_file_names[0]}."
         )
 
-    relativized_file_name = (
-        PurePath(full_file_name).relative_to(base_target.address.spec_path).as_posix()
-    )
+    sources_field = base_target[Sources]
+    matched_files = set(matches_filespec(sources_field.filespec, paths=full_file_names))
+    unmatched_file = next((f for f in full_file_names if f not in matched_files), None)
+    if unmatched_file is not None:
+        raise ValueError(
+            f"Target {base_target.address.spec}'s `sources` field does not match a file "
+            f"{unmatched_file}."
+        )
 
-    generated_target_fields = {}
-    for field in base_target.field_values.values():
-        if isinstance(field, Sources):
-            if not bool(matches_filespec(field.filespec, paths=[full_file_name])):
-                raise ValueError(
-                    f"Target {base_target.address.spec}'s `sources` field does not match a file "
-                    f"{full_file_name}."
-                )
-            value = (relativized_file_name,)
-        else:
-            value = (
-                field.value
-                if isinstance(field, PrimitiveField)
-                else field.sanitized_raw_value  # type: ignore[attr-defined]
+    target_cls = type(base_target)
+    plugin_fields = target_cls._find_plugin_fields(union_membership or UnionMembership({}))
+    # The fields registered for the target type may differ from the base target's, in which case
+    # the subtarget's fields must be validated from scratch.
+    share_fields = set(base_target.field_types) == {*target_cls.core_fields, *plugin_fields}
+    unhydrated_values = {
+        field.alias: (
+            field.value
+            if isinstance(field, PrimitiveField)
+            else field.sanitized_raw_value  # type: ignore[attr-defined]
+        )
+        for field in base_target.field_values.values()
+    }
+
+    def generate(full_file_name: str) -> _Tgt:
+        address = generate_subtarget_address(base_target.address, full_file_name=full_file_name)
+        generated_target_fields = {
+            **unhydrated_values,
+            sources_field.alias: (
+                PurePath(full_file_name).relative_to(base_target.address.spec_path).as_posix(),
+            ),
+        }
+        if not share_fields:
+            return target_cls(
+                generated_target_fields, address=address, union_membership=union_membership
             )
-        generated_target_fields[field.alias] = value
+        # PrimitiveFields are immutable and do not store their address, so the subtarget shares
+        # them with its base target. AsyncFields store their address, so they are recreated for
+        # the subtarget.
+        return target_cls._create_from_fields(
+            (
+                field
+                if isinstance(field, PrimitiveField)
+                else type(field)(generated_target_fields[field.alias], address=address)
+                for field in base_target.field_values.values()
+            ),
+            address=address,
+            plugin_fields=plugin_fields,
+        )
 
-    target_cls = type(base_target)
-    return target_cls(
-        generated_target_fields,
-        address=generate_subtarget_address(base_target.address, full_file_name=full_file_name),
-        union_membership=union_membership,
-    )
+    return tuple(generate(full_file_name) for full_file_name in full_file_names)
 
 
 # -----------------------------------------------------------------------------------------------
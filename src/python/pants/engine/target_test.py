@@ -37,6 +37,7 @@ from pants.engine.target import (
     TargetWithOrigin,
     generate_subtarget,
     generate_subtarget_address,
+    generate_subtargets_for_files,
 )
 from pants.engine.unions import UnionMembership
 from pants.testutil.rule_runner import MockGet, run_rule_with_mocks
@@ -171,6 +172,14 @@ def test_get_field() -> None:
     ).value == (not UnrelatedField.default)
 
 
+def test_default_primitive_fields_are_shared() -> None:
+    tgt1 = FortranTarget({}, address=Address("", target_name="tgt1"))
+    tgt2 = FortranTarget({}, address=Address("", target_name="tgt2"))
+    assert tgt1[FortranExtensions] is tgt2[FortranExtensions]
+    # AsyncFields store their address, so they are not shared.
+    assert tgt1[FortranSources].address != tgt2[FortranSources].address
+
+
 def test_primitive_field_hydration_is_eager() -> None:
     with pytest.raises(InvalidFieldException) as exc:
         FortranTarget(
@@ -460,9 +469,13 @@ def test_generate_subtarget() -> None:
     expected_subdir_address = Address(
         "src/fortran", relative_file_path="subdir/demo.f95", target_name="demo"
     )
-    assert generate_subtarget(
-        subdir_tgt, full_file_name="src/fortran/subdir/demo.f95"
-    ) == MockTarget({Sources.alias: ["subdir/demo.f95"]}, address=expected_subdir_address)
+    subdir_subtarget = generate_subtarget(subdir_tgt, full_file_name="src/fortran/subdir/demo.f95")
+    assert subdir_subtarget == MockTarget(
+        {Sources.alias: ["subdir/demo.f95"]}, address=expected_subdir_address
+    )
+    # PrimitiveFields are shared with the base target.
+    assert subdir_subtarget[Tags] is subdir_tgt[Tags]
+    assert subdir_subtarget[Dependencies].address == expected_subdir_address
     assert (
         generate_subtarget_address(subdir_tgt.address, full_file_name="src/fortran/subdir/demo.f95")
         == expected_subdir_address
@@ -485,6 +498,28 @@ def test_generate_subtarget() -> None:
     assert "does not have both a `dependencies` and `sources` field" in str(exc.value)
 
 
+def test_generate_subtargets_for_files() -> None:
+    class MockTarget(Target):
+        alias = "mock_target"
+        core_fields = (Dependencies, Tags, Sources)
+
+    base_tgt = MockTarget(
+        {Sources.alias: ["a.f95", "subdir/b.f95"], Tags.alias: ["demo"]},
+        address=Address("src/fortran", target_name="demo"),
+    )
+    full_file_names = ["src/fortran/subdir/b.f95", "src/fortran/a.f95"]
+    # Equivalent to generating each subtarget separately, and in the same order.
+    assert generate_subtargets_for_files(base_tgt, full_file_names=full_file_names) == tuple(
+        generate_subtarget(base_tgt, full_file_name=f) for f in full_file_names
+    )
+
+    with pytest.raises(ValueError) as exc:
+        generate_subtargets_for_files(
+            base_tgt, full_file_names=["src/fortran/a.f95", "src/fortran/fake_file.f95"]
+        )
+    assert "does not match a file src/fortran/fake_file.f95" in str(exc.value)
+
+
 # -----------------------------------------------------------------------------------------------
 # Test FieldSet. Also see engine/internals/graph_test.py.
 # -----------------------------------------------------------------------------------------------
@@ -17,7 +17,7 @@ from pants.engine.fs import PathGlobs, Snapshot, Workspace
 from pants.engine.goal import Goal
 from pants.engine.internals import build_files, graph, options_parsing, uuid
 from pants.engine.internals.native import Native
-from pants.engine.internals.parser import Parser
+from pants.engine.internals.parser import BuildFileCache, Parser
 from pants.engine.internals.scheduler import Scheduler, SchedulerSession
 from pants.engine.internals.selectors import Params
 from pants.engine.platform import create_platform_rules
@@ -211,12 +211,18 @@ class EngineInitializer:
 
         bootstrap_options = options_bootstrapper.bootstrap_options.for_global_scope()
         execution_options = execution_options or DEFAULT_EXECUTION_OPTIONS
+        build_file_cache_dir = (
+            Path(bootstrap_options.build_file_cache_dir).resolve().as_posix()
+            if bootstrap_options.build_file_cache_dir
+            else None
+        )
 
         @rule
         def parser_singleton() -> Parser:
             return Parser(
                 target_type_aliases=registered_target_types.aliases,
                 object_aliases=build_configuration.registered_aliases,
+                build_file_cache=BuildFileCache(build_file_cache_dir),
             )
 
         @rule
@@ -403,6 +403,20 @@ class GlobalOptions(Subsystem):
                 "`--pants-config-files`."
             ),
         )
+        register(
+            "--bootstrap-options-cache",
+            advanced=True,
+            type=bool,
+            default=True,
+            fingerprint=False,
+            help=(
+                "Persist the config that was parsed while bootstrapping options in "
+                f"{os.path.join(get_pants_cachedir(), 'bootstrap_options')}, and reuse it for "
+                "later runs with the same config files, pantsrc files, `PANTS_*` environment "
+                "variables and bootstrap flags. This avoids re-parsing config files in the client "
+                "on every run."
+            ),
+        )
         register(
             "--pythonpath",
             advanced=True,
@@ -528,7 +542,10 @@ class GlobalOptions(Subsystem):
             default=2 ** 30,
             help=(
                 "The maximum memory usage of a pantsd process (in bytes). There is at most one "
-                "pantsd process per workspace."
+                "pantsd process per workspace. When the limit is exceeded, pantsd evicts the "
+                "values in its graph which are cheap to recompute if they are a large enough share "
+                "of the graph to bring its memory usage back under the limit, and otherwise "
+                "restarts."
             ),
         )
 
@@ -659,6 +676,16 @@ class GlobalOptions(Subsystem):
             ),
             default=os.path.join(get_pants_cachedir(), "named_caches"),
         )
+        register(
+            "--build-file-cache-dir",
+            advanced=True,
+            help=(
+                "Directory to use for compiled BUILD files and the targets that they declare, "
+                "which are reused across runs of Pants as long as the BUILD file has not changed. "
+                f"Set to the empty string to disable persisting BUILD files. {cache_instructions}"
+            ),
+            default=os.path.join(get_pants_cachedir(), "build_files"),
+        )
         register(
             "--remote-execution",
             advanced=True,
@@ -1,24 +1,153 @@
 # Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import getpass
+import hashlib
 import itertools
+import json
+import logging
 import os
+import pickle
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, Sequence, Set, Tuple, Type
-
-from pants.base.build_environment import get_default_pants_config_file
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Type
+
+from pants.base.build_environment import (
+    get_buildroot,
+    get_default_pants_config_file,
+    get_pants_cachedir,
+    get_pants_configdir,
+    pants_version,
+)
 from pants.option.config import Config
 from pants.option.custom_types import ListValueComponent
 from pants.option.global_options import GlobalOptions
 from pants.option.optionable import Optionable
 from pants.option.options import Options
 from pants.option.scope import GLOBAL_SCOPE, ScopeInfo
-from pants.util.dirutil import read_file
-from pants.util.memo import memoized_method, memoized_property
+from pants.util.dirutil import (
+    maybe_read_file,
+    read_file,
+    safe_concurrent_creation,
+    safe_delete,
+    safe_mkdir,
+)
+from pants.util.memo import memoized_classmethod, memoized_method, memoized_property
 from pants.util.ordered_set import FrozenOrderedSet
 from pants.util.strutil import ensure_text
 
+logger = logging.getLogger(__name__)
+
+# Bump this whenever the format of bootstrap cache entries changes, so that entries written by older
+# versions of this module are ignored.
+_BOOTSTRAP_CACHE_VERSION = 1
+
+# The number of entries to retain in the bootstrap cache: enough for a handful of repos and
+# distinct bootstrap flags, while keeping the directory from growing without bound.
+_BOOTSTRAP_CACHE_MAX_ENTRIES = 64
+
+
+# We can't use pants.engine.fs.FileContent here because it would cause a circular dep.
+@dataclass(frozen=True)
+class _FileContent:
+    path: str
+    content: bytes
+
+
+def _filecontent_for(path: str) -> _FileContent:
+    return _FileContent(
+        ensure_text(path),
+        read_file(path, binary_mode=True),
+    )
+
+
+def _maybe_digest(path: str) -> Optional[str]:
+    content = maybe_read_file(path, binary_mode=True)
+    return None if content is None else hashlib.sha1(content).hexdigest()
+
+
+@dataclass(frozen=True)
+class _CachedConfig:
+    """A post-bootstrap Config, along with the digests of the pantsrc files that were considered
+    while computing it.
+
+    The pantsrc files to read are only known after bootstrapping, so rather than being part of the
+    cache key they are validated when the entry is loaded. A digest of None records that the file
+    did not exist.
+    """
+
+    rcfile_digests: Tuple[Tuple[str, Optional[str]], ...]
+    config: Config
+
+    def is_valid(self) -> bool:
+        return all(_maybe_digest(path) == digest for path, digest in self.rcfile_digests)
+
+
+class _BootstrapCache:
+    """A directory of post-bootstrap Configs, keyed by everything that bootstrapping reads.
+
+    The cache is best-effort: an entry that cannot be read or written is treated as a miss.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+
+    @staticmethod
+    def key(
+        *,
+        env_tuples: Tuple[Tuple[str, str], ...],
+        bootstrap_args: Tuple[str, ...],
+        config_files: Sequence[_FileContent],
+        allow_pantsrc: bool,
+    ) -> str:
+        # NB: Config seed values are computed from the buildroot and the user's home, cache and
+        # config directories, so those are part of the key as well.
+        components = [
+            _BOOTSTRAP_CACHE_VERSION,
+            pants_version(),
+            get_buildroot(),
+            os.path.expanduser("~"),
+            getpass.getuser(),
+            get_pants_cachedir(),
+            get_pants_configdir(),
+            allow_pantsrc,
+            env_tuples,
+            bootstrap_args,
+            [(fc.path, hashlib.sha1(fc.content).hexdigest()) for fc in config_files],
+        ]
+        return hashlib.sha256(json.dumps(components).encode()).hexdigest()
+
+    def load(self, key: str) -> Optional[Config]:
+        try:
+            with open(os.path.join(self._directory, key), "rb") as fp:
+                entry = pickle.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable bootstrap cache entry {key}: {e!r}")
+            return None
+        if not isinstance(entry, _CachedConfig) or not entry.is_valid():
+            return None
+        return entry.config
+
+    def store(self, key: str, entry: _CachedConfig) -> None:
+        try:
+            safe_mkdir(self._directory)
+            with safe_concurrent_creation(os.path.join(self._directory, key)) as tmp_path:
+                with open(tmp_path, "wb") as fp:
+                    pickle.dump(entry, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            self._prune()
+        except Exception as e:
+            logger.debug(f"Failed to write bootstrap cache entry {key}: {e!r}")
+
+    def _prune(self) -> None:
+        entries = [entry for entry in os.scandir(self._directory) if ".tmp." not in entry.name]
+        if len(entries) <= _BOOTSTRAP_CACHE_MAX_ENTRIES:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[: len(entries) - _BOOTSTRAP_CACHE_MAX_ENTRIES]:
+            safe_delete(entry.path)
+
 
 @dataclass(frozen=True)
 class OptionsBootstrapper:
@@ -95,9 +224,36 @@ class OptionsBootstrapper:
         GlobalOptions.register_bootstrap_options(register_global)
         return bootstrap_options
 
+    @staticmethod
+    def default_cache_dir() -> str:
+        """The directory in which `create` persists bootstrapped config for production runs."""
+        return os.path.join(get_pants_cachedir(), "bootstrap_options")
+
+    @memoized_classmethod
+    def _bootstrap_flags(cls) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """Returns the long and short flags of all bootstrap options."""
+        flags = set()
+        short_flags = set()
+
+        def capture_the_flags(*args: str, **kwargs) -> None:
+            for arg in args:
+                flags.add(arg)
+                if len(arg) == 2:
+                    short_flags.add(arg)
+                elif kwargs.get("type") == bool:
+                    flags.add(f"--no-{arg[2:]}")
+
+        GlobalOptions.register_bootstrap_options(capture_the_flags)
+        return frozenset(flags), frozenset(short_flags)
+
     @classmethod
     def create(
-        cls, env: Mapping[str, str], args: Sequence[str], *, allow_pantsrc: bool
+        cls,
+        env: Mapping[str, str],
+        args: Sequence[str],
+        *,
+        allow_pantsrc: bool,
+        cache_dir: Optional[str] = None,
     ) -> "OptionsBootstrapper":
         """Parses the minimum amount of configuration necessary to create an OptionsBootstrapper.
 
@@ -107,34 +263,17 @@ class OptionsBootstrapper:
           consume pantsrc files, they should pass False in order to avoid reading files from
           absolute paths. Production usecases should pass True to allow options values to make the
           decision of whether to respect pantsrc files.
+        :param cache_dir: A directory in which to persist the post-bootstrap config, keyed by the
+          content of the config files, the `PANTS_*` env and the bootstrap args, so that a later
+          call with the same inputs skips parsing config and bootstrap options. Persisting is
+          disabled by `--no-bootstrap-options-cache`. Production usecases should pass
+          `default_cache_dir()`.
         """
         env = {k: v for k, v in env.items() if k.startswith("PANTS_")}
+        env_tuples = tuple(sorted(env.items(), key=lambda x: x[0]))
         args = tuple(args)
 
-        flags = set()
-        short_flags = set()
-
-        # We can't use pants.engine.fs.FileContent here because it would cause a circular dep.
-        @dataclass(frozen=True)
-        class FileContent:
-            path: str
-            content: bytes
-
-        def filecontent_for(path: str) -> FileContent:
-            return FileContent(
-                ensure_text(path),
-                read_file(path, binary_mode=True),
-            )
-
-        def capture_the_flags(*args: str, **kwargs) -> None:
-            for arg in args:
-                flags.add(arg)
-                if len(arg) == 2:
-                    short_flags.add(arg)
-                elif kwargs.get("type") == bool:
-                    flags.add(f"--no-{arg[2:]}")
-
-        GlobalOptions.register_bootstrap_options(capture_the_flags)
+        flags, short_flags = cls._bootstrap_flags()
 
         def is_bootstrap_option(arg: str) -> bool:
             components = arg.split("=", 1)
@@ -153,7 +292,19 @@ class OptionsBootstrapper:
         )
 
         config_file_paths = cls.get_config_file_paths(env=env, args=args)
-        config_files_products = [filecontent_for(p) for p in config_file_paths]
+        config_files_products = [_filecontent_for(p) for p in config_file_paths]
+
+        cache = _BootstrapCache(cache_dir) if cache_dir else None
+        cache_key = _BootstrapCache.key(
+            env_tuples=env_tuples,
+            bootstrap_args=bargs,
+            config_files=config_files_products,
+            allow_pantsrc=allow_pantsrc,
+        )
+        cached_config = cache.load(cache_key) if cache else None
+        if cached_config is not None:
+            return cls(env_tuples=env_tuples, bootstrap_args=bargs, args=args, config=cached_config)
+
         pre_bootstrap_config = Config.load_file_contents(config_files_products)
 
         initial_bootstrap_options = cls.parse_bootstrap_options(env, bargs, pre_bootstrap_config)
@@ -162,6 +313,7 @@ class OptionsBootstrapper:
         # Now re-read the config, post-bootstrapping. Note the order: First whatever we bootstrapped
         # from (typically pants.toml), then config override, then rcfiles.
         full_config_paths = pre_bootstrap_config.sources()
+        rcfiles: List[str] = []
         if allow_pantsrc and bootstrap_option_values.pantsrc:
             rcfiles = [
                 os.path.expanduser(str(rcfile)) for rcfile in bootstrap_option_values.pantsrc_files
@@ -169,13 +321,21 @@ class OptionsBootstrapper:
             existing_rcfiles = list(filter(os.path.exists, rcfiles))
             full_config_paths.extend(existing_rcfiles)
 
-        full_config_files_products = [filecontent_for(p) for p in full_config_paths]
+        full_config_files_products = [_filecontent_for(p) for p in full_config_paths]
         post_bootstrap_config = Config.load_file_contents(
             full_config_files_products,
             seed_values=bootstrap_option_values.as_dict(),
         )
 
-        env_tuples = tuple(sorted(env.items(), key=lambda x: x[0]))
+        if cache and bootstrap_option_values.bootstrap_options_cache:
+            cache.store(
+                cache_key,
+                _CachedConfig(
+                    rcfile_digests=tuple((rcfile, _maybe_digest(rcfile)) for rcfile in rcfiles),
+                    config=post_bootstrap_config,
+                ),
+            )
+
         return cls(
             env_tuples=env_tuples, bootstrap_args=bargs, args=args, config=post_bootstrap_config
         )
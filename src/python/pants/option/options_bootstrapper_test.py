@@ -5,13 +5,16 @@ import os
 import unittest
 from functools import partial
 from textwrap import dedent
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from unittest.mock import patch
 
 from pants.base.build_environment import get_buildroot
+from pants.option.config import Config
 from pants.option.option_value_container import OptionValueContainer
 from pants.option.options_bootstrapper import OptionsBootstrapper
 from pants.option.scope import ScopeInfo
 from pants.util.contextutil import temporary_dir, temporary_file, temporary_file_path
+from pants.util.dirutil import safe_file_dump
 from pants.util.logging import LogLevel
 
 
@@ -298,6 +301,47 @@ class OptionsBootstrapperTest(unittest.TestCase):
             assert opts4 is opts5
             assert opts1 is not opts5
 
+    def test_bootstrap_cache(self) -> None:
+        with temporary_dir() as tmpdir:
+            config = os.path.join(tmpdir, "pants.toml")
+            rcfile = os.path.join(tmpdir, "pantsrc")
+            cache_dir = os.path.join(tmpdir, "cache")
+            safe_file_dump(config, "[GLOBAL]\nlevel = 'debug'\n")
+
+            def create(*args: str, env: Optional[Dict[str, str]] = None) -> Tuple[LogLevel, bool]:
+                """Returns the bootstrapped log level, and whether config was parsed to compute it."""
+                with patch.object(
+                    Config, "load_file_contents", wraps=Config.load_file_contents
+                ) as load_file_contents:
+                    bootstrapper = OptionsBootstrapper.create(
+                        env=env or {},
+                        args=[*self._config_path(config), f"--pantsrc-files=['{rcfile}']", *args],
+                        allow_pantsrc=True,
+                        cache_dir=cache_dir,
+                    )
+                level = bootstrapper.get_bootstrap_options().for_global_scope().level
+                return level, load_file_contents.call_count == 2
+
+            assert (LogLevel.DEBUG, True) == create()
+            # Non-bootstrap args and env do not affect the key.
+            assert (LogLevel.DEBUG, False) == create("test", "src/python::", env={"USER": "x"})
+
+            # But bootstrap args, env, config and pantsrc files do.
+            assert (LogLevel.WARN, True) == create("--level=warn")
+            assert (LogLevel.WARN, True) == create(env={"PANTS_LEVEL": "warn"})
+
+            safe_file_dump(config, "[GLOBAL]\nlevel = 'error'\n")
+            assert (LogLevel.ERROR, True) == create()
+            assert (LogLevel.ERROR, False) == create()
+
+            safe_file_dump(rcfile, "[GLOBAL]\nlevel = 'warn'\n")
+            assert (LogLevel.WARN, True) == create()
+            assert (LogLevel.WARN, False) == create()
+
+            # Entries are not persisted when the cache is disabled.
+            assert (LogLevel.WARN, True) == create("--no-bootstrap-options-cache")
+            assert (LogLevel.WARN, True) == create("--no-bootstrap-options-cache")
+
     def test_bootstrap_short_options(self) -> None:
         def parse_options(*args: str) -> OptionValueContainer:
             full_args = [*args, *self._config_path(None)]
@@ -221,7 +221,8 @@ class Subsystem(Optionable):
         import path to a class that implements the `Subsystem` class. It will then inspect these
         classes for the presence of a special method called `handle_workunits`, which will.
 
-        be called with a set of kwargs - see the docstring for StreamingWorkunitHandler.
+        be called with a set of kwargs - see the docstring for StreamingWorkunitHandler. How the
+        method is fed workunits may be configured by decorating it with a `WorkunitSubscription`.
 
         For instance, you might invoke this method with something like:
 
@@ -307,5 +307,10 @@ class PantsDaemon(PantsDaemonProcessManager):
 def launch():
     """An external entrypoint that spawns a new pantsd instance."""
     PantsDaemon.create(
-        OptionsBootstrapper.create(env=os.environ, args=sys.argv, allow_pantsrc=True)
+        OptionsBootstrapper.create(
+            env=os.environ,
+            args=sys.argv,
+            allow_pantsrc=True,
+            cache_dir=OptionsBootstrapper.default_cache_dir(),
+        )
     ).run_sync()
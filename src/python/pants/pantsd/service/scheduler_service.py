@@ -45,8 +45,10 @@ class SchedulerService(PantsService):
         :param pidfile: A pidfile which should contain this processes' pid in order for the daemon
                         to remain valid.
         :param pid: This processes' pid.
-        :param max_memory_usage_in_bytes: The maximum memory usage of the process: the service will
-                                          shut down if it observes more than this amount in use.
+        :param max_memory_usage_in_bytes: The maximum memory usage of the process: if the service
+                                          observes more than this amount in use, it evicts the
+                                          values in the graph which are cheap to recompute, or
+                                          shuts down if that would not bring usage under the limit.
         """
         super().__init__()
         self._graph_helper = graph_scheduler
@@ -69,6 +71,8 @@ class SchedulerService(PantsService):
         self._pidfile = pidfile
         self._pid = pid
         self._max_memory_usage_in_bytes = max_memory_usage_in_bytes
+        # The memory usage observed when we last evicted values from the graph.
+        self._memory_usage_at_last_eviction: Optional[int] = None
 
     def _get_snapshot(self, globs: Tuple[str, ...], poll: bool) -> Optional[Snapshot]:
         """Returns a Snapshot of the input globs.
@@ -121,15 +125,46 @@ class SchedulerService(PantsService):
         if int(pid_from_file) != self._pid:
             raise Exception(f"Another instance of pantsd is running at {pid_from_file}")
 
+    def _memory_usage_in_bytes(self) -> int:
+        return cast(int, psutil.Process(self._pid).memory_info()[0])
+
     def _check_memory_usage(self):
-        memory_usage_in_bytes = psutil.Process(self._pid).memory_info()[0]
-        if memory_usage_in_bytes > self._max_memory_usage_in_bytes:
+        memory_usage_in_bytes = self._memory_usage_in_bytes()
+        if memory_usage_in_bytes <= self._max_memory_usage_in_bytes:
+            return
+        # Neither pymalloc nor the system allocator reliably return freed pages to the OS, so
+        # usage does not drop after an eviction: instead, the freed memory is reused. Until usage
+        # grows past what it was at the last eviction, there is nothing new to reclaim.
+        if (
+            self._memory_usage_at_last_eviction is not None
+            and memory_usage_in_bytes <= self._memory_usage_at_last_eviction
+        ):
+            return
+
+        # For the same reason, we can't measure what an eviction reclaims after the fact. Instead,
+        # before throwing away the whole warm graph by restarting, estimate it from the share of the
+        # values in the graph which are cheap to recompute, and only pay for evicting them (which
+        # dirties all of their dependents) if that would bring usage back under the limit.
+        cheaply_recomputable, completed = self._scheduler.cheaply_recomputable_len()
+        estimated_reclaimed_bytes = (
+            memory_usage_in_bytes * cheaply_recomputable // completed if completed else 0
+        )
+        if memory_usage_in_bytes - estimated_reclaimed_bytes > self._max_memory_usage_in_bytes:
             raise Exception(
-                f"pantsd process {self._pid} was using "
-                f"{memory_usage_in_bytes} bytes of memory (above the limit of "
-                f"{self._max_memory_usage_in_bytes} bytes)."
+                f"pantsd process {self._pid} was using {memory_usage_in_bytes} bytes of memory "
+                f"(above the limit of {self._max_memory_usage_in_bytes} bytes), and only "
+                f"{cheaply_recomputable} of the {completed} values in the graph are cheap to "
+                "recompute."
             )
 
+        evicted = self._scheduler.evict_cheaply_recomputable()
+        self._memory_usage_at_last_eviction = memory_usage_in_bytes
+        self._logger.info(
+            f"pantsd process {self._pid} was using {memory_usage_in_bytes} bytes of memory (above "
+            f"the limit of {self._max_memory_usage_in_bytes} bytes): evicted {evicted} of the "
+            f"{completed} values in the graph."
+        )
+
     def _check_invalidation_watcher_liveness(self):
         self._scheduler.check_invalidation_watcher_liveness()
 
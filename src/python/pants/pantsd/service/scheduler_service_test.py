@@ -0,0 +1,104 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import os
+from typing import Dict, List, Tuple
+
+import pytest
+
+from pants.engine.fs import Digest, PathGlobs
+from pants.init.engine_initializer import GraphScheduler
+from pants.pantsd.service.scheduler_service import SchedulerService
+from pants.testutil.test_base import TestBase
+
+
+# Large enough that evicting even one of the values in the graph is estimated to bring usage just
+# above the limit back under it.
+LIMIT = 1000 * 1000 * 1000
+
+
+class FakeMemorySchedulerService(SchedulerService):
+    def __init__(self, memory_usages: List[int], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._memory_usages = memory_usages
+
+    def _memory_usage_in_bytes(self) -> int:
+        return self._memory_usages.pop(0)
+
+
+class SchedulerServiceTest(TestBase):
+    def create_service(self, *memory_usages: int) -> FakeMemorySchedulerService:
+        return FakeMemorySchedulerService(
+            list(memory_usages),
+            graph_scheduler=GraphScheduler(self.scheduler.scheduler, goal_map={}),
+            build_root=self.build_root,
+            invalidation_globs=[],
+            pidfile=os.path.join(self.build_root, "pid"),
+            pid=os.getpid(),
+            max_memory_usage_in_bytes=LIMIT,
+        )
+
+    def eviction_metrics(self) -> Dict[str, int]:
+        metrics = self.scheduler.metrics()
+        return {
+            key: metrics[key]
+            for key in (
+                "graph_evictions",
+                "graph_evicted_node_count",
+                "graph_eviction_dirtied_node_count",
+            )
+        }
+
+    def cheaply_recomputable_len(self) -> Tuple[int, int]:
+        return self.scheduler.scheduler.cheaply_recomputable_len()
+
+    def populate_graph(self) -> None:
+        self.create_file("a.txt", "a")
+        self.request_product(Digest, [PathGlobs(["a.txt"])])
+
+    def test_memory_usage_under_limit(self) -> None:
+        before = self.eviction_metrics()
+        self.create_service(LIMIT)._check_memory_usage()
+        assert self.eviction_metrics() == before
+
+    def test_eviction(self) -> None:
+        self.populate_graph()
+        cheaply_recomputable, completed = self.cheaply_recomputable_len()
+        assert 0 < cheaply_recomputable < completed
+
+        before = self.eviction_metrics()
+        self.create_service(LIMIT + 1)._check_memory_usage()
+        after = self.eviction_metrics()
+        assert after["graph_evictions"] == before["graph_evictions"] + 1
+        assert (
+            after["graph_evicted_node_count"]
+            == before["graph_evicted_node_count"] + cheaply_recomputable
+        )
+        # The evicted values are gone, and the others remain.
+        assert self.cheaply_recomputable_len() == (0, completed - cheaply_recomputable)
+
+    def test_eviction_not_repeated_until_memory_usage_grows(self) -> None:
+        self.populate_graph()
+        service = self.create_service(LIMIT + 1, LIMIT + 1, LIMIT + 2)
+        service._check_memory_usage()
+        before = self.eviction_metrics()
+
+        # Memory freed by the eviction is reused rather than returned to the OS, so the same usage
+        # is expected afterward.
+        service._check_memory_usage()
+        assert self.eviction_metrics() == before
+
+        # Once usage grows, there is nothing left to evict.
+        with pytest.raises(Exception, match="are cheap to recompute"):
+            service._check_memory_usage()
+        assert self.eviction_metrics() == before
+
+    def test_memory_usage_over_limit_after_eviction(self) -> None:
+        self.populate_graph()
+        before = self.eviction_metrics()
+        cheaply_recomputable, _ = self.cheaply_recomputable_len()
+        # Evicting would not bring usage under the limit, so nothing is evicted before restarting.
+        with pytest.raises(Exception, match="are cheap to recompute"):
+            self.create_service(LIMIT * 1000)._check_memory_usage()
+        assert self.eviction_metrics() == before
+        assert self.cheaply_recomputable_len()[0] == cheaply_recomputable
@@ -73,12 +73,13 @@ class PythonSetup(Subsystem):
             default=ResolveAllConstraintsOption.NONDEPLOYABLES,
             type=ResolveAllConstraintsOption,
             help=(
-                "If set, and the requirements of the code being operated on are a subset of the "
-                "constraints file, then the entire constraints file will be used instead of the "
-                "subset. If unset, or any requirement of the code being operated on is not in the "
-                "constraints file, each subset will be independently resolved as needed, which is "
-                "more correct - work is only invalidated if a requirement it actually depends on "
-                "changes - but also a lot slower, due to the extra resolving. "
+                "If set, then the entire constraints file will be used instead of the subset of "
+                "requirements used by the code being operated on, plus any of those requirements "
+                "that are not in the constraints file. This means that, e.g., all tests with the "
+                "same interpreter constraints share a single resolve. If unset, each subset will "
+                "be independently resolved as needed, which is more correct - work is only "
+                "invalidated if a requirement it actually depends on changes - but also a lot "
+                "slower, due to the extra resolving. "
                 "You may wish to leave this option set for normal work, such as running tests, "
                 "but selectively turn it off via command-line-flag when building deployable "
                 "binaries, so that you only deploy the requirements you actually need for a "
@@ -1,15 +1,22 @@
 # Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import itertools
+import logging
 import threading
+import time
+from collections import deque
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from pants.engine.fs import Digest
 from pants.engine.internals.scheduler import SchedulerSession
 from pants.util.logging import LogLevel
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class StreamingWorkunitContext:
@@ -26,12 +33,91 @@ class StreamingWorkunitContext:
         return self._scheduler.ensure_remote_has_recursive(digests)
 
 
+class OverflowPolicy(Enum):
+    """What to do with new workunits when a callback's queue is full."""
+
+    # Stop enqueueing new workunits for the callback until it has caught up. No workunits are lost:
+    # they are retained (once, for all such callbacks) until every callback which blocks has
+    # enqueued them, so memory use grows with how far the slowest of them falls behind. Neither
+    # polling nor the other callbacks are delayed.
+    BLOCK = "block"
+    # Discard the new workunits.
+    DROP_NEWEST = "drop_newest"
+    # Discard the oldest queued workunits to make room for the new ones.
+    DROP_OLDEST = "drop_oldest"
+
+
+@dataclass(frozen=True)
+class WorkunitSubscription:
+    """How a callback is fed workunits.
+
+    Each callback receives workunits on its own thread, from a queue which holds at most
+    `max_queue_size` workunits before its `overflow_policy` applies: by default, new workunits are
+    dropped (with a warning) while it is full. It is called with at most `max_batch_size` workunits
+    at a time, as soon as that many are queued or the oldest of them has waited `max_batch_latency`
+    seconds (which defaults to `--streaming-workunits-report-interval`).
+
+    May be applied to a callback as a decorator:
+
+        @WorkunitSubscription(max_batch_latency=1.0, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        def handle_workunits(self, **kwargs) -> None:
+            ...
+    """
+
+    max_queue_size: int = 10000
+    max_batch_size: int = 1000
+    max_batch_latency: Optional[float] = None
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_NEWEST
+
+    def __post_init__(self) -> None:
+        if self.max_batch_size <= 0:
+            raise ValueError(
+                "A WorkunitSubscription must have a positive max_batch_size, but got "
+                f"{self.max_batch_size}."
+            )
+        if not self.max_batch_size <= self.max_queue_size:
+            raise ValueError(
+                "A WorkunitSubscription must have max_batch_size <= max_queue_size, but got "
+                f"max_batch_size={self.max_batch_size} and max_queue_size={self.max_queue_size}."
+            )
+        if self.max_batch_latency is not None and self.max_batch_latency <= 0:
+            raise ValueError(
+                "A WorkunitSubscription must have a positive max_batch_latency, but got "
+                f"{self.max_batch_latency}."
+            )
+
+    def __call__(self, callback: Callable) -> Callable:
+        setattr(callback, "workunit_subscription", self)
+        return callback
+
+    @staticmethod
+    def for_callback(callback: Callable) -> "WorkunitSubscription":
+        subscription = getattr(callback, "workunit_subscription", None)
+        return subscription if isinstance(subscription, WorkunitSubscription) else _DEFAULT
+
+
+_DEFAULT = WorkunitSubscription()
+
+
 class StreamingWorkunitHandler:
     """StreamingWorkunitHandler's job is to periodically call each registered callback function with
     the following kwargs:
 
-    workunits: Tuple[Dict[str, str], ...] - the workunit data itself
+    started_workunits: Tuple[Dict[str, str], ...] - workunits that have started since the last call
+    completed_workunits: Tuple[Dict[str, str], ...] - workunits that have completed since the last call
     finished: bool - this will be set to True when the last chunk of workunit data is reported to the callback
+    context: StreamingWorkunitContext - allows the callback to access the contents of Digests
+
+    Workunits are polled from the engine every `report_interval_seconds`, and fed to each callback
+    as described by its `WorkunitSubscription`. A slow callback therefore only delays itself.
+
+    N.B.: Callbacks which are not decorated with a `WorkunitSubscription` get the default one, which
+    changes how they are called compared to calling them directly from each poll:
+      * They are only called when there are new workunits to report (or when `finished`), rather
+        than on every poll.
+      * The workunits from a poll are split across calls of at most 1000 workunits.
+      * If they fall more than 10000 workunits behind, new workunits are dropped (with a warning)
+        rather than slowing polling down.
     """
 
     def __init__(
@@ -45,20 +131,43 @@ class StreamingWorkunitHandler:
         self.report_interval = report_interval_seconds
         self.callbacks = callbacks
         self._thread_runner: Optional[_InnerHandler] = None
+        self._subscribers: List[_Subscriber] = []
+        self._log: Optional[_WorkunitLog] = None
         self._context = StreamingWorkunitContext(_scheduler=self.scheduler)
         # TODO(10092) The max verbosity should be a per-client setting, rather than a global setting.
         self.max_workunit_verbosity = max_workunit_verbosity
 
     def start(self) -> None:
-        if self.callbacks:
-            self._thread_runner = _InnerHandler(
-                scheduler=self.scheduler,
+        if not self.callbacks:
+            return
+        callbacks = list(self.callbacks)
+        subscriptions = [WorkunitSubscription.for_callback(callback) for callback in callbacks]
+        blocking = [s.overflow_policy == OverflowPolicy.BLOCK for s in subscriptions]
+        self._log = _WorkunitLog(readers=sum(blocking)) if any(blocking) else None
+        readers = itertools.count()
+        self._subscribers = [
+            _Subscriber(
+                callback,
+                subscription,
                 context=self._context,
-                callbacks=self.callbacks,
-                report_interval=self.report_interval,
-                max_workunit_verbosity=self.max_workunit_verbosity,
+                default_batch_latency=self.report_interval,
+                log=self._log if is_blocking else None,
+                reader=next(readers) if is_blocking else 0,
             )
-            self._thread_runner.start()
+            for callback, subscription, is_blocking in zip(callbacks, subscriptions, blocking)
+        ]
+        for subscriber in self._subscribers:
+            subscriber.start()
+        self._thread_runner = _InnerHandler(
+            scheduler=self.scheduler,
+            subscribers=self._subscribers,
+            log=self._log,
+            report_interval=min(
+                self.report_interval, *(s.max_batch_latency for s in self._subscribers)
+            ),
+            max_workunit_verbosity=self.max_workunit_verbosity,
+        )
+        self._thread_runner.start()
 
     def end(self) -> None:
         if self._thread_runner:
@@ -67,14 +176,17 @@ class StreamingWorkunitHandler:
         # After stopping the thread, poll workunits one last time to make sure
         # we report any workunits that were added after the last time the thread polled.
         workunits = self.scheduler.poll_workunits(self.max_workunit_verbosity)
-        for callback in self.callbacks:
-            callback(
-                workunits=workunits["completed"],
-                started_workunits=workunits["started"],
-                completed_workunits=workunits["completed"],
-                finished=True,
-                context=self._context,
-            )
+        _offer(self._subscribers, self._log, workunits["started"], workunits["completed"])
+        for subscriber in self._subscribers:
+            subscriber.close(abort=False)
+        for subscriber in self._subscribers:
+            subscriber.join()
+        subscribers, self._subscribers = self._subscribers, []
+        self._log = None
+        # Callbacks run on their own threads, so re-raise the first failure of each here.
+        for subscriber in subscribers:
+            if subscriber.error is not None:
+                raise subscriber.error
 
     @contextmanager
     def session(self) -> Iterator[None]:
@@ -83,38 +195,235 @@ class StreamingWorkunitHandler:
             yield
             self.end()
         except Exception as e:
+            for subscriber in self._subscribers:
+                subscriber.close(abort=True)
             if self._thread_runner:
                 self._thread_runner.join()
+            for subscriber in self._subscribers:
+                subscriber.join()
+            self._subscribers = []
+            self._log = None
             raise e
 
 
+_Item = Tuple[float, bool, Dict[str, Any]]
+
+
+def _items(started: Sequence[Dict[str, Any]], completed: Sequence[Dict[str, Any]]) -> List[_Item]:
+    """Returns triples of (enqueued_at, completed, workunit), where `completed` is False for a
+    started workunit."""
+    now = time.monotonic()
+    return [*((now, False, w) for w in started), *((now, True, w) for w in completed)]
+
+
+def _offer(
+    subscribers: Sequence["_Subscriber"],
+    log: Optional["_WorkunitLog"],
+    started: Sequence[Dict[str, Any]],
+    completed: Sequence[Dict[str, Any]],
+) -> None:
+    """Feeds the workunits from one poll to each subscriber."""
+    items = _items(started, completed)
+    if not items:
+        return
+    if log is not None:
+        log.append(items)
+    for subscriber in subscribers:
+        subscriber.offer(items)
+
+
+class _WorkunitLog:
+    """Workunits which have been polled, but not yet enqueued by every `OverflowPolicy.BLOCK`
+    subscriber.
+
+    Each of those subscribers reads from the log with its own cursor, so that a subscriber whose
+    queue is full stops enqueueing without delaying polling or the other subscribers. Workunits are
+    discarded once every reader has read them.
+    """
+
+    def __init__(self, *, readers: int) -> None:
+        self._lock = threading.Lock()
+        self._items: Deque[_Item] = deque()
+        # The position of the first of `_items` in the log, and the position of each reader.
+        self._offset = 0
+        self._cursors = [0] * readers
+
+    def append(self, items: Sequence[_Item]) -> None:
+        with self._lock:
+            self._items.extend(items)
+
+    def read(self, reader: int, limit: int) -> List[_Item]:
+        """Returns up to `limit` items which the given reader has not yet read."""
+        with self._lock:
+            start = self._cursors[reader] - self._offset
+            items = list(itertools.islice(self._items, start, start + limit))
+            self._cursors[reader] += len(items)
+            read_by_all = min(self._cursors) - self._offset
+            for _ in range(read_by_all):
+                self._items.popleft()
+            self._offset += read_by_all
+            return items
+
+
+class _Subscriber(threading.Thread):
+    """Feeds workunits from a bounded queue to one callback, in batches."""
+
+    def __init__(
+        self,
+        callback: Callable,
+        subscription: WorkunitSubscription,
+        *,
+        context: StreamingWorkunitContext,
+        default_batch_latency: float,
+        log: Optional[_WorkunitLog],
+        reader: int,
+    ) -> None:
+        super().__init__(daemon=True)
+        self._callback = callback
+        self._subscription = subscription
+        self._context = context
+        # Under `OverflowPolicy.BLOCK`, the queue is filled from the shared log rather than from
+        # each poll.
+        self._log = log
+        self._reader = reader
+        self.max_batch_latency = (
+            default_batch_latency
+            if subscription.max_batch_latency is None
+            else subscription.max_batch_latency
+        )
+        self.error: Optional[Exception] = None
+
+        self._condition = threading.Condition()
+        self._queue: Deque[_Item] = deque()
+        self._closed = False
+        self._aborted = False
+        self._dropped = 0
+
+    def offer(self, items: Sequence[_Item]) -> None:
+        """Enqueues the workunits from a poll without blocking, applying the overflow policy if the
+        queue is full."""
+        max_queue_size = self._subscription.max_queue_size
+        with self._condition:
+            if self._closed:
+                return
+            if self._log is not None:
+                self._fill_from_log()
+                self._condition.notify_all()
+                return
+            space = max(0, max_queue_size - len(self._queue))
+            excess = max(0, len(items) - space)
+            if excess:
+                if not self._dropped:
+                    logger.warning(
+                        f"Dropping workunits for the streaming workunit callback {self._callback} "
+                        f"because its queue of {max_queue_size} workunits is full."
+                    )
+                self._dropped += excess
+            if self._subscription.overflow_policy == OverflowPolicy.DROP_NEWEST:
+                items = items[:space]
+            else:
+                for _ in range(min(excess, len(self._queue))):
+                    self._queue.popleft()
+                items = items[-max_queue_size:]
+            self._queue.extend(items)
+            self._condition.notify_all()
+
+    def _fill_from_log(self) -> None:
+        """Under `OverflowPolicy.BLOCK`, enqueues workunits from the log until the queue is full.
+
+        Must be called with the condition held.
+        """
+        space = self._subscription.max_queue_size - len(self._queue)
+        if self._log is not None and space > 0:
+            self._queue.extend(self._log.read(self._reader, space))
+
+    def close(self, *, abort: bool) -> None:
+        """Stops accepting workunits: on abort, queued workunits are discarded without calling the
+        callback, and otherwise they are delivered, followed by a final call with finished=True."""
+        with self._condition:
+            self._closed = True
+            self._aborted = abort
+            self._condition.notify_all()
+
+    def _next_batch(self) -> Tuple[List[_Item], bool]:
+        """Blocks until a batch is ready, and returns it along with whether it is the last one."""
+        max_batch_size = self._subscription.max_batch_size
+        with self._condition:
+            while not self._closed and len(self._queue) < max_batch_size:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                remaining = self._queue[0][0] + self.max_batch_latency - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(timeout=remaining)
+            if self._aborted:
+                self._queue.clear()
+            batch = [self._queue.popleft() for _ in range(min(max_batch_size, len(self._queue)))]
+            if not self._aborted:
+                self._fill_from_log()
+            return batch, self._closed and not self._queue
+
+    def _deliver(self, batch: List[_Item], *, finished: bool) -> None:
+        if self.error is not None:
+            return
+        started = tuple(w for _, is_completed, w in batch if not is_completed)
+        completed = tuple(w for _, is_completed, w in batch if is_completed)
+        kwargs: Dict[str, Any] = {}
+        if finished:
+            # N.B. The final call has historically also received the completed workunits as
+            # `workunits`.
+            kwargs["workunits"] = completed
+        try:
+            self._callback(
+                **kwargs,
+                started_workunits=started,
+                completed_workunits=completed,
+                finished=finished,
+                context=self._context,
+            )
+        except Exception as e:
+            # Keep draining the queue, so that a failed callback does not block polling.
+            self.error = e
+
+    def run(self) -> None:
+        while True:
+            batch, last = self._next_batch()
+            if self._aborted:
+                return
+            if batch or last:
+                self._deliver(batch, finished=last)
+            if last:
+                break
+        if self._dropped:
+            logger.warning(
+                f"Dropped {self._dropped} workunits for the streaming workunit callback "
+                f"{self._callback} because its queue of {self._subscription.max_queue_size} "
+                "workunits was full."
+            )
+
+
 class _InnerHandler(threading.Thread):
     def __init__(
         self,
         scheduler: Any,
-        context: StreamingWorkunitContext,
-        callbacks: Iterable[Callable],
+        subscribers: Sequence[_Subscriber],
+        log: Optional[_WorkunitLog],
         report_interval: float,
         max_workunit_verbosity: LogLevel,
     ):
         super().__init__(daemon=True)
         self.scheduler = scheduler
-        self._context = context
         self.stop_request = threading.Event()
         self.report_interval = report_interval
-        self.callbacks = callbacks
+        self.subscribers = subscribers
+        self.log = log
         self.max_workunit_verbosity = max_workunit_verbosity
 
     def run(self):
         while not self.stop_request.isSet():
             workunits = self.scheduler.poll_workunits(self.max_workunit_verbosity)
-            for callback in self.callbacks:
-                callback(
-                    started_workunits=workunits["started"],
-                    completed_workunits=workunits["completed"],
-                    finished=False,
-                    context=self._context,
-                )
+            _offer(self.subscribers, self.log, workunits["started"], workunits["completed"])
             self.stop_request.wait(timeout=self.report_interval)
 
     def join(self, timeout=None):
@@ -0,0 +1,203 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import threading
+from typing import Any, Callable, Dict, List, Sequence
+
+import pytest
+
+from pants.reporting.streaming_workunit_handler import (
+    OverflowPolicy,
+    StreamingWorkunitHandler,
+    WorkunitSubscription,
+    _WorkunitLog,
+)
+from pants.util.logging import LogLevel
+
+
+class FakeScheduler:
+    """Returns the given workunits as completed from the first polls, and then none."""
+
+    def __init__(self, *polls: Sequence[int]) -> None:
+        self._polls = [[{"name": str(i)} for i in poll] for poll in polls]
+        self._lock = threading.Lock()
+
+    def poll_workunits(self, _: LogLevel) -> Dict[str, Any]:
+        with self._lock:
+            completed = self._polls.pop(0) if self._polls else []
+        return {"started": [], "completed": completed}
+
+
+class Tracker:
+    def __init__(self) -> None:
+        self.batches: List[List[str]] = []
+        self.finished = False
+
+    def add(self, completed_workunits, finished: bool, **kwargs) -> None:
+        assert not self.finished
+        self.batches.append([w["name"] for w in completed_workunits])
+        self.finished = finished
+
+    def subscribe(self, **kwargs) -> Callable:
+        def callback(**callback_kwargs) -> None:
+            self.add(**callback_kwargs)
+
+        return WorkunitSubscription(**kwargs)(callback)
+
+    @property
+    def names(self) -> List[str]:
+        return [name for batch in self.batches for name in batch]
+
+
+def run_handler(scheduler: FakeScheduler, *callbacks, wait_for_polls: bool = False) -> None:
+    handler = StreamingWorkunitHandler(scheduler, callbacks, report_interval_seconds=0.01)
+    with handler.session():
+        # Let the poller drain the scripted polls before finishing.
+        while wait_for_polls and scheduler._polls:
+            threading.Event().wait(0.01)
+
+
+def test_subscription_validation() -> None:
+    with pytest.raises(ValueError):
+        WorkunitSubscription(max_queue_size=10, max_batch_size=11)
+    with pytest.raises(ValueError):
+        WorkunitSubscription(max_batch_size=0)
+    with pytest.raises(ValueError):
+        WorkunitSubscription(max_batch_latency=0)
+    with pytest.raises(ValueError):
+        WorkunitSubscription(max_queue_size=0, max_batch_size=1)
+
+
+def test_batch_size() -> None:
+    tracker = Tracker()
+    callback = tracker.subscribe(max_batch_size=2, max_batch_latency=60)
+    run_handler(FakeScheduler(range(5)), callback, wait_for_polls=True)
+
+    assert tracker.finished
+    assert [["0", "1"], ["2", "3"], ["4"]] == tracker.batches
+
+
+def test_batch_latency() -> None:
+    tracker = Tracker()
+    callback = tracker.subscribe(max_batch_size=100, max_batch_latency=0.01)
+    handler = StreamingWorkunitHandler(FakeScheduler(range(3)), [callback], 60)
+    with handler.session():
+        # Delivered without waiting for a full batch, or for the end of the session.
+        while not tracker.batches:
+            threading.Event().wait(0.01)
+        assert [["0", "1", "2"]] == tracker.batches
+    assert tracker.finished
+
+
+@pytest.mark.parametrize(
+    "policy,expected",
+    [(OverflowPolicy.DROP_NEWEST, ["0", "1", "2"]), (OverflowPolicy.DROP_OLDEST, ["2", "3", "4"])],
+)
+def test_drop_policies(policy: OverflowPolicy, expected: List[str]) -> None:
+    # A single poll that overflows the queue.
+    tracker = Tracker()
+    callback = tracker.subscribe(
+        max_queue_size=3, max_batch_size=3, max_batch_latency=60, overflow_policy=policy
+    )
+    run_handler(FakeScheduler(range(5)), callback, wait_for_polls=True)
+
+    assert expected == tracker.names
+
+
+def test_block_loses_nothing() -> None:
+    tracker = Tracker()
+    callback = tracker.subscribe(
+        max_queue_size=2,
+        max_batch_size=1,
+        max_batch_latency=60,
+        overflow_policy=OverflowPolicy.BLOCK,
+    )
+    run_handler(FakeScheduler(range(5), range(5, 10)), callback, wait_for_polls=True)
+
+    assert [str(i) for i in range(10)] == tracker.names
+
+
+def test_slow_callback_is_isolated(caplog) -> None:
+    fast = Tracker()
+    slow = Tracker()
+    release = threading.Event()
+
+    def slow_callback(**kwargs) -> None:
+        release.wait()
+        slow.add(**kwargs)
+
+    handler = StreamingWorkunitHandler(
+        FakeScheduler(range(3), range(3, 6), range(6, 20006)),
+        [slow_callback, fast.subscribe(max_queue_size=30000)],
+        report_interval_seconds=0.01,
+    )
+    handler.start()
+    # The fast callback receives every poll while the slow callback is still blocked.
+    while len(fast.names) < 20006:
+        threading.Event().wait(0.01)
+    release.set()
+    handler.end()
+
+    assert [str(i) for i in range(20006)] == fast.names
+    assert fast.finished
+    # By default, the slow callback's queue holds 10000 workunits (in addition to the batch that it
+    # is blocked on), and newer ones are dropped with a warning.
+    assert 10000 <= len(slow.names) <= 10006
+    assert [str(i) for i in range(len(slow.names))] == slow.names
+    assert slow.finished
+    assert "Dropping workunits" in caplog.text
+
+
+def test_block_only_delays_the_blocked_callback() -> None:
+    fast = Tracker()
+    slow = Tracker()
+    release = threading.Event()
+
+    def slow_callback(**kwargs) -> None:
+        release.wait()
+        slow.add(**kwargs)
+
+    scheduler = FakeScheduler(range(5), range(5, 10))
+    slow_subscription = WorkunitSubscription(
+        max_queue_size=2, max_batch_size=1, overflow_policy=OverflowPolicy.BLOCK
+    )
+    handler = StreamingWorkunitHandler(
+        scheduler, [slow_subscription(slow_callback), fast.add], report_interval_seconds=0.01
+    )
+    handler.start()
+    # Neither polling nor the fast callback wait for the slow callback's full queue.
+    while fast.names != [str(i) for i in range(10)]:
+        threading.Event().wait(0.01)
+    assert not scheduler._polls
+    release.set()
+    handler.end()
+
+    # And nothing is lost for the slow callback.
+    assert [str(i) for i in range(10)] == slow.names
+    assert slow.finished
+
+
+def test_workunit_log_cursors() -> None:
+    log = _WorkunitLog(readers=2)
+    items = [(0.0, True, {"name": str(i)}) for i in range(3)]
+    log.append(items)
+    assert items[:2] == log.read(0, 2)
+    assert items == log.read(1, 5)
+    # Items are retained until every reader has read them.
+    assert [] == log.read(1, 5)
+    assert items[2:] == log.read(0, 5)
+    assert not log._items
+
+
+def test_callback_error_is_raised() -> None:
+    tracker = Tracker()
+
+    def failing(**kwargs) -> None:
+        raise ValueError("Failed to report workunits.")
+
+    with pytest.raises(ValueError, match="Failed to report workunits."):
+        run_handler(FakeScheduler(range(3)), failing, tracker.add)
+
+    # Other callbacks are unaffected.
+    assert tracker.finished
+    assert [str(i) for i in range(3)] == tracker.names
@@ -714,6 +714,34 @@ impl<N: Node> Entry<N> {
     }
   }
 
+  ///
+  /// Clears the state of this Node like `clear`, but additionally drops its previous result in
+  /// order to free memory.
+  ///
+  /// Because there is no previous result to compare to, the next run of the Node will always
+  /// produce a new Generation, and its dirty dependents will re-run rather than being cleaned.
+  ///
+  pub(crate) fn evict(&mut self) {
+    self.clear();
+    if let EntryState::NotStarted {
+      ref mut previous_result,
+      ..
+    } = *self.state.lock()
+    {
+      *previous_result = None;
+    }
+  }
+
+  ///
+  /// True if this Node has completed, and its value (clean or not) matches the predicate.
+  ///
+  pub(crate) fn is_completed_with<P: FnOnce(&N::Item) -> bool>(&self, predicate: P) -> bool {
+    match *self.state.lock() {
+      EntryState::Completed { ref result, .. } => predicate(result.as_ref()),
+      EntryState::NotStarted { .. } | EntryState::Running { .. } => false,
+    }
+  }
+
   pub fn is_started(&self) -> bool {
     match *self.state.lock() {
       EntryState::NotStarted { .. } => false,
@@ -454,6 +454,57 @@ impl<N: Node> InnerGraph<N> {
     invalidation_result
   }
 
+  ///
+  /// Evicts the values of all completed Nodes for which the predicate (which is passed each Node and
+  /// its value) returns true, and dirties their transitive dependents.
+  ///
+  /// Unlike `invalidate_from_roots`, the previous values of the evicted Nodes are dropped rather
+  /// than retained to be compared with their next values, so this frees the memory they use. Running
+  /// Nodes are skipped, so that eviction does not interrupt in-flight work.
+  ///
+  fn evict<P: Fn(&N, &N::Item) -> bool>(&mut self, predicate: P) -> InvalidationResult {
+    let root_ids: HashSet<_, FNV> = self
+      .nodes
+      .iter()
+      .filter_map(|(node, &entry_id)| {
+        if self
+          .unsafe_entry_for_id(entry_id)
+          .is_completed_with(|item| predicate(node, item))
+        {
+          Some(entry_id)
+        } else {
+          None
+        }
+      })
+      .collect();
+    let transitive_ids: Vec<_> = self
+      .walk(
+        root_ids.iter().cloned().collect(),
+        Direction::Incoming,
+        Self::live_edge_predicate(&self),
+      )
+      .filter(|eid| !root_ids.contains(eid))
+      .collect();
+
+    let invalidation_result = InvalidationResult {
+      cleared: root_ids.len(),
+      dirtied: transitive_ids.len(),
+    };
+
+    for id in &root_ids {
+      if let Some(entry) = self.pg.node_weight_mut(*id) {
+        entry.evict();
+      }
+    }
+    for id in &transitive_ids {
+      if let Some(mut entry) = self.pg.node_weight_mut(*id).cloned() {
+        entry.dirty(self);
+      }
+    }
+
+    invalidation_result
+  }
+
   fn visualize<V: NodeVisualizer<N>>(
     &self,
     mut visualizer: V,
@@ -592,6 +643,23 @@ impl<N: Node> Graph<N> {
     inner.nodes.len()
   }
 
+  ///
+  /// The number of completed Nodes whose values (which are passed to the predicate along with their
+  /// Nodes) match the predicate. This is the number of Nodes that `evict` would clear.
+  ///
+  pub fn completed_len<P: Fn(&N, &N::Item) -> bool>(&self, predicate: P) -> usize {
+    let inner = self.inner.lock();
+    inner
+      .nodes
+      .iter()
+      .filter(|&(node, &entry_id)| {
+        inner
+          .unsafe_entry_for_id(entry_id)
+          .is_completed_with(|item| predicate(node, item))
+      })
+      .count()
+  }
+
   async fn get_inner(
     &self,
     context: &N::Context,
@@ -932,6 +1000,15 @@ impl<N: Node> Graph<N> {
     inner.invalidate_from_roots(predicate)
   }
 
+  ///
+  /// Evicts the values of completed Nodes matching the predicate in order to free memory. See
+  /// `InnerGraph::evict`.
+  ///
+  pub fn evict<P: Fn(&N, &N::Item) -> bool>(&self, predicate: P) -> InvalidationResult {
+    let mut inner = self.inner.lock();
+    inner.evict(predicate)
+  }
+
   pub fn visualize<V: NodeVisualizer<N>>(
     &self,
     visualizer: V,
@@ -92,6 +92,50 @@ async fn invalidate_and_rerun() {
   assert_eq!(context.runs(), vec![TNode::new(1), TNode::new(2)]);
 }
 
+#[tokio::test]
+async fn evict_and_rerun() {
+  let graph = Arc::new(Graph::new());
+  let context = TContext::new(graph.clone());
+
+  // Create three nodes.
+  assert_eq!(
+    graph.create(TNode::new(2), &context).await,
+    Ok(vec![T(0, 0), T(1, 0), T(2, 0)])
+  );
+
+  assert_eq!(graph.completed_len(|_, _| true), 3);
+  assert_eq!(graph.completed_len(|_, value| value.len() == 2), 1);
+
+  // Evict nothing, because no value matches.
+  assert_eq!(
+    graph.evict(|_, value| value.is_empty()),
+    InvalidationResult {
+      cleared: 0,
+      dirtied: 0
+    }
+  );
+
+  // Evict the middle Node (selected by its value), which dirties the upper node.
+  assert_eq!(
+    graph.evict(|_, value| value.len() == 2),
+    InvalidationResult {
+      cleared: 1,
+      dirtied: 1
+    }
+  );
+  // The dirtied upper Node still holds its (dirty) value.
+  assert_eq!(graph.completed_len(|_, _| true), 2);
+
+  // Because the previous value of the middle Node was dropped, the upper node cannot be cleaned,
+  // and both rerun.
+  let context = context.new_session(1);
+  assert_eq!(
+    graph.create(TNode::new(2), &context).await,
+    Ok(vec![T(0, 0), T(1, 0), T(2, 0)])
+  );
+  assert_eq!(context.runs(), vec![TNode::new(1), TNode::new(2)]);
+}
+
 #[tokio::test]
 async fn invalidate_with_changed_dependencies() {
   let graph = Arc::new(Graph::new());
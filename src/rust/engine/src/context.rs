@@ -51,6 +51,7 @@ pub struct Core {
   pub watcher: Arc<InvalidationWatcher>,
   pub build_root: PathBuf,
   pub local_parallelism: usize,
+  pub use_local_cache: bool,
 }
 
 #[derive(Clone, Debug)]
@@ -286,6 +287,7 @@ impl Core {
       build_root,
       watcher,
       local_parallelism: exec_strategy_opts.local_parallelism,
+      use_local_cache: exec_strategy_opts.use_local_cache,
     })
   }
 
@@ -180,6 +180,16 @@ py_module_initializer!(native_engine, |py, m| {
     py_fn!(py, graph_invalidate_all_paths(a: PyScheduler)),
   )?;
   m.add(py, "graph_len", py_fn!(py, graph_len(a: PyScheduler)))?;
+  m.add(
+    py,
+    "graph_cheaply_recomputable_len",
+    py_fn!(py, graph_cheaply_recomputable_len(a: PyScheduler)),
+  )?;
+  m.add(
+    py,
+    "graph_evict_cheaply_recomputable",
+    py_fn!(py, graph_evict_cheaply_recomputable(a: PyScheduler)),
+  )?;
   m.add(
     py,
     "graph_visualize",
@@ -401,6 +411,7 @@ py_class!(class PyTypes |py| {
       _cls,
       directory_digest: PyType,
       snapshot: PyType,
+      paths: PyType,
       file_content: PyType,
       digest_contents: PyType,
       address: PyType,
@@ -429,6 +440,7 @@ py_class!(class PyTypes |py| {
         RefCell::new(Some(Types {
         directory_digest: externs::type_for(directory_digest),
         snapshot: externs::type_for(snapshot),
+        paths: externs::type_for(paths),
         file_content: externs::type_for(file_content),
         digest_contents: externs::type_for(digest_contents),
         address: externs::type_for(address),
@@ -1117,6 +1129,27 @@ fn graph_invalidate_all_paths(py: Python, scheduler_ptr: PyScheduler) -> CPyResu
   })
 }
 
+fn graph_cheaply_recomputable_len(py: Python, scheduler_ptr: PyScheduler) -> CPyResult<(u64, u64)> {
+  with_scheduler(py, scheduler_ptr, |scheduler| {
+    py.allow_threads(|| {
+      let (cheaply_recomputable, completed) = scheduler.cheaply_recomputable_len();
+      Ok((cheaply_recomputable as u64, completed as u64))
+    })
+  })
+}
+
+fn graph_evict_cheaply_recomputable(
+  py: Python,
+  scheduler_ptr: PyScheduler,
+) -> CPyResult<(u64, u64)> {
+  with_scheduler(py, scheduler_ptr, |scheduler| {
+    py.allow_threads(|| {
+      let (cleared, dirtied) = scheduler.evict_cheaply_recomputable();
+      Ok((cleared as u64, dirtied as u64))
+    })
+  })
+}
+
 fn check_invalidation_watcher_liveness(py: Python, scheduler_ptr: PyScheduler) -> PyUnitResult {
   with_scheduler(py, scheduler_ptr, |scheduler| {
     scheduler
@@ -2,7 +2,7 @@ use crate::context::Context;
 use crate::core::{throw, Value};
 use crate::externs;
 use crate::nodes::MultiPlatformExecuteProcess;
-use crate::nodes::{lift_digest, DownloadedFile, NodeResult, Snapshot};
+use crate::nodes::{lift_digest, DownloadedFile, NodeResult, Paths, Snapshot};
 use crate::tasks::Intrinsic;
 use crate::types::Types;
 
@@ -47,6 +47,13 @@ impl Intrinsics {
       },
       Box::new(path_globs_to_digest),
     );
+    intrinsics.insert(
+      Intrinsic {
+        product: types.paths,
+        inputs: vec![types.path_globs],
+      },
+      Box::new(path_globs_to_paths),
+    );
     intrinsics.insert(
       Intrinsic {
         product: types.directory_digest,
@@ -302,6 +309,19 @@ fn path_globs_to_digest(
   .boxed()
 }
 
+fn path_globs_to_paths(
+  context: Context,
+  mut args: Vec<Value>,
+) -> BoxFuture<'static, NodeResult<Value>> {
+  let core = context.core.clone();
+  async move {
+    let key = externs::acquire_key_for(args.pop().unwrap())?;
+    let paths = context.get(Paths(key)).await?;
+    Paths::store_paths(&core, &paths).map_err(|e| throw(&e))
+  }
+  .boxed()
+}
+
 fn create_digest_to_digest(
   context: Context,
   args: Vec<Value>,
@@ -129,6 +129,19 @@ impl Select {
     Select::new(params, product, entry, false)
   }
 
+  ///
+  /// True if this Select runs an intrinsic (e.g. computing `DigestContents` from a `Digest`), whose
+  /// inputs are all in the Store.
+  ///
+  fn is_intrinsic(&self) -> bool {
+    match &self.entry {
+      &rule_graph::Entry::WithDeps(rule_graph::EntryWithDeps::Inner(ref inner)) => {
+        matches!(inner.rule(), &tasks::Rule::Intrinsic(..))
+      }
+      _ => false,
+    }
+  }
+
   async fn select_product(
     &self,
     context: &Context,
@@ -614,6 +627,58 @@ impl From<Snapshot> for NodeKey {
   }
 }
 
+///
+/// A Node that captures the PathStats matched by a PathGlobs subject, without digesting the
+/// contents of the files that they match.
+///
+/// Because it only depends on the directory listings that it expands, a Paths node is only
+/// invalidated when matching files are added or removed, rather than when their contents change.
+///
+#[derive(Clone, Copy, Debug, Eq, Hash, PartialEq)]
+pub struct Paths(pub Key);
+
+impl Paths {
+  pub fn store_paths(core: &Arc<Core>, item: &[PathStat]) -> Result<Value, String> {
+    let mut files = Vec::new();
+    let mut dirs = Vec::new();
+    for ps in item.iter() {
+      match ps {
+        &PathStat::File { ref path, .. } => {
+          files.push(Snapshot::store_path(path)?);
+        }
+        &PathStat::Dir { ref path, .. } => {
+          dirs.push(Snapshot::store_path(path)?);
+        }
+      }
+    }
+    Ok(externs::unsafe_call(
+      core.types.paths,
+      &[externs::store_tuple(files), externs::store_tuple(dirs)],
+    ))
+  }
+}
+
+#[async_trait]
+impl WrappedNode for Paths {
+  type Item = Arc<Vec<PathStat>>;
+
+  async fn run_wrapped_node(self, context: Context) -> NodeResult<Arc<Vec<PathStat>>> {
+    let path_globs = Snapshot::lift_path_globs(&externs::val_for(&self.0))
+      .map_err(|e| throw(&format!("Failed to parse PathGlobs: {}", e)))?;
+    let path_stats = context
+      .expand(path_globs)
+      .map_err(|e| throw(&format!("{}", e)))
+      .await?;
+    Ok(Arc::new(path_stats))
+  }
+}
+
+impl From<Paths> for NodeKey {
+  fn from(n: Paths) -> Self {
+    NodeKey::Paths(n)
+  }
+}
+
 #[derive(Clone, Copy, Debug, Eq, Hash, PartialEq)]
 pub struct DownloadedFile(pub Key);
 
@@ -979,6 +1044,7 @@ pub enum NodeKey {
   DigestFile(DigestFile),
   DownloadedFile(DownloadedFile),
   MultiPlatformExecuteProcess(Box<MultiPlatformExecuteProcess>),
+  Paths(Paths),
   ReadLink(ReadLink),
   Scandir(Scandir),
   Select(Box<Select>),
@@ -994,6 +1060,7 @@ impl NodeKey {
       &NodeKey::Select(ref s) => format!("{}", s.product),
       &NodeKey::Task(ref s) => format!("{}", s.product),
       &NodeKey::Snapshot(..) => "Snapshot".to_string(),
+      &NodeKey::Paths(..) => "Paths".to_string(),
       &NodeKey::DigestFile(..) => "DigestFile".to_string(),
       &NodeKey::ReadLink(..) => "LinkDest".to_string(),
       &NodeKey::Scandir(..) => "DirectoryListing".to_string(),
@@ -1013,11 +1080,39 @@ impl NodeKey {
       &NodeKey::MultiPlatformExecuteProcess { .. }
       | &NodeKey::Select { .. }
       | &NodeKey::Snapshot { .. }
+      | &NodeKey::Paths { .. }
       | &NodeKey::Task { .. }
       | &NodeKey::DownloadedFile { .. } => None,
     }
   }
 
+  ///
+  /// True for Nodes whose values are cheap to recompute: from the filesystem, from the Store, or
+  /// (for processes) from the local process cache. These are evicted under memory pressure.
+  ///
+  /// A process is only cheap to recompute if the local process cache is enabled, and if its result
+  /// was stored there, which is only the case for successful processes: otherwise, evicting it
+  /// would cause it to re-execute.
+  ///
+  pub fn is_cheaply_recomputable(&self, output: &NodeOutput, local_cache_enabled: bool) -> bool {
+    match self {
+      &NodeKey::MultiPlatformExecuteProcess(..) => match output {
+        NodeOutput::ProcessResult(result) => local_cache_enabled && result.0.exit_code == 0,
+        _ => false,
+      },
+      &NodeKey::DigestFile(..)
+      | &NodeKey::DownloadedFile(..)
+      | &NodeKey::Paths(..)
+      | &NodeKey::ReadLink(..)
+      | &NodeKey::Scandir(..)
+      | &NodeKey::Snapshot(..) => true,
+      &NodeKey::Select(ref s) => s.is_intrinsic(),
+      // Explicitly listed so that if people add new NodeKeys they need to consider whether their
+      // values are cheap to recompute.
+      &NodeKey::Task { .. } => false,
+    }
+  }
+
   fn workunit_level(&self) -> Level {
     match self {
       NodeKey::Task(ref task) => task.task.display_info.level,
@@ -1035,6 +1130,7 @@ impl NodeKey {
       NodeKey::Task(ref task) => task.task.display_info.name.clone(),
       NodeKey::MultiPlatformExecuteProcess(mp_epr) => mp_epr.0.workunit_name(),
       NodeKey::Snapshot(..) => "snapshot".to_string(),
+      NodeKey::Paths(..) => "paths".to_string(),
       NodeKey::DigestFile(..) => "digest_file".to_string(),
       NodeKey::DownloadedFile(..) => "downloaded_file".to_string(),
       NodeKey::ReadLink(..) => "read_link".to_string(),
@@ -1054,6 +1150,7 @@ impl NodeKey {
     match self {
       NodeKey::Task(ref task) => task.task.display_info.desc.as_ref().map(|s| s.to_owned()),
       NodeKey::Snapshot(ref s) => Some(format!("Snapshotting: {}", s.0)),
+      NodeKey::Paths(ref s) => Some(format!("Finding files: {}", s.0)),
       NodeKey::MultiPlatformExecuteProcess(mp_epr) => Some(mp_epr.0.user_facing_name()),
       NodeKey::DigestFile(DigestFile(File { path, .. })) => {
         Some(format!("Fingerprinting: {}", path.display()))
@@ -1168,6 +1265,7 @@ impl Node for NodeKey {
             .map_ok(|r| NodeOutput::ProcessResult(Box::new(r)))
             .await
         }
+        NodeKey::Paths(n) => n.run_wrapped_node(context).map_ok(NodeOutput::Paths).await,
         NodeKey::ReadLink(n) => {
           n.run_wrapped_node(context)
             .map_ok(NodeOutput::LinkDest)
@@ -1241,6 +1339,7 @@ impl Display for NodeKey {
       &NodeKey::MultiPlatformExecuteProcess(ref s) => {
         write!(f, "Process({})", s.0.user_facing_name())
       }
+      &NodeKey::Paths(ref s) => write!(f, "Paths({})", s.0),
       &NodeKey::ReadLink(ref s) => write!(f, "ReadLink({})", (s.0).0.display()),
       &NodeKey::Scandir(ref s) => write!(f, "Scandir({})", (s.0).0.display()),
       &NodeKey::Select(ref s) => write!(f, "{}", s.product),
@@ -1279,6 +1378,7 @@ pub enum NodeOutput {
   Digest(hashing::Digest),
   DirectoryListing(Arc<DirectoryListing>),
   LinkDest(LinkDest),
+  Paths(Arc<Vec<PathStat>>),
   ProcessResult(Box<ProcessResult>),
   Snapshot(Arc<store::Snapshot>),
   Value(Value),
@@ -1292,7 +1392,10 @@ impl NodeOutput {
       NodeOutput::ProcessResult(p) => {
         vec![p.0.stdout_digest, p.0.stderr_digest, p.0.output_directory]
       }
-      NodeOutput::DirectoryListing(_) | NodeOutput::LinkDest(_) | NodeOutput::Value(_) => vec![],
+      NodeOutput::DirectoryListing(_)
+      | NodeOutput::LinkDest(_)
+      | NodeOutput::Paths(_)
+      | NodeOutput::Value(_) => vec![],
     }
   }
 }
@@ -1335,6 +1438,17 @@ impl TryFrom<NodeOutput> for Arc<store::Snapshot> {
   }
 }
 
+impl TryFrom<NodeOutput> for Arc<Vec<PathStat>> {
+  type Error = ();
+
+  fn try_from(nr: NodeOutput) -> Result<Self, ()> {
+    match nr {
+      NodeOutput::Paths(v) => Ok(v),
+      _ => Err(()),
+    }
+  }
+}
+
 impl TryFrom<NodeOutput> for hashing::Digest {
   type Error = ();
 
@@ -316,6 +316,37 @@ impl Scheduler {
     cleared + dirtied
   }
 
+  ///
+  /// Return the number of completed Nodes whose values are cheap to recompute (and which would
+  /// thus be evicted by `evict_cheaply_recomputable`), and the total number of completed Nodes.
+  ///
+  pub fn cheaply_recomputable_len(&self) -> (usize, usize) {
+    let local_cache_enabled = self.core.use_local_cache;
+    let graph = &self.core.graph;
+    (
+      graph.completed_len(|node, output| node.is_cheaply_recomputable(output, local_cache_enabled)),
+      graph.completed_len(|_, _| true),
+    )
+  }
+
+  ///
+  /// Evict the values of all completed Nodes which are cheap to recompute, in order to reduce
+  /// memory usage. Returns the number of evicted Nodes, and the number of their dependents which
+  /// were dirtied.
+  ///
+  pub fn evict_cheaply_recomputable(&self) -> (usize, usize) {
+    let local_cache_enabled = self.core.use_local_cache;
+    let InvalidationResult { cleared, dirtied } = self
+      .core
+      .graph
+      .evict(|node, output| node.is_cheaply_recomputable(output, local_cache_enabled));
+    info!(
+      "eviction: cleared {} and dirtied {} nodes which are cheap to recompute",
+      cleared, dirtied
+    );
+    (cleared, dirtied)
+  }
+
   ///
   /// Return Scheduler and per-Session metrics.
   ///